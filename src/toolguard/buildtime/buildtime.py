@@ -17,6 +17,7 @@ from toolguard.buildtime.gen_spec.spec_generator import (
 from toolguard.buildtime.llm import I_TG_LLM
 from toolguard.buildtime.utils.open_api import OpenAPI
 from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult, ToolGuardSpec
+from toolguard.runtime.item_guards import ItemGuardsMode
 
 
 # Step1 only
@@ -60,6 +61,7 @@ async def generate_guards_code(
     *,
     lib_names: Optional[List[str]] = None,
     tool_names: Optional[List[str]] = None,
+    item_guards_mode: ItemGuardsMode = ItemGuardsMode.PARALLEL,
 ) -> ToolGuardsCodeGenerationResult:
     """Generate guard code from tool specifications.
 
@@ -71,6 +73,9 @@ async def generate_guards_code(
         app_name: The application name for the generated code.
         lib_names: Optional list of module root names for function-based tools.
         tool_names: Optional list of specific tool names to generate code for.
+        item_guards_mode: How the generated tool guards run their policy item
+            guards. FAIL_FAST cancels the remaining items on the first violation.
+            Can be overridden when loading the runtime.
 
     Returns:
         ToolGuardsCodeGenerationResult containing the generated guard code and metadata.
@@ -90,7 +95,7 @@ async def generate_guards_code(
     if isinstance(tools, dict):
         oas = OpenAPI.model_validate(tools, strict=False)
         return await generate_toolguards_from_openapi(
-            app_name, tool_specs, work_dir, oas, llm
+            app_name, tool_specs, work_dir, oas, llm, item_guards_mode
         )
 
     # List of functions
@@ -103,6 +108,7 @@ async def generate_guards_code(
             funcs=funcs,
             llm=llm,
             module_roots=lib_names,
+            item_guards_mode=item_guards_mode,
         )
 
     raise NotImplementedError()
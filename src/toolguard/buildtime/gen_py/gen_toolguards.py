@@ -10,11 +10,14 @@ from toolguard.buildtime.gen_py.tool_guard_generator import ToolGuardGenerator
 from toolguard.buildtime.llm import I_TG_LLM
 from toolguard.buildtime.utils import py, pyright, pytest
 from toolguard.buildtime.utils.open_api import OpenAPI
+from toolguard.runtime.bundle import BUNDLE_FILENAME, write_toolguards_bundle
 from toolguard.runtime.data_types import (
     RuntimeDomain,
     ToolGuardsCodeGenerationResult,
     ToolGuardSpec,
 )
+from toolguard.runtime.item_guards import ItemGuardsMode
+from toolguard.runtime.manifest import RuntimeManifest
 
 
 async def generate_toolguards_from_functions(
@@ -24,6 +27,7 @@ async def generate_toolguards_from_functions(
     funcs: List[Callable],
     llm: I_TG_LLM,
     module_roots: Optional[List[str]] = None,
+    item_guards_mode: ItemGuardsMode = ItemGuardsMode.PARALLEL,
 ) -> ToolGuardsCodeGenerationResult:
     assert funcs, "Funcs cannot be empty"
     logger.debug(f"Starting... will save into {py_root}")
@@ -36,7 +40,7 @@ async def generate_toolguards_from_functions(
     # Domain from functions
     domain = generate_domain_from_functions(py_root, app_name, funcs, module_roots)
     return await generate_toolguards_from_domain(
-        app_name, tool_policies, py_root, domain, llm
+        app_name, tool_policies, py_root, domain, llm, item_guards_mode
     )
 
 
@@ -46,13 +50,14 @@ async def generate_toolguards_from_openapi(
     py_root: Path,
     oas: OpenAPI,
     llm: I_TG_LLM,
+    item_guards_mode: ItemGuardsMode = ItemGuardsMode.PARALLEL,
 ) -> ToolGuardsCodeGenerationResult:
     logger.debug(f"Starting... will save into {py_root}")
 
     # Domain from OpenAPI
     domain = await generate_domain_from_openapi(py_root, app_name, oas)
     return await generate_toolguards_from_domain(
-        app_name, tool_policies, py_root, domain, llm
+        app_name, tool_policies, py_root, domain, llm, item_guards_mode
     )
 
 
@@ -62,6 +67,7 @@ async def generate_toolguards_from_domain(
     py_root: Path,
     domain: RuntimeDomain,
     llm: I_TG_LLM,
+    item_guards_mode: ItemGuardsMode = ItemGuardsMode.PARALLEL,
 ) -> ToolGuardsCodeGenerationResult:
     # Setup env
     pyright.config(py_root)
@@ -84,7 +90,9 @@ async def generate_toolguards_from_domain(
     ]
 
     tools_generator = [
-        ToolGuardGenerator(app_name, tool_policy, py_root, domain, llm)
+        ToolGuardGenerator(
+            app_name, tool_policy, py_root, domain, llm, item_guards_mode
+        )
         for tool_policy in not_empty_specs
     ]
     with py.temp_python_path(py_root):
@@ -95,6 +103,9 @@ async def generate_toolguards_from_domain(
     tools_result = {
         tool.tool_name: res for tool, res in zip(not_empty_specs, tool_results)
     }
-    return ToolGuardsCodeGenerationResult(
+    result = ToolGuardsCodeGenerationResult(
         out_dir=py_root, domain=domain, tools=tools_result
     ).save(py_root)
+    RuntimeManifest.from_result(result).save(py_root)
+    write_toolguards_bundle(result, py_root / BUNDLE_FILENAME)
+    return result
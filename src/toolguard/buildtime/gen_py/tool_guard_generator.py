@@ -22,6 +22,7 @@ from toolguard.buildtime.llm.i_tg_llm import I_TG_LLM
 from toolguard.buildtime.utils import py, pyright, pytest
 from toolguard.buildtime.utils.llm_py import get_code_content
 from toolguard.buildtime.utils.py_doc_str import extract_docstr_args
+from toolguard.runtime.analysis import analyze_guard_module
 from toolguard.runtime.data_types import (
     FileTwin,
     RuntimeDomain,
@@ -29,6 +30,7 @@ from toolguard.runtime.data_types import (
     ToolGuardSpec,
     ToolGuardSpecItem,
 )
+from toolguard.runtime.item_guards import ItemGuardsMode
 
 MAX_TOOL_IMPROVEMENTS = 5
 MAX_TEST_GEN_TRIALS = 3
@@ -51,12 +53,14 @@ class ToolGuardGenerator:
         py_path: Path,
         domain: RuntimeDomain,
         llm: I_TG_LLM,
+        item_guards_mode: ItemGuardsMode = ItemGuardsMode.PARALLEL,
     ) -> None:
         self.py_path = py_path
         self.app_name = app_name
         self.tool_policy = tool_policy
         self.domain = domain
         self.llm = llm
+        self.item_guards_mode = item_guards_mode
 
     def _create_dirs(self):
         app_path = self.py_path / py.to_py_module_name(self.app_name)
@@ -99,6 +103,12 @@ class ToolGuardGenerator:
             guard_file=tool_guard,
             item_guard_files=list(item_guards),
             test_files=list(item_tests),
+            guard_traits={
+                fn_name: traits
+                for item_guard in item_guards
+                if item_guard is not None
+                for fn_name, traits in analyze_guard_module(item_guard.content).items()
+            },
         )
 
     async def _generate_item_tests_and_guard(
@@ -376,6 +386,7 @@ class ToolGuardGenerator:
                     "args_doc_str": args_doc_str,
                 },
                 items=items,
+                item_guards_mode=self.item_guards_mode.value,
                 extra_imports=extra_imports,
             ),
         ).save(self.py_path)
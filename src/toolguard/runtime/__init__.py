@@ -1,12 +1,30 @@
+from .audit import AuditSink, AuditStats
 from .data_types import (
+    GuardTimeoutException,
+    GuardUnavailableException,
     IToolInvoker,
     PolicyViolationException,
     ToolGuardsCodeGenerationResult,
     assert_any_condition_met,
 )
+from .item_guards import (
+    ConditionsMode,
+    ItemGuardsCostModel,
+    ItemGuardsMode,
+    run_item_guards,
+)
+from .deadlines import current_deadline, remaining_time
+from .metrics import GuardMetrics
+from .observers import GuardObserver
+from .tracing import GuardTracer
 from .rules import rule, current_rule
-from .runtime import load_toolguards, load_toolguards_from_memory
+from .runtime import GuardVerdict, load_toolguards, load_toolguards_from_memory
+from .shadow import ShadowStats
+from .bundle import load_toolguards_bundle
+from .registry import ToolguardRegistry
 from .tool_invokers import (
+    CachingToolInvoker,
+    CircuitBreaker,
     LangchainToolInvoker,
     ToolFunctionsInvoker,
     ToolMethodsInvoker,
@@ -15,13 +33,32 @@ from .tool_invokers import (
 __all__ = [
     "load_toolguards",
     "load_toolguards_from_memory",
+    "load_toolguards_bundle",
+    "ToolguardRegistry",
+    "GuardVerdict",
+    "ShadowStats",
     "ToolGuardsCodeGenerationResult",
     "PolicyViolationException",
+    "GuardTimeoutException",
+    "GuardUnavailableException",
     "IToolInvoker",
+    "CachingToolInvoker",
+    "CircuitBreaker",
     "LangchainToolInvoker",
     "ToolFunctionsInvoker",
     "ToolMethodsInvoker",
     "assert_any_condition_met",
+    "ItemGuardsMode",
+    "ConditionsMode",
+    "ItemGuardsCostModel",
+    "run_item_guards",
+    "GuardObserver",
+    "GuardMetrics",
+    "GuardTracer",
+    "AuditSink",
+    "AuditStats",
     "rule",
     "current_rule",
+    "current_deadline",
+    "remaining_time",
 ]
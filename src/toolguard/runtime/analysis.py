@@ -0,0 +1,380 @@
+import ast
+import builtins
+from dataclasses import dataclass
+from typing import AbstractSet, Dict, List, Optional
+
+from toolguard.runtime.data_types import API_PARAM, ARGS_PARAM, GuardTraits
+
+#: Functions that delegate to item guards: passing them `api` or `args` is not
+#: a use of their own.
+ITEM_GUARDS_RUNNERS = frozenset({"run_item_guards"})
+
+#: Runtime functions that need no event loop when the runtime runs a guard
+#: without one (it then selects their sequential modes).
+LOOP_FREE_AWAITABLES = ITEM_GUARDS_RUNNERS | {"assert_any_condition_met"}
+
+#: Names of calls that read a clock or random numbers.
+_NONDETERMINISTIC_CALLS = frozenset(
+    {
+        "now",
+        "utcnow",
+        "today",
+        "time",
+        "time_ns",
+        "monotonic",
+        "perf_counter",
+        "random",
+        "randint",
+        "randrange",
+        "uniform",
+        "choice",
+        "choices",
+        "shuffle",
+        "sample",
+        "uuid1",
+        "uuid4",
+    }
+)
+
+#: Builtins whose result may differ between calls with the same arguments, or
+#: that run arbitrary code.
+_IMPURE_BUILTINS = frozenset(
+    {
+        "__import__",
+        "breakpoint",
+        "compile",
+        "eval",
+        "exec",
+        "globals",
+        "id",
+        "input",
+        "locals",
+        "open",
+        "vars",
+    }
+)
+_PURE_BUILTINS = frozenset(dir(builtins)) - _IMPURE_BUILTINS
+
+#: Modules whose functions depend only on their arguments (except the calls
+#: above).
+_PURE_MODULES = frozenset(
+    {"math", "re", "string", "operator", "itertools", "functools", "typing"}
+)
+
+
+@dataclass(frozen=True)
+class _ModuleScope:
+    """What the calls of a guard function may refer to, in its module."""
+
+    functions: Dict[str, ast.FunctionDef | ast.AsyncFunctionDef]
+    #: The names bound by imports, to the imported module or object path.
+    imports: Dict[str, str]
+
+    @classmethod
+    def of(cls, tree: ast.Module) -> "_ModuleScope":
+        functions = {}
+        imports = {}
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                functions[node.name] = node
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        imports[alias.asname] = alias.name
+                    else:
+                        root = alias.name.split(".")[0]
+                        imports[root] = root
+            elif isinstance(node, ast.ImportFrom):
+                module = "." * node.level + (node.module or "")
+                for alias in node.names:
+                    if alias.name != "*":
+                        imports[alias.asname or alias.name] = f"{module}.{alias.name}"
+        return cls(functions, imports)
+
+
+def analyze_guard_module(source: str) -> Dict[str, GuardTraits]:
+    """Detect the traits of the guard functions defined in a module.
+
+    Guard functions are the top-level functions decorated with `@rule(<name>)`.
+
+    Args:
+        source: The Python source code of the module.
+
+    Returns:
+        The traits of each guard function, by function name.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {}
+
+    scope = _ModuleScope.of(tree)
+    traits = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        rule_name = _rule_name(node)
+        if rule_name is None:
+            continue
+        traits[node.name] = _traits(node, rule_name, scope)
+    return traits
+
+
+def analyze_tool_guard(
+    source: str, fn_name: str, item_guards: AbstractSet[str] = frozenset()
+) -> Optional[GuardTraits]:
+    """Detect the traits of a tool guard function, excluding its item guards.
+
+    Passing `api` or `args` to an item guard (or to `run_item_guards`) is not
+    counted as a use: the traits of the item guards cover them.
+
+    Args:
+        source: The Python source code of the tool guard module.
+        fn_name: The name of the tool guard function.
+        item_guards: The names of the item guard functions.
+
+    Returns:
+        The traits, or None if the function is not found.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    for node in tree.body:
+        if (
+            isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            and node.name == fn_name
+        ):
+            return _traits(
+                node,
+                _rule_name(node) or fn_name,
+                _ModuleScope.of(tree),
+                ITEM_GUARDS_RUNNERS | item_guards,
+            )
+    return None
+
+
+def awaits_only(
+    source: str, fn_name: str, awaitables: AbstractSet[str] = LOOP_FREE_AWAITABLES
+) -> bool:
+    """Whether a function awaits nothing but direct calls of the given functions.
+
+    Tool guards that only await `run_item_guards`, `assert_any_condition_met`
+    or their item guards can run without an event loop when their item guards
+    can; tool guards that, e.g., `asyncio.gather` their item guards themselves
+    cannot.
+
+    Args:
+        source: The Python source code of the module.
+        fn_name: The name of the function.
+        awaitables: The names of the functions it may await.
+
+    Returns:
+        False if the function is not found, or awaits anything else.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return False
+    for node in tree.body:
+        if isinstance(node, ast.AsyncFunctionDef) and node.name == fn_name:
+            for stmt in node.body:
+                for sub in ast.walk(stmt):
+                    if isinstance(sub, (ast.AsyncFor, ast.AsyncWith)):
+                        return False
+                    if isinstance(sub, ast.Await) and not (
+                        isinstance(sub.value, ast.Call)
+                        and _callee(sub.value) in awaitables
+                    ):
+                        return False
+            return True
+    return False
+
+
+def _traits(
+    fn: ast.FunctionDef | ast.AsyncFunctionDef,
+    rule_name: str,
+    scope: _ModuleScope,
+    delegates: AbstractSet[str] = frozenset(),
+) -> GuardTraits:
+    delegated = _delegated_names(fn, delegates)
+    # the module functions it uses are analyzed with it
+    reachable = _reachable(fn, scope, delegates)
+    return GuardTraits(
+        rule_name=rule_name,
+        uses_api=any(_uses_name(f, API_PARAM, delegated) for f in reachable),
+        read_args=_read_args(fn, delegated),
+        deterministic=all(_deterministic(f, scope, delegates) for f in reachable),
+    )
+
+
+def _reachable(
+    fn: ast.FunctionDef | ast.AsyncFunctionDef,
+    scope: _ModuleScope,
+    delegates: AbstractSet[str],
+) -> List[ast.FunctionDef | ast.AsyncFunctionDef]:
+    """The function, and the module functions it refers to, transitively."""
+    reachable = [fn]
+    seen = {fn.name}
+    for f in reachable:
+        for stmt in f.body:
+            for node in ast.walk(stmt):
+                if (
+                    isinstance(node, ast.Name)
+                    and node.id in scope.functions
+                    and node.id not in delegates
+                    and node.id not in seen
+                ):
+                    seen.add(node.id)
+                    reachable.append(scope.functions[node.id])
+    return reachable
+
+
+def _rule_name(fn: ast.FunctionDef | ast.AsyncFunctionDef) -> Optional[str]:
+    for decorator in fn.decorator_list:
+        if not (isinstance(decorator, ast.Call) and decorator.args):
+            continue
+        func = decorator.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        arg = decorator.args[0]
+        if (
+            name == "rule"
+            and isinstance(arg, ast.Constant)
+            and isinstance(arg.value, str)
+        ):
+            return arg.value
+    return None
+
+
+def _uses_name(
+    fn: ast.FunctionDef | ast.AsyncFunctionDef,
+    name: str,
+    ignored: AbstractSet[int] = frozenset(),
+) -> bool:
+    for stmt in fn.body:
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Name)
+                and node.id == name
+                and id(node) not in ignored
+            ):
+                return True
+    return False
+
+
+def _delegated_names(
+    fn: ast.FunctionDef | ast.AsyncFunctionDef, delegates: AbstractSet[str]
+) -> AbstractSet[int]:
+    """The (ids of the) names passed as plain arguments to delegate functions."""
+    delegated = set()
+    for stmt in fn.body:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Call) and _callee(node) in delegates:
+                for arg in [*node.args, *(k.value for k in node.keywords)]:
+                    if isinstance(arg, ast.Name):
+                        delegated.add(id(arg))
+    return delegated
+
+
+def _callee(call: ast.Call) -> Optional[str]:
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _read_args(
+    fn: ast.FunctionDef | ast.AsyncFunctionDef, delegated: AbstractSet[int]
+) -> Optional[List[str]]:
+    """The tool call arguments read by a guard function, see GuardTraits.read_args."""
+    params = [
+        a.arg
+        for a in [*fn.args.posonlyargs, *fn.args.args, *fn.args.kwonlyargs]
+        if a.arg != API_PARAM
+    ]
+    if fn.args.vararg or fn.args.kwarg:
+        return None
+    read = set(params) - {ARGS_PARAM}
+    if ARGS_PARAM not in params:
+        return sorted(read)
+
+    # `args.<field>` reads one argument; any other use reads them all
+    read.add(ARGS_PARAM)  # an argument named "args" is bound to `args` as is
+    fields = set()
+    for stmt in fn.body:
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Attribute)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == ARGS_PARAM
+                and isinstance(node.ctx, ast.Load)
+            ):
+                fields.add(id(node.value))
+                read.add(node.attr)
+    for stmt in fn.body:
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Name)
+                and node.id == ARGS_PARAM
+                and id(node) not in fields
+                and id(node) not in delegated
+            ):
+                return None
+    # methods (e.g. `args.model_dump()`) read everything
+    for stmt in fn.body:
+        for node in ast.walk(stmt):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and id(node.func.value) in fields
+            ):
+                return None
+    return sorted(read)
+
+
+def _deterministic(
+    fn: ast.FunctionDef | ast.AsyncFunctionDef,
+    scope: _ModuleScope,
+    delegates: AbstractSet[str],
+) -> bool:
+    """Whether a function reads no clock and no random numbers, and calls no
+    function that may (module functions are checked separately, see
+    `_reachable`). Calls that cannot be checked make it non-deterministic."""
+    for stmt in fn.body:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Call) and not _deterministic_call(
+                node, scope, delegates
+            ):
+                return False
+    return True
+
+
+def _deterministic_call(
+    call: ast.Call, scope: _ModuleScope, delegates: AbstractSet[str]
+) -> bool:
+    if _callee(call) in _NONDETERMINISTIC_CALLS:
+        return False
+    func = call.func
+    if isinstance(func, ast.Name):
+        if func.id in delegates or func.id in scope.functions:
+            return True
+        if func.id in scope.imports:
+            return _trusted_import(scope.imports[func.id])
+        return func.id in _PURE_BUILTINS
+    # a method: of an imported module or object, or of a value
+    root = func
+    while isinstance(root, (ast.Attribute, ast.Subscript, ast.Call)):
+        root = root.func if isinstance(root, ast.Call) else root.value
+    if isinstance(root, ast.Name) and root.id in scope.imports:
+        return _trusted_import(scope.imports[root.id])
+    return True
+
+
+def _trusted_import(path: str) -> bool:
+    return (
+        path == "toolguard.runtime"
+        or path.startswith("toolguard.runtime.")
+        or path.split(".")[0] in _PURE_MODULES
+    )
@@ -0,0 +1,329 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from toolguard.runtime.canonical import canonical_json
+from toolguard.runtime.data_types import PolicyViolationException
+from toolguard.runtime.metrics import ALLOWED, BLOCKED, ERROR
+from toolguard.runtime.observers import ApiCall
+
+# a record ready to be serialized: JSON values only, so that it neither
+# changes with the tool call arguments nor keeps exceptions and their frames
+_PendingRecord = Dict[str, Any]
+
+
+@dataclass
+class AuditStats:
+    """Counters of an audit sink.
+
+    Attributes:
+        recorded: Records accepted into the queue.
+        dropped: Records discarded because the queue was full.
+        written: Records written to the file.
+        rotations: Files rotated.
+        write_errors: Batches that could not be written.
+        invalid: Records skipped because their arguments or error could not be
+            serialized.
+    """
+
+    recorded: int = 0
+    dropped: int = 0
+    written: int = 0
+    rotations: int = 0
+    write_errors: int = 0
+    invalid: int = 0
+
+
+class AuditSink:
+    """Writes an audit record of every guard decision to a JSON Lines file.
+
+    Recording a decision hashes its arguments and appends the record to a
+    bounded in-memory queue; records are written in batches by a background
+    thread, so that guard calls never wait for the disk. If the queue is full (the writer cannot keep
+    up with a burst), new records are dropped and counted, so memory stays
+    bounded.
+
+    Each line is a JSON object with:
+    - `ts`: when the guard finished, in seconds since the epoch;
+    - `tool`: the guarded tool;
+    - `args_sha256`: the hash of the canonical JSON of the tool call arguments
+      (the arguments themselves are not written);
+    - `verdict`: "allowed", "blocked" or "error";
+    - `shadow`: whether the guard was evaluated in the background (shadow mode).
+      The tool call was then allowed, whatever the verdict;
+    - `fail_open`: whether the tool call was allowed without a verdict, because
+      the guard of its fail-open tool timed out or used an unavailable API;
+    - `rule`: the violated rule path (`PolicyViolationException.rule`), if blocked;
+    - `message`: the violation or error message, if any;
+    - `latency`: the guard latency, in seconds;
+    - `api_calls`: the delegate invocations made by the guard, each with the
+      invoked `api`, its `latency`, and its `error` if it failed, or
+      `cancelled` if it was cancelled.
+
+    When the file exceeds `max_bytes`, it is rotated: `audit.jsonl` is renamed
+    `audit.jsonl.1` (or compressed into `audit.jsonl.1.gz`), the older files
+    are shifted, and at most `backups` of them are kept.
+
+    Args:
+        path: The audit file.
+        max_queue: Maximal number of records waiting to be written.
+        batch_size: Number of queued records that wakes the writer before
+            `flush_interval`.
+        flush_interval: Maximal delay, in seconds, before queued records are
+            written.
+        max_bytes: Size above which the file is rotated. If None, it is never
+            rotated.
+        backups: Number of rotated files to keep. With 0, the records of a
+            full file are discarded when it is rotated.
+        compress: Whether to gzip the rotated files.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_queue: int = 100_000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_bytes: Optional[int] = 100 * 1024 * 1024,
+        backups: int = 5,
+        compress: bool = False,
+    ) -> None:
+        if max_queue <= 0:
+            raise ValueError("max_queue must be positive")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if backups < 0:
+            raise ValueError("backups must not be negative")
+        self.path = Path(path)
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._compress = compress
+        self._queue: Deque[_PendingRecord] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._writing = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = AuditStats()
+
+    @property
+    def stats(self) -> AuditStats:
+        """A snapshot of the counters."""
+        with self._lock:
+            return AuditStats(**vars(self._stats))
+
+    def record(
+        self,
+        tool_name: str,
+        args: dict,
+        start: float,
+        end: float,
+        error: Optional[BaseException],
+        api_calls: List[ApiCall],
+        shadow: bool = False,
+        fail_open: bool = False,
+    ) -> None:
+        """Queue the record of a guard decision, without waiting for it to be
+        written.
+
+        Args:
+            tool_name: The guarded tool.
+            args: The tool call arguments.
+            start: When the guard started, as a `time.perf_counter()` reading.
+            end: When the guard finished.
+            error: The exception the guard raised, if any (a
+                PolicyViolationException if the tool call is blocked).
+            api_calls: The delegate invocations made by the guard.
+            shadow: Whether the guard was evaluated in shadow mode.
+            fail_open: Whether the tool call was allowed without a verdict.
+        """
+        if self._closed:
+            return
+        try:
+            entry = _to_entry(
+                tool_name, args, start, end, error, api_calls, shadow, fail_open
+            )
+        except Exception as e:
+            with self._lock:
+                self._stats.invalid += 1
+            logger.warning(
+                "Skipped an audit record that cannot be serialized",
+                extra={"tool": tool_name, "error": repr(e)},
+            )
+            return
+        queue = self._queue
+        with self._lock:
+            if self._closed:
+                return
+            if len(queue) >= self._max_queue:
+                self._stats.dropped += 1
+                return
+            queue.append(entry)
+            self._stats.recorded += 1
+            if self._thread is None:
+                self._start()
+            if len(queue) == self._batch_size:
+                self._wakeup.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queued records are written.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        self._wakeup.set()
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: not self._queue and not self._writing, timeout
+            )
+
+    def close(self) -> None:
+        """Write the queued records, and stop the writer.
+
+        Records of decisions made afterwards are ignored.
+        """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> "AuditSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._write_loop, name="toolguard-audit", daemon=True
+        )
+        self._thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            with self._lock:
+                batch = list(self._queue)
+                self._queue.clear()
+                self._writing = len(batch)
+                closed = self._closed
+            if batch:
+                self._write(batch)
+            with self._idle:
+                self._writing = 0
+                self._idle.notify_all()
+                if closed and not self._queue:
+                    return
+
+    def _write(self, batch: List[_PendingRecord]) -> None:
+        lines = [json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                size = f.tell()
+            if self._max_bytes is not None and size >= self._max_bytes:
+                self._rotate()
+        except OSError as e:
+            with self._lock:
+                self._stats.write_errors += 1
+            logger.warning(
+                "Failed to write audit records",
+                extra={"path": str(self.path), "error": str(e)},
+            )
+            return
+        with self._lock:
+            self._stats.written += len(lines)
+
+    def _rotate(self) -> None:
+        suffix = ".gz" if self._compress else ""
+
+        def backup(i: int) -> Path:
+            return self.path.with_name(f"{self.path.name}.{i}{suffix}")
+
+        if self._backups <= 0:
+            self.path.unlink()
+        else:
+            backup(self._backups).unlink(missing_ok=True)
+            for i in range(self._backups - 1, 0, -1):
+                if backup(i).exists():
+                    os.replace(backup(i), backup(i + 1))
+            if self._compress:
+                with open(self.path, "rb") as src, gzip.open(backup(1), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                self.path.unlink()
+            else:
+                os.replace(self.path, backup(1))
+        with self._lock:
+            self._stats.rotations += 1
+
+
+def _to_entry(
+    tool_name: str,
+    args: dict,
+    start: float,
+    end: float,
+    error: Optional[BaseException],
+    api_calls: List[ApiCall],
+    shadow: bool,
+    fail_open: bool,
+) -> _PendingRecord:
+    args_json = canonical_json(args)
+    if args_json is None:
+        args_json = json.dumps(args, sort_keys=True, default=repr)
+    entry: _PendingRecord = {
+        "ts": time.time(),
+        "tool": tool_name,
+        "args_sha256": hashlib.sha256(args_json.encode()).hexdigest(),
+        "verdict": _verdict_of(error),
+        "shadow": shadow,
+        "fail_open": fail_open,
+    }
+    if isinstance(error, PolicyViolationException):
+        entry["rule"] = list(error.rule)
+    if error is not None:
+        entry["message"] = _message_of(error)
+    entry["latency"] = end - start
+    entry["api_calls"] = [
+        {"api": api, "latency": call_end - call_start} | _api_outcome(call_error)
+        for api, call_start, call_end, call_error in api_calls
+    ]
+    return entry
+
+
+def _api_outcome(error: Optional[BaseException]) -> dict:
+    if error is None:
+        return {}
+    if isinstance(error, asyncio.CancelledError):
+        return {"cancelled": True}
+    return {"error": _message_of(error)}
+
+
+def _message_of(error: BaseException) -> str:
+    return str(error) or type(error).__name__
+
+
+def _verdict_of(error: Optional[BaseException]) -> str:
+    if error is None:
+        return ALLOWED
+    if isinstance(error, PolicyViolationException):
+        return BLOCKED
+    return ERROR
@@ -0,0 +1,201 @@
+import inspect
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, get_args
+
+from pydantic import (
+    AliasChoices,
+    AliasPath,
+    BaseModel,
+    ConfigDict,
+    PydanticSchemaGenerationError,
+    TypeAdapter,
+)
+from pydantic.errors import PydanticUndefinedAnnotation
+from typing_extensions import TypedDict
+
+from toolguard.runtime.data_types import API_PARAM, ARGS_PARAM
+
+#: Validation settings for guard arguments: unknown annotations are checked with isinstance.
+_BINDING_CONFIG = ConfigDict(arbitrary_types_allowed=True)
+
+
+class ParamKind(Enum):
+    """The role of a guard function parameter."""
+
+    API = "api"
+    ARGS = "args"
+    VALUE = "value"
+
+
+@dataclass(frozen=True)
+class ParamPlan:
+    """How to produce the value of one guard function parameter."""
+
+    name: str
+    kind: ParamKind
+
+
+class ArgsBindingPlan:
+    """Build-once plan that turns tool call arguments into guard function kwargs.
+
+    The parameters of the guard function are classified once into the ``api``
+    parameter, the ``args`` catch-all and plain typed values. The parameters
+    whose annotation mentions a pydantic model are validated in a single pass
+    by one cached pydantic ``TypeAdapter``, which also converts nested generics
+    and unions (e.g. ``list[Passenger | dict]``). Model instances are not
+    re-validated. The other parameters are passed as they are, without
+    validation or coercion.
+
+    Args:
+        guard_fn: The guard function whose signature is planned.
+    """
+
+    params: Tuple[ParamPlan, ...]
+
+    def __init__(self, guard_fn: Callable) -> None:
+        sig = inspect.signature(guard_fn)
+        self.params = tuple(
+            ParamPlan(name=p_name, kind=_param_kind(p_name))
+            for p_name in sig.parameters
+        )
+        self._value_params = tuple(p for p in self.params if p.kind != ParamKind.API)
+        self._api_param: Optional[str] = next(
+            (p.name for p in self.params if p.kind == ParamKind.API), None
+        )
+        args_ann = (
+            sig.parameters[ARGS_PARAM].annotation
+            if ARGS_PARAM in sig.parameters
+            else None
+        )
+        self._args_model: Optional[Type[BaseModel]] = (
+            args_ann
+            if inspect.isclass(args_ann) and issubclass(args_ann, BaseModel)
+            else None
+        )
+        self._adapter = _make_adapter(
+            f"{getattr(guard_fn, '__name__', 'guard')}_args",
+            {p.name: sig.parameters[p.name].annotation for p in self._value_params},
+        )
+
+    @property
+    def needs_api(self) -> bool:
+        return self._api_param is not None
+
+    def arg_keys(self, read_args: Iterable[str]) -> Optional[Tuple[str, ...]]:
+        """The keys of the tool call arguments that the given guard inputs come from.
+
+        Args:
+            read_args: Guard inputs, as in GuardTraits.read_args: names of plain
+                parameters, or of fields of the ``args`` model.
+
+        Returns:
+            The sorted keys, which include the aliases of the model fields, or
+            None if the source of an input is unknown (e.g. a property, or a
+            model that rewrites its input in a model validator).
+        """
+        keys = set()
+        value_params = {p.name for p in self._value_params}
+        for name in read_args:
+            if name in value_params:
+                keys.add(name)
+                continue
+            field_keys = self._field_keys(name)
+            if field_keys is None:
+                return None
+            keys.update(field_keys)
+        return tuple(sorted(keys))
+
+    def _field_keys(self, name: str) -> Optional[Tuple[str, ...]]:
+        model = self._args_model
+        if model is None or name not in model.model_fields:
+            return None
+        if any(
+            d.info.mode != "after"
+            for d in model.__pydantic_decorators__.model_validators.values()
+        ):
+            return None
+        field = model.model_fields[name]
+        keys = {name}
+        if field.alias is not None:
+            keys.add(field.alias)
+        alias = field.validation_alias
+        if isinstance(alias, str):
+            keys.add(alias)
+        elif isinstance(alias, AliasPath):
+            keys.add(str(alias.path[0]))
+        elif isinstance(alias, AliasChoices):
+            for choice in alias.choices:
+                keys.add(
+                    str(choice.path[0]) if isinstance(choice, AliasPath) else choice
+                )
+        return tuple(keys)
+
+    def bind(self, args: Dict[str, Any], api: Any = None) -> Dict[str, Any]:
+        """Validate the tool call arguments and return the guard keyword arguments.
+
+        Args:
+            args: The tool call arguments.
+            api: The API instance injected into the ``api`` parameter, if any.
+
+        Returns:
+            The keyword arguments for calling the guard function. Missing arguments
+            are bound to ``None``.
+
+        Raises:
+            pydantic.ValidationError: If an argument does not match its annotation.
+        """
+        values = {}
+        for param in self._value_params:
+            arg_val = args.get(param.name)
+            if arg_val is None and param.kind == ParamKind.ARGS:
+                arg_val = args
+            if arg_val is not None:
+                values[param.name] = arg_val
+
+        # from_attributes lets callers pass objects of their own (structurally
+        # compatible) classes where a domain model is expected
+        guard_args = self._adapter.validate_python(values, from_attributes=True)
+        for param in self._value_params:
+            guard_args.setdefault(param.name, None)
+        if self._api_param is not None:
+            guard_args[self._api_param] = api
+        return guard_args
+
+
+def _param_kind(p_name: str) -> ParamKind:
+    if p_name == API_PARAM:
+        return ParamKind.API
+    if p_name == ARGS_PARAM:
+        return ParamKind.ARGS
+    return ParamKind.VALUE
+
+
+def _make_adapter(name: str, annotations: Dict[str, Any]) -> TypeAdapter:
+    fields = {
+        p_name: ann if _mentions_model(ann) else Any
+        for p_name, ann in annotations.items()
+    }
+    try:
+        return TypeAdapter(_typed_dict(name, fields))
+    except (PydanticSchemaGenerationError, PydanticUndefinedAnnotation):
+        # Fall back to no validation for the parameters pydantic cannot handle
+        for p_name, ann in fields.items():
+            try:
+                TypeAdapter(_typed_dict(name, {p_name: ann}))
+            except (PydanticSchemaGenerationError, PydanticUndefinedAnnotation):
+                fields[p_name] = Any
+        return TypeAdapter(_typed_dict(name, fields))
+
+
+def _mentions_model(annotation: Any) -> bool:
+    """Whether a pydantic model appears in an annotation, e.g. `list[Model | dict]`."""
+    if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+        return True
+    return any(_mentions_model(arg) for arg in get_args(annotation))
+
+
+def _typed_dict(name: str, fields: Dict[str, Any]) -> type:
+    td = TypedDict(name, fields, total=False)  # type: ignore[misc]
+    td.__pydantic_config__ = _BINDING_CONFIG  # type: ignore[attr-defined]
+    return td
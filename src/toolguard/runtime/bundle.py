@@ -0,0 +1,110 @@
+import importlib.util
+import marshal
+from pathlib import Path
+from types import CodeType
+from typing import Any, List, Optional, Tuple
+
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.manifest import (
+    RuntimeManifest,
+    file_to_module_name,
+    result_module_files,
+)
+from toolguard.runtime.runtime import ToolguardRuntime
+
+BUNDLE_FILENAME = Path("toolguards.bundle")
+
+_FORMAT = b"TGBUNDLE1\n"
+_FORMAT_VERSION = 1
+
+
+def write_toolguards_bundle(
+    result: ToolGuardsCodeGenerationResult, path: str | Path
+) -> Path:
+    """Compile generated tool guards into a single bundle file.
+
+    The bundle holds the runtime manifest, and the domain, item guard and tool
+    guard modules as bytecode (and as source, used if the bundle is loaded by
+    another Python version). Load it with load_toolguards_bundle.
+
+    Args:
+        result: The toolguards code generation result.
+        path: The bundle file to write.
+
+    Returns:
+        Path: The bundle file.
+    """
+    modules = [
+        (
+            file_to_module_name(file_twin.file_name),
+            str(file_twin.file_name),
+            marshal.dumps(compile(file_twin.content, str(file_twin.file_name), "exec")),
+            file_twin.content,
+        )
+        for file_twin in result_module_files(result)
+    ]
+    payload = {
+        "version": _FORMAT_VERSION,
+        "magic": importlib.util.MAGIC_NUMBER,
+        "manifest": RuntimeManifest.from_result(result).model_dump(mode="json"),
+        "modules": modules,
+    }
+    path = Path(path)
+    path.write_bytes(_FORMAT + marshal.dumps(payload))
+    return path
+
+
+def load_toolguards_bundle(path: str | Path, **kwargs: Any) -> ToolguardRuntime:
+    """Load toolguards from a bundle file, written by write_toolguards_bundle.
+
+    The bundle is read at once, and its modules are executed from bytecode, with
+    no file system imports.
+
+    Args:
+        path: The bundle file.
+        **kwargs: Additional runtime options, see ToolguardRuntime.
+
+    Returns:
+        ToolguardRuntime: A runtime instance for executing toolguards.
+    """
+    manifest, modules = read_toolguards_bundle(path)
+    return ToolguardRuntime(manifest, compiled_modules=modules, **kwargs)
+
+
+def read_toolguards_bundle(
+    path: str | Path,
+) -> Tuple[RuntimeManifest, List[Tuple[str, CodeType]]]:
+    """Read a bundle file.
+
+    Returns:
+        The runtime manifest, and the (module name, code) pairs in loading order.
+
+    Raises:
+        ValueError: If the file is not a toolguards bundle.
+    """
+    data = Path(path).read_bytes()
+    if not data.startswith(_FORMAT):
+        raise ValueError(f"{path} is not a toolguards bundle")
+    try:
+        payload = marshal.loads(memoryview(data)[len(_FORMAT) :])
+    except (EOFError, ValueError, TypeError) as e:
+        raise ValueError(f"Corrupted toolguards bundle {path}") from e
+    if payload.get("version") != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported toolguards bundle version in {path}")
+
+    same_python = payload["magic"] == importlib.util.MAGIC_NUMBER
+    modules = [
+        (mod_name, _code(same_python, bytecode, source, file_name))
+        for mod_name, file_name, bytecode, source in payload["modules"]
+    ]
+    return RuntimeManifest.model_validate(payload["manifest"]), modules
+
+
+def _code(same_python: bool, bytecode: bytes, source: str, file_name: str) -> CodeType:
+    code: Optional[CodeType] = None
+    if same_python:
+        try:
+            code = marshal.loads(bytecode)
+        except (EOFError, ValueError, TypeError):
+            code = None
+    return code or compile(source, file_name, "exec")
@@ -0,0 +1,43 @@
+import json
+from typing import Any, Dict, Hashable, Optional
+
+from pydantic_core import PydanticSerializationError, to_jsonable_python
+
+
+def canonical_json(value: Any) -> Optional[str]:
+    """Serialize a value into a canonical JSON string.
+
+    Dictionary keys are sorted and pydantic models, dataclasses, dates, enums etc.
+    are converted to their JSON representation, so equal values produce equal strings.
+
+    Args:
+        value: The value to serialize.
+
+    Returns:
+        The canonical JSON string, or None if the value cannot be serialized.
+    """
+    try:
+        return json.dumps(
+            to_jsonable_python(value),
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+    except (PydanticSerializationError, TypeError, ValueError):
+        return None
+
+
+def call_key(toolname: str, arguments: Dict[str, Any]) -> Optional[Hashable]:
+    """Key identifying a tool invocation by its name and canonicalized arguments.
+
+    Args:
+        toolname: The name of the invoked tool.
+        arguments: The invocation arguments.
+
+    Returns:
+        A hashable key, or None if the arguments cannot be canonicalized.
+    """
+    args_json = canonical_json(arguments)
+    if args_json is None:
+        return None
+    return (toolname, args_json)
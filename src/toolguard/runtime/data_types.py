@@ -1,9 +1,7 @@
-import inspect
 import json
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, List, Type, TypeVar
-from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type, TypeVar
 from pydantic import BaseModel, Field, ValidationError
 
 from toolguard.runtime.rules import current_rule
@@ -48,33 +46,54 @@ class PotentialPolicyViolationException(PolicyViolationException):
     pass
 
 
-async def assert_any_condition_met(*checks: Callable[[], bool | Awaitable[bool]]):
-    collected_exceptions = []
-    for check in checks:
-        try:
-            result = check()
-            if inspect.isawaitable(result):
-                result = await result
+class GuardUnavailableException(PolicyViolationException):
+    """Raised when the guard of a fail-closed tool cannot reach a verdict, for
+    example because an API it uses is unavailable.
+
+    The tool call is blocked, as for a policy violation, since its guard could
+    not be evaluated.
+    """
+
+    def __init__(self, tool_name: str, reason: str):
+        super().__init__(f"The guard of tool '{tool_name}' {reason}")
+        self.tool_name = tool_name
+        self.reason = reason
+        self._rule = (tool_name,)
+
+    def __reduce__(self):
+        # picklable, to be sent back from guard worker processes
+        return type(self), (self.tool_name, self.reason), self.__dict__
+
+
+class GuardTimeoutException(GuardUnavailableException):
+    """Raised when the guard of a fail-closed tool does not finish before its deadline."""
+
+    def __init__(self, tool_name: str, timeout: float):
+        super().__init__(tool_name, f"timed out after {timeout:.3f} seconds")
+        self.timeout = timeout
+
+    def __reduce__(self):
+        return type(self), (self.tool_name, self.timeout), self.__dict__
 
-            if result:
-                return
 
-        except Exception as ex:
-            collected_exceptions.append(ex)
-            logger.warning(
-                "Condition failed, ignoring",
-                extra={
-                    "check": getattr(check, "__name__", repr(check)),
-                    "error": str(ex),
-                },
-            )
-            continue
+async def assert_any_condition_met(
+    *checks: Callable[[], bool | Awaitable[bool]], mode: Optional[str] = None
+):
+    """Pass if any of the conditions is met, or raise a policy violation.
 
-    if collected_exceptions:
-        raise collected_exceptions[0]
+    If no condition is met, the error raised by the first failing condition (by
+    position) is raised; if none failed, a PolicyViolationException.
 
-    msg = "No conditions met"
-    raise PolicyViolationException(msg)
+    Args:
+        *checks: The conditions, which return (or resolve to) a bool.
+        mode: How to evaluate the conditions (see ConditionsMode). Defaults to
+            one after the other, in order. Overridden by the runtime's mode, if
+            one is set.
+    """
+    # the modes live with the item guards modes, which import this module
+    from toolguard.runtime.item_guards import ConditionsMode, run_conditions
+
+    await run_conditions(checks, mode or ConditionsMode.SEQUENTIAL)
 
 
 class IToolInvoker(ABC):  # pylint: disable=too-few-public-methods
@@ -203,12 +222,35 @@ class RuntimeDomain(Domain):
         return Domain.model_validate(self.model_dump())
 
 
+class GuardTraits(BaseModel):
+    """Statically detected properties of a guard function."""
+
+    rule_name: str = Field(..., description="Name of the rule the guard enforces.")
+    uses_api: bool = Field(
+        ..., description="Whether the guard references its api parameter."
+    )
+    read_args: Optional[List[str]] = Field(
+        None,
+        description="The tool call arguments that the guard reads, or None if "
+        "unknown (e.g. the args object is used as a whole).",
+    )
+    deterministic: bool = Field(
+        False,
+        description="Whether the guard reads no clock and no random numbers, and "
+        "calls no function that the analysis cannot check (e.g. an imported one).",
+    )
+
+
 class ToolGuardCodeResult(BaseModel):
     tool: ToolGuardSpec
     guard_fn_name: str
     guard_file: FileTwin
     item_guard_files: List[FileTwin | None]
     test_files: List[FileTwin | None]
+    guard_traits: Dict[str, GuardTraits] = Field(
+        default_factory=dict,
+        description="Traits of the item guard functions, by function name.",
+    )
 
 
 class ToolGuardsCodeGenerationResult(BaseModel):
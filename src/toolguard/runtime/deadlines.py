@@ -0,0 +1,19 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+#: Context variable with the deadline of the current guard evaluation, as a
+#: `time.monotonic()` reading, or None if there is none. It is set while the
+#: guard runs, so tool invokers can bound their own I/O by it (see remaining_time).
+current_deadline: ContextVar[Optional[float]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left until the deadline of the current guard evaluation (0 if it
+    passed), or None if there is no deadline."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
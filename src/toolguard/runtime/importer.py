@@ -0,0 +1,165 @@
+import builtins
+import importlib
+import importlib.abc
+import importlib.util
+import itertools
+import sys
+from importlib.machinery import ModuleSpec
+from types import CodeType, ModuleType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+#: The source of a module: (file name, source code or compiled code).
+ModuleSource = Tuple[str, str | CodeType]
+
+_prefixes = itertools.count()
+
+
+class GuardModulesImporter(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Imports generated modules on demand, under a private namespace.
+
+    Modules are known by their logical names (e.g. `airline.i_airline`), and are
+    imported as `<prefix>.<logical name>`, so several sets of generated modules
+    with the same names can be loaded side by side. Within these modules,
+    absolute imports of logical names are redirected to the same namespace.
+
+    A module is compiled and executed only when it is first imported. Install
+    the importer before importing (`install()`), and remove it, with all its
+    loaded modules, by `uninstall()`.
+
+    Modules of other importers can be shared: imports of their logical names
+    are redirected to the given qualified names (`from` imports only).
+
+    Args:
+        modules: The module sources, by logical module name.
+        prefix: The namespace of the imported modules. Unique by default.
+        shared: Qualified names of modules imported by another importer, by
+            logical module name.
+    """
+
+    def __init__(
+        self,
+        modules: Mapping[str, ModuleSource],
+        prefix: Optional[str] = None,
+        shared: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.prefix = prefix or f"_toolguard_{next(_prefixes)}"
+        self._modules = dict(modules)
+        self._shared = dict(shared or {})
+        self._packages: Set[str] = {
+            name.rsplit(".", i)[0]
+            for name in self._modules
+            for i in range(1, name.count(".") + 1)
+        }
+        self._roots = {
+            name.partition(".")[0] for name in [*self._modules, *self._shared]
+        }
+        self._builtins: Dict[str, Any] = dict(vars(builtins))
+        self._builtins["__import__"] = self._import
+
+    @classmethod
+    def from_code(
+        cls,
+        modules: Sequence[Tuple[str, CodeType]],
+        prefix: Optional[str] = None,
+        shared: Optional[Mapping[str, str]] = None,
+    ) -> "GuardModulesImporter":
+        """An importer of precompiled modules, given as (logical name, code) pairs."""
+        return cls(
+            {name: (code.co_filename, code) for name, code in modules}, prefix, shared
+        )
+
+    def __contains__(self, logical_name: str) -> bool:
+        return logical_name in self._modules
+
+    @property
+    def sources(self) -> Dict[str, ModuleSource]:
+        """The module sources, by logical module name."""
+        return dict(self._modules)
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        """Remove the importer, and unload all the modules it imported."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        for name in self._loaded_names():
+            del sys.modules[name]
+
+    def qualified_name(self, logical_name: str) -> str:
+        return self._shared.get(logical_name) or f"{self.prefix}.{logical_name}"
+
+    def import_module(self, logical_name: str) -> ModuleType:
+        """Import a module by its logical name."""
+        return importlib.import_module(self.qualified_name(logical_name))
+
+    def loaded_module(self, logical_name: str) -> Optional[ModuleType]:
+        """The module of a logical name, if it was imported."""
+        return sys.modules.get(self.qualified_name(logical_name))
+
+    def adopt(self, logical_name: str, module: ModuleType) -> None:
+        """Use an already imported module (e.g. the same module of a previous
+        version) for a logical name, instead of importing it again.
+
+        The importer must be installed.
+        """
+        qualified_name = self.qualified_name(logical_name)
+        sys.modules[qualified_name] = module
+        parent, _, child = qualified_name.rpartition(".")
+        setattr(importlib.import_module(parent), child, module)
+
+    def loaded_modules(self) -> List[str]:
+        """The logical names of the modules imported so far."""
+        start = len(self.prefix) + 1
+        return [
+            name[start:]
+            for name in self._loaded_names()
+            if name[start:] in self._modules
+        ]
+
+    def _loaded_names(self) -> List[str]:
+        return [
+            name
+            for name in list(sys.modules)
+            if name == self.prefix or name.startswith(self.prefix + ".")
+        ]
+
+    # MetaPathFinder
+    def find_spec(self, fullname, path=None, target=None) -> Optional[ModuleSpec]:
+        if fullname == self.prefix:
+            return importlib.util.spec_from_loader(fullname, self, is_package=True)
+        if not fullname.startswith(self.prefix + "."):
+            return None
+        logical_name = fullname[len(self.prefix) + 1 :]
+        if logical_name not in self._modules and logical_name not in self._packages:
+            return None
+        return importlib.util.spec_from_loader(
+            fullname, self, is_package=logical_name in self._packages
+        )
+
+    # Loader
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return None  # default module creation
+
+    def exec_module(self, module: ModuleType) -> None:
+        module.__dict__["__builtins__"] = self._builtins
+        source = self._modules.get(module.__name__[len(self.prefix) + 1 :])
+        if source is None:  # a package with no code of its own
+            return
+        file_name, code = source
+        if isinstance(code, str):
+            code = compile(code, file_name, "exec")
+        exec(code, module.__dict__)
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        root = name.partition(".")[0]
+        if level != 0 or root not in self._roots:
+            return builtins.__import__(name, globals, locals, fromlist, level)
+        module = builtins.__import__(
+            self.qualified_name(name), globals, locals, fromlist, 0
+        )
+        if fromlist:
+            return module
+        # `import a.b` binds `a`
+        return sys.modules[self.qualified_name(root)]
@@ -0,0 +1,346 @@
+import asyncio
+import inspect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+from loguru import logger
+
+from toolguard.runtime.data_types import PolicyViolationException
+
+ItemGuard = Callable[..., Awaitable[Any]]
+Condition = Callable[[], bool | Awaitable[bool]]
+
+
+class ItemGuardsMode(str, Enum):
+    """How a tool guard runs its policy item guards.
+
+    Attributes:
+        PARALLEL: Run all item guards concurrently (like `asyncio.gather`). The
+            first violation is raised right away, while the other item guards
+            keep running in the background.
+        FAIL_FAST: Run all item guards concurrently. On the first violation, cancel
+            the remaining item guards (and their in-flight API calls) and raise it.
+        COST_AWARE: First run the cheap (argument-only) item guards, one by one.
+            Only if they all pass, run the API-dependent ones as in FAIL_FAST.
+            Within each group, the items most likely to be violated per unit of
+            latency run first. See ItemGuardsCostModel.
+        SEQUENTIAL: Run the item guards one after the other, in order, and stop at
+            the first violation. Item guards that do not await I/O then complete
+            without suspending, so they can be run without an event loop.
+    """
+
+    PARALLEL = "parallel"
+    FAIL_FAST = "fail_fast"
+    COST_AWARE = "cost_aware"
+    SEQUENTIAL = "sequential"
+
+
+@dataclass
+class RuleStats:
+    """Observed outcomes of an item guard.
+
+    Attributes:
+        calls: Number of completed evaluations.
+        violations: Number of evaluations that raised a PolicyViolationException.
+        mean_latency: Exponential moving average of the latency, in seconds.
+    """
+
+    calls: int = 0
+    violations: int = 0
+    mean_latency: float = 0.0
+
+    @property
+    def violation_rate(self) -> float:
+        # Laplace smoothing: unknown rules start at 0.5
+        return (self.violations + 1) / (self.calls + 2)
+
+
+class ConditionsMode(str, Enum):
+    """How `assert_any_condition_met` evaluates its conditions.
+
+    Attributes:
+        SEQUENTIAL: Evaluate the conditions one after the other, in order, and
+            stop at the first one that is met.
+        RACE: Start all the conditions concurrently. As soon as one is met,
+            cancel the others (and their in-flight API calls).
+        COST_ORDERED: Evaluate the conditions one after the other, the ones most
+            likely to be met per unit of latency first. See ItemGuardsCostModel.
+    """
+
+    SEQUENTIAL = "sequential"
+    RACE = "race"
+    COST_ORDERED = "cost_ordered"
+
+
+class ItemGuardsCostModel:
+    """Classifies and orders item guards for the COST_AWARE mode.
+
+    An item guard is cheap if it is statically known not to use the api, or,
+    when there is no static information, if its measured mean latency is below
+    `cheap_latency`. Items are ordered by violation rate divided by mean latency,
+    so that the items most likely to short-circuit the evaluation run first.
+
+    The COST_ORDERED conditions mode uses the same model, keyed by the code of
+    the conditions, with a met condition counted as a violation: both end the
+    evaluation early.
+
+    Args:
+        api_free: Static classification, by item guard function: True if the item
+            guard only inspects the tool call arguments.
+        cheap_latency: Latency, in seconds, under which an unclassified item guard
+            is considered cheap.
+        min_samples: Number of observations needed before classifying an item guard
+            by its latency.
+        smoothing: Weight of the newest observation in the latency moving average.
+    """
+
+    def __init__(
+        self,
+        api_free: Optional[Mapping[ItemGuard, bool]] = None,
+        cheap_latency: float = 0.001,
+        min_samples: int = 5,
+        smoothing: float = 0.2,
+    ) -> None:
+        self._api_free = dict(api_free or {})
+        self._cheap_latency = cheap_latency
+        self._min_samples = min_samples
+        self._smoothing = smoothing
+        self._stats: Dict[Hashable, RuleStats] = {}
+
+    def classify(self, item: ItemGuard, api_free: bool) -> None:
+        """Set the static classification of an item guard."""
+        self._api_free[item] = api_free
+
+    def stats(self, item: Hashable) -> RuleStats:
+        """A snapshot of the observations of an item guard."""
+        stats = self._stats.get(item)
+        return RuleStats(**vars(stats)) if stats else RuleStats()
+
+    def is_cheap(self, item: ItemGuard) -> bool:
+        api_free = self._api_free.get(item)
+        if api_free is not None:
+            return api_free
+        stats = self._stats.get(item)
+        return (
+            stats is not None
+            and stats.calls >= self._min_samples
+            and stats.mean_latency < self._cheap_latency
+        )
+
+    def priority(self, item: Hashable) -> float:
+        stats = self._stats.get(item) or RuleStats()
+        return stats.violation_rate / max(stats.mean_latency, 1e-6)
+
+    def order(self, items: Sequence[ItemGuard]) -> List[ItemGuard]:
+        return sorted(items, key=self.priority, reverse=True)
+
+    def observe(self, item: Hashable, latency: float, violated: bool) -> None:
+        stats = self._stats.setdefault(item, RuleStats())
+        if stats.calls == 0:
+            stats.mean_latency = latency
+        else:
+            stats.mean_latency += self._smoothing * (latency - stats.mean_latency)
+        stats.calls += 1
+        if violated:
+            stats.violations += 1
+
+
+#: Context variable with the mode selected when loading the runtime. When set, it
+#: overrides the mode the tool guards were generated with.
+current_item_guards_mode: ContextVar[Optional[ItemGuardsMode]] = ContextVar(
+    "current_item_guards_mode", default=None
+)
+
+#: Context variable with the conditions mode selected when loading the runtime. When
+#: set, it overrides the mode passed to `assert_any_condition_met`.
+current_conditions_mode: ContextVar[Optional[ConditionsMode]] = ContextVar(
+    "current_conditions_mode", default=None
+)
+
+#: Context variable with the cost model of the current runtime.
+current_cost_model: ContextVar[Optional[ItemGuardsCostModel]] = ContextVar(
+    "current_cost_model", default=None
+)
+
+#: Used by the COST_AWARE mode outside of a runtime that provides its own model.
+_default_cost_model = ItemGuardsCostModel()
+
+
+async def run_item_guards(
+    items: Sequence[Callable[..., Awaitable[Any]]],
+    *args: Any,
+    mode: ItemGuardsMode | str = ItemGuardsMode.PARALLEL,
+) -> None:
+    """Run the item guards of a tool guard.
+
+    Used by the generated tool guards. Each item guard is called with the same
+    positional arguments (the api followed by the tool call arguments).
+
+    Args:
+        items: The item guard functions.
+        *args: The arguments passed to every item guard.
+        mode: The mode selected at build time. Overridden by the runtime's mode,
+            if one is set.
+
+    Raises:
+        PolicyViolationException: If an item guard detects a policy violation.
+    """
+    mode = ItemGuardsMode(current_item_guards_mode.get() or mode)
+    if mode == ItemGuardsMode.FAIL_FAST:
+        await _run_fail_fast([item(*args) for item in items])
+    elif mode == ItemGuardsMode.COST_AWARE:
+        await _run_cost_aware(items, args)
+    elif mode == ItemGuardsMode.SEQUENTIAL:
+        for item in items:
+            await item(*args)
+    else:
+        await asyncio.gather(*[item(*args) for item in items])
+
+
+async def _run_fail_fast(coros: Sequence[Awaitable[Any]]) -> None:
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    if not tasks:
+        return
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        # On the first failure, or if we are cancelled ourselves
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    failed = [t for t in tasks if t in done and not t.cancelled() and t.exception()]
+    if failed:
+        raise failed[0].exception()  # type: ignore[misc]
+
+
+async def _run_cost_aware(items: Sequence[ItemGuard], args: Sequence[Any]) -> None:
+    model = current_cost_model.get() or _default_cost_model
+    ordered = model.order(items)
+    cheap = [item for item in ordered if model.is_cheap(item)]
+    costly = [item for item in ordered if item not in cheap]
+    for item in cheap:
+        await _observed(model, item, args)
+    await _run_fail_fast([_observed(model, item, args) for item in costly])
+
+
+async def _observed(
+    model: ItemGuardsCostModel, item: ItemGuard, args: Sequence[Any]
+) -> None:
+    start = time.perf_counter()
+    try:
+        await item(*args)
+    except PolicyViolationException:
+        model.observe(item, time.perf_counter() - start, violated=True)
+        raise
+    model.observe(item, time.perf_counter() - start, violated=False)
+
+
+async def run_conditions(
+    checks: Sequence[Condition],
+    mode: ConditionsMode | str = ConditionsMode.SEQUENTIAL,
+) -> None:
+    """Pass if any of the conditions is met, see `assert_any_condition_met`.
+
+    Args:
+        checks: The conditions, which return (or resolve to) a bool.
+        mode: The mode requested by the guard. Overridden by the runtime's mode,
+            if one is set.
+
+    Raises:
+        Exception: If no condition is met, the error of the first condition that
+            failed (by position), if any.
+        PolicyViolationException: If no condition is met, and none failed.
+    """
+    mode = ConditionsMode(current_conditions_mode.get() or mode)
+    errors: Dict[int, Exception] = {}
+    if mode == ConditionsMode.RACE:
+        met = await _race_conditions(checks, errors)
+    elif mode == ConditionsMode.COST_ORDERED:
+        met = await _cost_ordered_conditions(checks, errors)
+    else:
+        met = False
+        for index, check in enumerate(checks):
+            if await _condition(check, index, errors):
+                met = True
+                break
+    if met:
+        return
+    if errors:
+        raise errors[min(errors)]
+    raise PolicyViolationException("No conditions met")
+
+
+async def _condition(
+    check: Condition, index: int, errors: Dict[int, Exception]
+) -> bool:
+    try:
+        result = check()
+        if inspect.isawaitable(result):
+            result = await result
+        return bool(result)
+    except Exception as ex:
+        errors[index] = ex
+        logger.warning(
+            "Condition failed, ignoring",
+            extra={
+                "check": getattr(check, "__name__", repr(check)),
+                "error": str(ex),
+            },
+        )
+        return False
+
+
+async def _race_conditions(
+    checks: Sequence[Condition], errors: Dict[int, Exception]
+) -> bool:
+    tasks = [
+        asyncio.ensure_future(_condition(check, index, errors))
+        for index, check in enumerate(checks)
+    ]
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            if any(task.result() for task in done):
+                return True
+        return False
+    finally:
+        # On the first met condition, or if we are cancelled ourselves
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _cost_ordered_conditions(
+    checks: Sequence[Condition], errors: Dict[int, Exception]
+) -> bool:
+    model = current_cost_model.get() or _default_cost_model
+    # conditions are usually closures, created anew on every call
+    keys = [getattr(check, "__code__", check) for check in checks]
+    order = sorted(
+        range(len(checks)), key=lambda i: model.priority(keys[i]), reverse=True
+    )
+    for index in order:
+        start = time.perf_counter()
+        met = await _condition(checks[index], index, errors)
+        model.observe(keys[index], time.perf_counter() - start, violated=met)
+        if met:
+            return True
+    return False
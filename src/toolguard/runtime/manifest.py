@@ -0,0 +1,260 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel, Field, ValidationError
+
+from toolguard.runtime.analysis import (
+    LOOP_FREE_AWAITABLES,
+    analyze_guard_module,
+    analyze_tool_guard,
+    awaits_only,
+)
+from toolguard.runtime.data_types import (
+    RESULTS_FILENAME,
+    FileTwin,
+    GuardTraits,
+    ToolGuardCodeResult,
+    ToolGuardsCodeGenerationResult,
+)
+
+MANIFEST_FILENAME = Path("runtime_manifest.json")
+
+
+def file_to_module_name(file_path: str | Path) -> str:
+    return str(file_path).removesuffix(".py").replace("/", ".")
+
+
+def module_to_file_name(module_name: str) -> Path:
+    return Path(*module_name.split(".")).with_suffix(".py")
+
+
+def module_hash(content: str) -> str:
+    """The content hash of a module source."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def result_module_files(result: ToolGuardsCodeGenerationResult) -> List[FileTwin]:
+    """The modules of a code generation result, in loading order."""
+    domain = result.domain
+    files = [domain.app_types, domain.app_api, domain.app_api_impl]
+    for tool_result in result.tools.values():
+        # first the items, then the tool guard
+        files.extend(f for f in tool_result.item_guard_files if f is not None)
+        files.append(tool_result.guard_file)
+    return [f for f in files if str(f.file_name).endswith(".py")]
+
+
+class ToolManifest(BaseModel):
+    """What the runtime needs to know about the guard of one tool."""
+
+    guard_module: str = Field(..., description="Module of the tool guard function.")
+    guard_fn_name: str = Field(..., description="Name of the tool guard function.")
+    item_modules: List[str] = Field(
+        default_factory=list, description="Modules of the item guard functions."
+    )
+    guard_traits: Dict[str, GuardTraits] = Field(
+        default_factory=dict,
+        description="Traits of the item guard functions, by function name.",
+    )
+    pure: bool = Field(
+        False,
+        description="Whether the verdict of the guard depends only on the tool call "
+        "arguments: no API calls, clock or random numbers.",
+    )
+    read_args: Optional[List[str]] = Field(
+        None,
+        description="The tool call arguments that the guard and its item guards "
+        "read, or None if unknown.",
+    )
+
+    awaits_only_items: bool = Field(
+        False,
+        description="Whether the tool guard awaits nothing but run_item_guards, "
+        "assert_any_condition_met and its item guards.",
+    )
+
+    @property
+    def api_free(self) -> bool:
+        """Whether none of the item guards use the api (False if unknown)."""
+        return len(self.guard_traits) >= len(self.item_modules) and not any(
+            t.uses_api for t in self.guard_traits.values()
+        )
+
+    @property
+    def loop_free(self) -> bool:
+        """Whether the guard can run without an event loop: its item guards do
+        not use the api, and the tool guard awaits nothing else than them,
+        run_item_guards and assert_any_condition_met. False if unknown."""
+        return self.api_free and self.awaits_only_items
+
+    @classmethod
+    def from_result(cls, tool_result: ToolGuardCodeResult) -> "ToolManifest":
+        item_files = [f for f in tool_result.item_guard_files if f is not None]
+        traits = tool_result.guard_traits
+        if not traits:
+            # generated before the build recorded traits
+            traits = {
+                fn_name: fn_traits
+                for item_file in item_files
+                for fn_name, fn_traits in analyze_guard_module(
+                    item_file.content
+                ).items()
+            }
+        fn_traits = analyze_tool_guard(
+            tool_result.guard_file.content, tool_result.guard_fn_name, set(traits)
+        )
+        awaits_only_items = awaits_only(
+            tool_result.guard_file.content,
+            tool_result.guard_fn_name,
+            LOOP_FREE_AWAITABLES | set(traits),
+        )
+        pure = False
+        read_args = None
+        if fn_traits is not None and len(traits) >= len(item_files):
+            all_traits = [fn_traits, *traits.values()]
+            reads = [t.read_args for t in all_traits]
+            if all(r is not None for r in reads):
+                read_args = sorted({arg for r in reads for arg in r or ()})
+                pure = all(t.deterministic and not t.uses_api for t in all_traits)
+        return cls(
+            guard_module=file_to_module_name(tool_result.guard_file.file_name),
+            guard_fn_name=tool_result.guard_fn_name,
+            item_modules=[file_to_module_name(f.file_name) for f in item_files],
+            guard_traits=traits,
+            pure=pure,
+            read_args=read_args,
+            awaits_only_items=awaits_only_items,
+        )
+
+
+class ResultsFileStamp(BaseModel):
+    """Identifies the version of a results file."""
+
+    mtime_ns: int = Field(..., description="Modification time, in nanoseconds.")
+    sha256: str = Field(..., description="Content hash.")
+
+    @classmethod
+    def of(cls, path: Path) -> "ResultsFileStamp":
+        return cls(
+            mtime_ns=path.stat().st_mtime_ns,
+            sha256=hashlib.sha256(path.read_bytes()).hexdigest(),
+        )
+
+    def matches(self, path: Path) -> bool:
+        """Whether the file is still this version. The content is hashed only if
+        the file was modified (or copied) since."""
+        if path.stat().st_mtime_ns == self.mtime_ns:
+            return True
+        return hashlib.sha256(path.read_bytes()).hexdigest() == self.sha256
+
+
+class RuntimeManifest(BaseModel):
+    """A compact description of generated tool guards, enough to run them.
+
+    Unlike ToolGuardsCodeGenerationResult, it has no policy specifications or
+    source code. The build saves it next to the results file, and
+    load_toolguards reads it instead of the (much larger) results file, unless
+    the results file changed since (see is_current).
+    """
+
+    app_name: str = Field(..., description="Application name")
+    api_impl_module: str = Field(
+        ..., description="Module of the API implementation class."
+    )
+    api_impl_class_name: str = Field(
+        ..., description="Name of the API implementation class."
+    )
+    tools: Dict[str, ToolManifest] = Field(
+        default_factory=dict, description="The tool guards, by tool name."
+    )
+    module_hashes: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Content hash of each module, by module name, in loading order.",
+    )
+    results_file: Optional[ResultsFileStamp] = Field(
+        default=None,
+        description="The results file that the manifest was saved next to, or None "
+        "if there was none.",
+    )
+
+    @classmethod
+    def from_result(cls, result: ToolGuardsCodeGenerationResult) -> "RuntimeManifest":
+        return cls(
+            app_name=result.domain.app_name,
+            api_impl_module=file_to_module_name(result.domain.app_api_impl.file_name),
+            api_impl_class_name=result.domain.app_api_impl_class_name,
+            tools={
+                tool_name: ToolManifest.from_result(tool_result)
+                for tool_name, tool_result in result.tools.items()
+            },
+            module_hashes={
+                file_to_module_name(f.file_name): module_hash(f.content)
+                for f in result_module_files(result)
+            },
+        )
+
+    def save(
+        self,
+        directory: str | Path,
+        filename: str | Path = MANIFEST_FILENAME,
+        results_filename: str | Path = RESULTS_FILENAME,
+    ) -> "RuntimeManifest":
+        """Save the manifest, stamped with the results file of the directory.
+
+        Returns:
+            RuntimeManifest: The saved (stamped) manifest.
+        """
+        results_path = Path(directory) / results_filename
+        manifest = self.model_copy(
+            update={
+                "results_file": ResultsFileStamp.of(results_path)
+                if results_path.exists()
+                else None
+            }
+        )
+        full_path = Path(directory) / filename
+        full_path.write_text(manifest.model_dump_json(indent=2), encoding="utf-8")
+        return manifest
+
+    def is_current(
+        self, directory: str | Path, results_filename: str | Path = RESULTS_FILENAME
+    ) -> bool:
+        """Whether the results file of the directory is the one the manifest was
+        saved with, or there is none. Otherwise, the manifest may be stale."""
+        results_path = Path(directory) / results_filename
+        if not results_path.exists():
+            return True
+        return self.results_file is not None and self.results_file.matches(results_path)
+
+    @classmethod
+    def load_current(cls, directory: str | Path) -> Optional["RuntimeManifest"]:
+        """The manifest of a directory, or None if it has none, or if its results
+        file changed since the manifest was saved."""
+        if not (Path(directory) / MANIFEST_FILENAME).exists():
+            return None
+        manifest = cls.load(directory)
+        if not manifest.is_current(directory):
+            logger.warning(
+                "The runtime manifest is older than the results file, ignoring it",
+                extra={"directory": str(directory)},
+            )
+            return None
+        return manifest
+
+    def same_guards(self, other: "RuntimeManifest") -> bool:
+        """Whether both describe the same tool guards (wherever they were saved)."""
+        return self.model_copy(update={"results_file": None}) == other.model_copy(
+            update={"results_file": None}
+        )
+
+    @classmethod
+    def load(
+        cls, directory: str | Path, filename: str | Path = MANIFEST_FILENAME
+    ) -> "RuntimeManifest":
+        full_path = Path(directory) / filename
+        try:
+            return cls.model_validate_json(full_path.read_bytes())
+        except ValidationError as e:
+            raise ValueError(f"Invalid runtime manifest in {full_path}") from e
@@ -0,0 +1,303 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from toolguard.runtime.data_types import PolicyViolationException
+from toolguard.runtime.observers import GuardObserver
+from toolguard.runtime.tool_invokers.circuit_breaker import CircuitState
+
+#: Default histogram buckets, in seconds.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PASS = "pass"
+VIOLATION = "violation"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+ALLOWED = "allowed"
+BLOCKED = "blocked"
+
+
+class Histogram:
+    """A cumulative latency histogram, in the Prometheus style.
+
+    Args:
+        buckets: Upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def cumulative(self) -> List[int]:
+        """Number of observations less than or equal to each bucket bound."""
+        total = 0
+        result = []
+        for n in self.bucket_counts:
+            total += n
+            result.append(total)
+        return result
+
+
+def outcome_of(error: Optional[BaseException]) -> str:
+    """Classify the outcome of a rule: pass, violation, error or cancelled."""
+    if error is None:
+        return PASS
+    if isinstance(error, PolicyViolationException):
+        return VIOLATION
+    if isinstance(error, asyncio.CancelledError):
+        return CANCELLED
+    return ERROR
+
+
+_RuleKey = Tuple[str, str]  # (tool, rule); rule is "" for the tool guard itself
+_CallKey = Tuple[str, str, str]  # (tool, rule, invoked tool)
+
+
+class GuardMetrics(GuardObserver):
+    """Collects per-tool and per-rule metrics of the guard runtime.
+
+    Records, for each tool guard and each of its rules (policy item guards):
+    - latency histograms;
+    - outcome counts (pass, violation, error, cancelled);
+    - the number, latency and errors of the delegate invocations made by the rule;
+    - the number of tool guards that ran out of time, by whether the tool call
+      was allowed (fail-open) or blocked (fail-closed);
+    - the state transitions of the circuits of the invoked tools.
+
+    Register it as a runtime observer, and export the metrics with
+    `to_prometheus()`:
+
+        metrics = GuardMetrics()
+        with load_toolguards(path, observers=[metrics]) as toolguard:
+            ...
+        print(metrics.to_prometheus())
+
+    Args:
+        buckets: Upper bounds of the latency histogram buckets, in seconds.
+        namespace: Prefix of the exported metric names.
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = DEFAULT_BUCKETS, namespace: str = "toolguard"
+    ) -> None:
+        self._buckets = tuple(buckets)
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._latency: Dict[_RuleKey, Histogram] = {}
+        self._outcomes: Dict[_RuleKey, Dict[str, int]] = {}
+        self._calls: Dict[_CallKey, Histogram] = {}
+        self._call_errors: Dict[_CallKey, int] = defaultdict(int)
+        self._timeouts: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._transitions: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def rule_finished(self, rule, start, end, error) -> None:
+        key = _rule_key(rule)
+        with self._lock:
+            self._histogram(self._latency, key).observe(end - start)
+            outcomes = self._outcomes.setdefault(key, defaultdict(int))
+            outcomes[outcome_of(error)] += 1
+
+    def tool_invoked(self, rule, toolname, start, end, error) -> None:
+        key = _rule_key(rule) + (toolname,)
+        with self._lock:
+            self._histogram(self._calls, key).observe(end - start)
+            if error is not None:
+                self._call_errors[key] += 1
+
+    def guard_timed_out(self, tool_name, timeout, fail_open) -> None:
+        with self._lock:
+            self._timeouts[(tool_name, ALLOWED if fail_open else BLOCKED)] += 1
+
+    def circuit_state_changed(self, toolname, old, new) -> None:
+        with self._lock:
+            self._transitions[(toolname, CircuitState(new).value)] += 1
+
+    def latency(self, tool: str, rule: str = "") -> Optional[Histogram]:
+        """The latency histogram of a tool guard, or of one of its rules."""
+        return self._latency.get((tool, rule))
+
+    def outcomes(self, tool: str, rule: str = "") -> Dict[str, int]:
+        """The outcome counts of a tool guard, or of one of its rules."""
+        return dict(self._outcomes.get((tool, rule), {}))
+
+    def api_calls(self, tool: str, rule: str = "") -> Dict[str, Histogram]:
+        """Latency histograms of the delegate invocations of a rule, by invoked tool."""
+        return {
+            invoked: hist
+            for (t, r, invoked), hist in self._calls.items()
+            if (t, r) == (tool, rule)
+        }
+
+    def timeouts(self, tool: str) -> Dict[str, int]:
+        """The number of timed out guards of a tool, by action (allowed or blocked)."""
+        return {action: n for (t, action), n in self._timeouts.items() if t == tool}
+
+    def circuit_transitions(self, api: str) -> Dict[str, int]:
+        """The number of transitions of the circuit of an invoked tool, by new state."""
+        return {state: n for (t, state), n in self._transitions.items() if t == api}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timeouts.clear()
+            self._transitions.clear()
+            self._latency.clear()
+            self._outcomes.clear()
+            self._calls.clear()
+            self._call_errors.clear()
+
+    def to_prometheus(self) -> str:
+        """Export the metrics in the Prometheus text exposition format."""
+        ns = self._namespace
+        lines: List[str] = []
+        with self._lock:
+            guards = {k: v for k, v in self._latency.items() if not k[1]}
+            rules = {k: v for k, v in self._latency.items() if k[1]}
+
+            _histogram_family(
+                lines,
+                f"{ns}_guard_duration_seconds",
+                "Latency of tool guards.",
+                {_labels(tool=k[0]): h for k, h in guards.items()},
+            )
+            _counter_family(
+                lines,
+                f"{ns}_guard_outcomes_total",
+                "Outcomes of tool guards.",
+                {
+                    _labels(tool=k[0], outcome=outcome): n
+                    for k, counts in self._outcomes.items()
+                    if not k[1]
+                    for outcome, n in counts.items()
+                },
+            )
+            _histogram_family(
+                lines,
+                f"{ns}_rule_duration_seconds",
+                "Latency of policy rules.",
+                {_labels(tool=k[0], rule=k[1]): h for k, h in rules.items()},
+            )
+            _counter_family(
+                lines,
+                f"{ns}_rule_outcomes_total",
+                "Outcomes of policy rules.",
+                {
+                    _labels(tool=k[0], rule=k[1], outcome=outcome): n
+                    for k, counts in self._outcomes.items()
+                    if k[1]
+                    for outcome, n in counts.items()
+                },
+            )
+            _histogram_family(
+                lines,
+                f"{ns}_api_call_duration_seconds",
+                "Latency of delegate invocations, by the rule that made them.",
+                {
+                    _labels(tool=k[0], rule=k[1], api=k[2]): h
+                    for k, h in self._calls.items()
+                },
+            )
+            _counter_family(
+                lines,
+                f"{ns}_api_call_errors_total",
+                "Failed delegate invocations, by the rule that made them.",
+                {
+                    _labels(tool=k[0], rule=k[1], api=k[2]): n
+                    for k, n in self._call_errors.items()
+                },
+            )
+            _counter_family(
+                lines,
+                f"{ns}_guard_timeouts_total",
+                "Tool guards that ran out of time, by the action taken.",
+                {
+                    _labels(tool=tool, action=action): n
+                    for (tool, action), n in self._timeouts.items()
+                },
+            )
+            _counter_family(
+                lines,
+                f"{ns}_circuit_transitions_total",
+                "State transitions of the circuits of invoked tools, by new state.",
+                {
+                    _labels(api=api, state=state): n
+                    for (api, state), n in self._transitions.items()
+                },
+            )
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _histogram(self, histograms: Dict, key: Tuple) -> Histogram:
+        hist = histograms.get(key)
+        if hist is None:
+            hist = histograms[key] = Histogram(self._buckets)
+        return hist
+
+
+def _rule_key(rule: Tuple[str, ...]) -> _RuleKey:
+    if not rule:
+        return ("", "")
+    return (rule[0], "/".join(rule[1:]))
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_family(
+    lines: List[str], name: str, help: str, series: Dict[str, Histogram]
+) -> None:
+    if not series:
+        return
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, hist in sorted(series.items()):
+        for bound, n in zip(hist.buckets, hist.cumulative()):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {n}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+        lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+        lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+
+def _counter_family(
+    lines: List[str], name: str, help: str, series: Dict[str, int]
+) -> None:
+    if not series:
+        return
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, n in sorted(series.items()):
+        lines.append(f"{name}{{{labels}}} {n}")
@@ -0,0 +1,90 @@
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+
+class GuardObserver:
+    """Receives events from the evaluation of tool guards.
+
+    Observers are registered on the runtime (`load_toolguards(..., observers=[...])`).
+    Override the events of interest; the default implementations do nothing.
+    Times are `time.perf_counter()` readings, in seconds. Events are delivered
+    synchronously, from the evaluating task, so observers must be fast and must
+    not raise.
+    """
+
+    def rule_started(self, rule: Tuple[str, ...], start: float) -> None:
+        """A rule scope was entered.
+
+        Args:
+            rule: The rule path, see rule_finished.
+            start: When the rule started.
+        """
+
+    def rule_finished(
+        self,
+        rule: Tuple[str, ...],
+        start: float,
+        end: float,
+        error: Optional[BaseException],
+    ) -> None:
+        """A rule scope was exited.
+
+        Args:
+            rule: The rule path, starting with the tool guard (e.g. `(tool_name,)`
+                for the tool guard and `(tool_name, item_name)` for its item guards).
+            start: When the rule started.
+            end: When the rule finished.
+            error: The exception the rule raised, if any (a PolicyViolationException
+                for a violation).
+        """
+
+    def tool_invoked(
+        self,
+        rule: Tuple[str, ...],
+        toolname: str,
+        start: float,
+        end: float,
+        error: Optional[BaseException],
+    ) -> None:
+        """A guard invoked a tool through the delegate.
+
+        Args:
+            rule: The rule path that made the invocation.
+            toolname: The name of the invoked tool.
+            start: When the invocation started.
+            end: When the invocation finished.
+            error: The exception the invocation raised, if any.
+        """
+
+    def guard_timed_out(self, tool_name: str, timeout: float, fail_open: bool) -> None:
+        """The guard of a tool call ran out of time, and was cancelled.
+
+        Args:
+            tool_name: The name of the guarded tool.
+            timeout: The time budget of the guard, in seconds.
+            fail_open: Whether the tool call was allowed (or else blocked).
+        """
+
+    def circuit_state_changed(self, toolname: str, old: str, new: str) -> None:
+        """The circuit of an invoked tool changed state (see CircuitBreaker).
+
+        Args:
+            toolname: The name of the invoked tool.
+            old: The previous state (a CircuitState).
+            new: The new state.
+        """
+
+
+#: Context variable with the observers of the runtime evaluating the current guard.
+current_observers: ContextVar[Tuple[GuardObserver, ...]] = ContextVar(
+    "current_observers", default=()
+)
+
+#: A delegate invocation made by a guard: (invoked tool, start, end, error).
+ApiCall = Tuple[str, float, float, Optional[BaseException]]
+
+#: Context variable collecting the delegate invocations of the guard evaluation
+#: being audited (see AuditSink), or None if it is not audited.
+current_api_calls: ContextVar[Optional[List[ApiCall]]] = ContextVar(
+    "current_api_calls", default=None
+)
@@ -0,0 +1,497 @@
+import asyncio
+import itertools
+import marshal
+import multiprocessing
+import pickle
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar
+
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from toolguard.runtime.data_types import IToolInvoker
+from toolguard.runtime.deadlines import current_deadline
+from toolguard.runtime.importer import ModuleSource
+from toolguard.runtime.manifest import RuntimeManifest, module_to_file_name
+from toolguard.runtime.observers import GuardObserver, current_observers
+from toolguard.runtime.rules import current_rule
+
+T = TypeVar("T")
+
+# Messages, as tuples starting with their kind and the id of the guard call:
+#   parent -> worker: ("guard", call_id, tool_name, args)
+#                     ("result", call_id, invoke_id, ok, value or exception)
+#                     ("cancel", call_id)
+#                     ("stop", None)
+#   worker -> parent: ("invoke", call_id, invoke_id, toolname, arguments, rule)
+#                     ("done", call_id, exception or None, rule events)
+
+
+@dataclass(frozen=True)
+class WorkerSpec:
+    """What a worker process needs to load the tool guards.
+
+    Workers always load the modules from memory, so that they do not depend on
+    the import path they inherit.
+
+    Attributes:
+        manifest_json: The runtime manifest, as JSON.
+        modules: (module name, file name, source or marshalled code), in loading
+            order.
+    """
+
+    manifest_json: str
+    modules: Tuple[Tuple[str, str, str | bytes], ...] = ()
+
+    @classmethod
+    def of(
+        cls,
+        manifest: RuntimeManifest,
+        ctx_dir: Optional[Path],
+        sources: Optional[Dict[str, ModuleSource]],
+    ) -> "WorkerSpec":
+        """The spec of loaded modules, or of the modules of a directory."""
+        if sources is None:
+            assert ctx_dir is not None
+            sources = {}
+            for name in manifest.module_hashes:
+                file_name = ctx_dir / module_to_file_name(name)
+                sources[name] = (str(file_name), file_name.read_text())
+        return cls(
+            manifest.model_dump_json(),
+            modules=tuple(
+                (
+                    name,
+                    file_name,
+                    code if isinstance(code, str) else marshal.dumps(code),
+                )
+                for name, (file_name, code) in sources.items()
+            ),
+        )
+
+    def compiled_modules(self) -> List[Tuple[str, CodeType]]:
+        return [
+            (
+                name,
+                compile(code, file_name, "exec")
+                if isinstance(code, str)
+                else marshal.loads(code),
+            )
+            for name, file_name, code in self.modules
+        ]
+
+
+class GuardProcessPool:
+    """A warm pool of worker processes that evaluate tool guards.
+
+    Each worker loads and preloads all the tool guards when it starts. A guard
+    call is sent to the least busy worker, with the tool call arguments; the
+    API calls of the guard are sent back and made by the delegate of the
+    caller, in the calling process. Rule events of the worker are replayed to
+    the observers of the caller.
+
+    API results cross the process boundary as JSON-compatible data: the
+    delegate is called with `object` as return type, and the worker validates
+    the result against the actual return type.
+
+    Workers are started with the "spawn" method. A worker that exits, or whose
+    connection fails, is replaced on the next guard call; its calls in flight
+    fail. Exceptions that cannot be sent back from a worker are replaced by a
+    RemoteGuardError with the same type name and message.
+
+    Args:
+        spec: The tool guards to load.
+        size: Number of worker processes.
+        options: Runtime options of the workers (see ToolguardRuntime).
+        observers: The observers of the caller.
+    """
+
+    def __init__(
+        self,
+        spec: WorkerSpec,
+        size: int,
+        options: Dict[str, Any],
+        observers: Tuple[GuardObserver, ...] = (),
+    ) -> None:
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self._spec = spec
+        self._options = options
+        self._observers = observers
+        self._context = multiprocessing.get_context("spawn")
+        self._workers = [self._start_worker() for _ in range(size)]
+
+    def _start_worker(self) -> "_WorkerHandle":
+        return _WorkerHandle(
+            self._context, self._spec, self._options, bool(self._observers)
+        )
+
+    async def guard(self, tool_name: str, args: dict, delegate: IToolInvoker) -> None:
+        """Evaluate the guard of a tool call in a worker process.
+
+        Raises:
+            PolicyViolationException: If the guard detects a policy violation.
+        """
+        for i, worker in enumerate(self._workers):
+            if not worker.alive:
+                worker.close()
+                self._workers[i] = self._start_worker()
+        worker = min(self._workers, key=lambda w: w.load)
+        await worker.guard(tool_name, args, delegate, self._observers)
+
+    def close(self) -> None:
+        """Stop the worker processes, without waiting for them to exit."""
+        for worker in self._workers:
+            worker.close()
+
+
+@dataclass
+class _Call:
+    """A guard call in flight, in the calling process."""
+
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    delegate: IToolInvoker
+    observers: Tuple[GuardObserver, ...]
+    deadline: Optional[float] = None
+    invocations: Set[asyncio.Task] = field(default_factory=set)
+
+
+class _WorkerHandle:
+    """The calling side of a worker process."""
+
+    def __init__(
+        self,
+        context: Any,
+        spec: WorkerSpec,
+        options: Dict[str, Any],
+        record_rules: bool,
+    ) -> None:
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, spec, options, record_rules),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._send_lock = threading.Lock()
+        self._calls: Dict[int, _Call] = {}
+        self._ids = itertools.count()
+        self.alive = True
+        threading.Thread(target=self._read, daemon=True).start()
+
+    @property
+    def load(self) -> int:
+        return len(self._calls)
+
+    async def guard(
+        self,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        observers: Tuple[GuardObserver, ...],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        call = _Call(
+            loop, loop.create_future(), delegate, observers, current_deadline.get()
+        )
+        call_id = next(self._ids)
+        self._calls[call_id] = call
+        try:
+            self._send(("guard", call_id, tool_name, args))
+            error, events = await call.future
+        except asyncio.CancelledError:
+            try:
+                self._send(("cancel", call_id))
+            except OSError:  # the worker exited
+                pass
+            raise
+        finally:
+            del self._calls[call_id]
+            for task in call.invocations:
+                task.cancel()
+        for rule, start, end, rule_error in events:
+            for observer in observers:
+                observer.rule_finished(rule, start, end, rule_error)
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        if self.alive:
+            self.alive = False
+            try:
+                self._send(("stop", None))
+            except OSError:
+                pass
+        # may be called from an event loop: wait for the process elsewhere
+        threading.Thread(target=self._reap, daemon=True).start()
+
+    def _reap(self) -> None:
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.terminate()
+
+    def _send(self, message: tuple) -> None:
+        with self._send_lock:
+            self._conn.send(message)
+
+    def _read(self) -> None:
+        error: BaseException = RuntimeError("The guard worker process exited")
+        try:
+            while True:
+                try:
+                    message = self._conn.recv()
+                except (EOFError, OSError):
+                    break
+                kind, call_id = message[0], message[1]
+                call = self._calls.get(call_id)
+                if call is None:  # cancelled meanwhile
+                    continue
+                if kind == "done":
+                    _call_soon(call.loop, _set_result, call.future, message[2:])
+                elif kind == "invoke":
+                    _call_soon(call.loop, self._start_invocation, call, *message[1:])
+        except Exception as e:  # e.g. a message that cannot be unpickled
+            error = e
+
+        self.alive = False
+        self._conn.close()
+        for call in list(self._calls.values()):
+            _call_soon(call.loop, _set_exception, call.future, error)
+
+    def _start_invocation(self, call: _Call, *message: Any) -> None:
+        task = call.loop.create_task(self._invoke(call, *message))
+        call.invocations.add(task)
+        task.add_done_callback(call.invocations.discard)
+
+    async def _invoke(
+        self,
+        call: _Call,
+        call_id: int,
+        invoke_id: int,
+        toolname: str,
+        arguments: Dict[str, Any],
+        rule: Tuple[str, ...],
+    ) -> None:
+        current_observers.set(call.observers)
+        current_rule.set(rule)
+        current_deadline.set(call.deadline)
+        try:
+            value = await call.delegate.invoke(toolname, arguments, object)
+            reply = ("result", call_id, invoke_id, True, to_jsonable_python(value))
+        except Exception as e:
+            reply = ("result", call_id, invoke_id, False, _portable(e))
+        try:
+            self._send(reply)
+        except OSError:  # the worker exited
+            pass
+
+
+# The worker process
+
+
+_recorded_rules: ContextVar[Optional[list]] = ContextVar(
+    "_recorded_rules", default=None
+)
+
+
+class _RuleRecorder(GuardObserver):
+    """Records the rule events of the current guard call, to replay them in the
+    calling process."""
+
+    def rule_finished(self, rule, start, end, error) -> None:
+        events = _recorded_rules.get()
+        if events is not None:
+            events.append(
+                (rule, start, end, None if error is None else _portable(error))
+            )
+
+
+def _worker_main(
+    conn: Connection, spec: WorkerSpec, options: Dict[str, Any], record_rules: bool
+) -> None:
+    asyncio.run(_Worker(conn, spec, options, record_rules).serve())
+
+
+class _Worker:
+    def __init__(
+        self,
+        conn: Connection,
+        spec: WorkerSpec,
+        options: Dict[str, Any],
+        record_rules: bool,
+    ) -> None:
+        self._conn = conn
+        self._spec = spec
+        self._options = options
+        self._observers = (_RuleRecorder(),) if record_rules else ()
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._invocations: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._adapters: Dict[Any, TypeAdapter] = {}
+
+    async def serve(self) -> None:
+        from toolguard.runtime.runtime import ToolguardRuntime
+
+        runtime = ToolguardRuntime(
+            RuntimeManifest.model_validate_json(self._spec.manifest_json),
+            compiled_modules=self._spec.compiled_modules(),
+            observers=self._observers,
+            preload=True,
+            **self._options,
+        )
+        self._runtime = runtime
+        self._loop = asyncio.get_running_loop()
+        self._closed = self._loop.create_future()
+        with runtime:
+            threading.Thread(target=self._read, daemon=True).start()
+            await self._closed
+            for task in list(self._tasks.values()):
+                task.cancel()
+
+    def _read(self) -> None:
+        try:
+            while True:
+                try:
+                    message = self._conn.recv()
+                except (EOFError, OSError):
+                    break
+                _call_soon(self._loop, self._dispatch, message)
+        except Exception as e:  # e.g. a message that cannot be unpickled
+            _call_soon(self._loop, self._fail, e)
+        _call_soon(self._loop, _set_result, self._closed, None)
+
+    def _fail(self, error: BaseException) -> None:
+        """Fail the API calls in flight; the worker then exits, and is replaced."""
+        for future in self._invocations.values():
+            _set_exception(future, error)
+
+    def _dispatch(self, message: tuple) -> None:
+        kind, call_id = message[0], message[1]
+        if kind == "guard":
+            self._tasks[call_id] = self._loop.create_task(self._guard(*message[1:]))
+        elif kind == "result":
+            _, _, invoke_id, ok, value = message
+            future = self._invocations.pop(invoke_id, None)
+            if future is not None and not future.done():
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        elif kind == "cancel":
+            task = self._tasks.get(call_id)
+            if task is not None:
+                task.cancel()
+        elif kind == "stop":
+            _set_result(self._closed, None)
+
+    async def _guard(self, call_id: int, tool_name: str, args: dict) -> None:
+        events: list = []
+        _recorded_rules.set(events)
+        error: Optional[BaseException] = None
+        try:
+            await self._runtime.guard_toolcall(
+                tool_name, args, _ParentInvoker(self, call_id)
+            )
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            error = _portable(e)
+        finally:
+            del self._tasks[call_id]
+        self._conn.send(("done", call_id, error, events))
+
+    async def invoke(
+        self,
+        call_id: int,
+        toolname: str,
+        arguments: Dict[str, Any],
+        return_type: Type[T],
+    ) -> T:
+        invoke_id = next(self._ids)
+        future = self._invocations[invoke_id] = self._loop.create_future()
+        try:
+            self._conn.send(
+                (
+                    "invoke",
+                    call_id,
+                    invoke_id,
+                    toolname,
+                    arguments,
+                    current_rule.get(),
+                )
+            )
+            value = await future
+        finally:
+            self._invocations.pop(invoke_id, None)
+        if return_type in (None, object, Any):
+            return value
+        adapter = self._adapters.get(return_type)
+        if adapter is None:
+            adapter = self._adapters[return_type] = TypeAdapter(return_type)
+        return adapter.validate_python(value)
+
+
+class _ParentInvoker(IToolInvoker):
+    """Sends the API calls of a guard to the delegate of the calling process."""
+
+    def __init__(self, worker: _Worker, call_id: int) -> None:
+        self._worker = worker
+        self._call_id = call_id
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
+    ) -> T:
+        return await self._worker.invoke(
+            self._call_id, toolname, arguments, return_type
+        )
+
+
+class RemoteGuardError(RuntimeError):
+    """Stands in for an exception of another process that cannot be sent back.
+
+    Attributes:
+        type_name: The name of the type of the original exception.
+        message: The message of the original exception.
+    """
+
+    def __init__(self, type_name: str, message: str) -> None:
+        super().__init__(type_name, message)
+        self.type_name = type_name
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"{self.type_name}: {self.message}"
+
+
+def _portable(error: BaseException) -> BaseException:
+    """The error itself if it can be sent to another process, or a stand-in."""
+    try:
+        # some exceptions pickle, but cannot be rebuilt from their args
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RemoteGuardError(type(error).__name__, str(error))
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, fn: Any, *args: Any) -> None:
+    try:
+        loop.call_soon_threadsafe(fn, *args)
+    except RuntimeError:  # the loop is closed
+        pass
+
+
+def _set_result(future: asyncio.Future, value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
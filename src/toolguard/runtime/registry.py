@@ -0,0 +1,241 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Set
+
+from toolguard.runtime.data_types import (
+    FileTwin,
+    IToolInvoker,
+    ToolGuardsCodeGenerationResult,
+)
+from toolguard.runtime.importer import GuardModulesImporter
+from toolguard.runtime.manifest import RuntimeManifest, file_to_module_name
+from toolguard.runtime.runtime import ToolguardRuntime
+
+
+@dataclass
+class _SharedDomain:
+    """Domain modules loaded once for all the tenants with the same domain."""
+
+    importer: GuardModulesImporter
+    runtimes: Set[ToolguardRuntime] = field(default_factory=set)
+
+
+@dataclass
+class _TenantGuards:
+    """What a registered tenant needs to be loaded again: the manifest and
+    module sources of its guards, without the policies and tests."""
+
+    manifest: RuntimeManifest
+    domain_files: List[FileTwin]
+    guard_files: List[FileTwin]
+
+    @classmethod
+    def from_result(cls, result: ToolGuardsCodeGenerationResult) -> "_TenantGuards":
+        guard_files: List[FileTwin] = []
+        for tool_result in result.tools.values():
+            guard_files.extend(f for f in tool_result.item_guard_files if f is not None)
+            guard_files.append(tool_result.guard_file)
+        return cls(
+            manifest=RuntimeManifest.from_result(result),
+            domain_files=[
+                result.domain.app_types,
+                result.domain.app_api,
+                result.domain.app_api_impl,
+            ],
+            guard_files=guard_files,
+        )
+
+
+class ToolguardRegistry:
+    """Hosts the tool guards of many tenants (applications) in one process.
+
+    Each tenant registers its generated guards, which are loaded side by side
+    in isolated module namespaces, so tenants with the same module names do
+    not collide. Domain modules (API types, interface and implementation) with
+    identical content are loaded once and shared by the tenants.
+
+    A tenant's guards are loaded on first use. At most `max_loaded` tenants are
+    kept loaded: the least recently used one is unloaded when another tenant
+    is loaded, and is loaded again on its next use. Tenants with guard calls in
+    flight are not unloaded; if all of them are busy, the limit is exceeded
+    until their calls complete. Likewise, the guards a tenant replaces (or
+    unregisters) are unloaded once their calls in flight complete.
+
+    Only the manifest and module sources of the registered guards are kept,
+    not their policy specifications and tests.
+
+        with ToolguardRegistry(max_loaded=16) as registry:
+            registry.register("acme", acme_result)
+            await registry.guard_toolcall("acme", "add_user", args, delegate)
+
+    Identical in-flight API lookups (see the `coalesce_tools` runtime option)
+    are coalesced within each tenant, unless a `coalesce_scope` is given.
+
+    Args:
+        max_loaded: Maximal number of tenants loaded at the same time.
+        **runtime_options: Options of the tenant runtimes, see ToolguardRuntime.
+    """
+
+    def __init__(self, max_loaded: int = 32, **runtime_options: Any) -> None:
+        if max_loaded <= 0:
+            raise ValueError("max_loaded must be positive")
+        self.max_loaded = max_loaded
+        self._runtime_options = runtime_options
+        self._lock = threading.RLock()
+        self._guards: Dict[str, _TenantGuards] = {}
+        self._runtimes: OrderedDict[str, ToolguardRuntime] = OrderedDict()
+        self._domains: Dict[str, _SharedDomain] = {}
+        self._in_flight: Dict[ToolguardRuntime, int] = {}
+        # runtimes no longer used by new calls, unloaded once idle
+        self._retired: Set[ToolguardRuntime] = set()
+        self.loads = 0
+        self.evictions = 0
+
+    def __enter__(self) -> "ToolguardRegistry":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._guards
+
+    def __len__(self) -> int:
+        return len(self._guards)
+
+    def register(self, tenant: str, result: ToolGuardsCodeGenerationResult) -> None:
+        """Register (or replace) the guards of a tenant. They are loaded on first use."""
+        guards = _TenantGuards.from_result(result)
+        with self._lock:
+            self._unload(tenant)
+            self._guards[tenant] = guards
+
+    def unregister(self, tenant: str) -> None:
+        with self._lock:
+            self._unload(tenant)
+            del self._guards[tenant]
+
+    def loaded_tenants(self) -> List[str]:
+        """The loaded tenants, from the least to the most recently used."""
+        return list(self._runtimes)
+
+    def runtime(self, tenant: str) -> ToolguardRuntime:
+        """The (entered) runtime of a tenant, loading it if needed."""
+        with self._lock:
+            runtime = self._runtimes.get(tenant)
+            if runtime is not None:
+                self._runtimes.move_to_end(tenant)
+                return runtime
+            if tenant not in self._guards:
+                raise KeyError(f"Unknown tenant '{tenant}'")
+            self._evict(self.max_loaded - 1)
+            runtime = self._load(tenant, self._guards[tenant])
+            self._runtimes[tenant] = runtime
+            self.loads += 1
+            return runtime
+
+    async def guard_toolcall(
+        self, tenant: str, tool_name: str, args: dict, delegate: IToolInvoker
+    ) -> None:
+        """Guard a tool call of a tenant, see ToolguardRuntime.guard_toolcall."""
+        with self._use(tenant) as runtime:
+            await runtime.guard_toolcall(tool_name, args, delegate)
+
+    def guard_toolcall_sync(
+        self, tenant: str, tool_name: str, args: dict, delegate: IToolInvoker
+    ) -> None:
+        """Guard a tool call of a tenant, see ToolguardRuntime.guard_toolcall_sync."""
+        with self._use(tenant) as runtime:
+            runtime.guard_toolcall_sync(tool_name, args, delegate)
+
+    def close(self) -> None:
+        """Unload all the tenants (the busy ones once their calls complete).
+        They are loaded again on their next use."""
+        with self._lock:
+            for tenant in list(self._runtimes):
+                self._unload(tenant)
+
+    @contextmanager
+    def _use(self, tenant: str) -> Iterator[ToolguardRuntime]:
+        """The runtime of a tenant, which is not evicted while in use."""
+        with self._lock:
+            runtime = self.runtime(tenant)
+            self._in_flight[runtime] = self._in_flight.get(runtime, 0) + 1
+        try:
+            yield runtime
+        finally:
+            with self._lock:
+                self._in_flight[runtime] -= 1
+                if not self._in_flight[runtime]:
+                    del self._in_flight[runtime]
+                    if runtime in self._retired:
+                        self._retired.discard(runtime)
+                        self._release(runtime)
+                    self._evict(self.max_loaded)
+
+    def _evict(self, limit: int) -> None:
+        """Unload the least recently used idle tenants, down to `limit` loaded
+        tenants if possible."""
+        idle = [t for t, r in self._runtimes.items() if r not in self._in_flight]
+        for tenant in idle[: max(0, len(self._runtimes) - limit)]:
+            self._unload(tenant)
+            self.evictions += 1
+
+    def _load(self, tenant: str, guards: _TenantGuards) -> ToolguardRuntime:
+        key = _content_hash(guards.domain_files)
+        domain = self._domains.get(key)
+        if domain is None:
+            importer = GuardModulesImporter(
+                {
+                    file_to_module_name(f.file_name): (str(f.file_name), f.content)
+                    for f in guards.domain_files
+                },
+                prefix=f"_toolguard_domain_{key[:16]}",
+            )
+            importer.install()
+            domain = self._domains[key] = _SharedDomain(importer)
+
+        options = {"coalesce_scope": ("tenant", tenant), **self._runtime_options}
+        runtime = ToolguardRuntime(
+            guards.manifest,
+            file_twins=guards.guard_files,
+            shared_modules={
+                file_to_module_name(f.file_name): domain.importer.qualified_name(
+                    file_to_module_name(f.file_name)
+                )
+                for f in guards.domain_files
+            },
+            **options,
+        )
+        domain.runtimes.add(runtime)
+        return runtime.__enter__()
+
+    def _unload(self, tenant: str) -> None:
+        runtime = self._runtimes.pop(tenant, None)
+        if runtime is None:
+            return
+        if runtime in self._in_flight:
+            self._retired.add(runtime)
+        else:
+            self._release(runtime)
+
+    def _release(self, runtime: ToolguardRuntime) -> None:
+        runtime.unload()
+        for key, domain in list(self._domains.items()):
+            domain.runtimes.discard(runtime)
+            if not domain.runtimes:
+                domain.importer.uninstall()
+                del self._domains[key]
+
+
+def _content_hash(files: List[FileTwin]) -> str:
+    digest = hashlib.sha256()
+    for f in files:
+        digest.update(str(f.file_name).encode())
+        digest.update(b"\0")
+        digest.update(f.content.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
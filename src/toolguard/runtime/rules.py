@@ -1,8 +1,11 @@
 import inspect
+import time
 from typing import Any
 from contextvars import ContextVar
 from functools import wraps
 
+from toolguard.runtime.observers import current_observers
+
 
 #: Context variable that maintains the current stack of rule names being evaluated.
 #: Used by RuleScope to track hierarchical rule execution. The value is a tuple
@@ -16,6 +19,8 @@ class RuleScope:
     This class manages the hierarchical scope of rule execution by maintaining
     a stack of rule names in the current_rule context variable. It's used as a
     context manager to track which rules are currently being evaluated.
+    When the runtime has observers, they are notified when the scope is entered
+    and exited.
 
     Args:
         rule_name: The name of the rule being entered.
@@ -24,13 +29,26 @@ class RuleScope:
     def __init__(self, rule_name: str):
         self.rule_name = rule_name
         self._token: Any = None
+        self._start = 0.0
 
     def __enter__(self):
         parent = current_rule.get()
-        self._token = current_rule.set(parent + (self.rule_name,))
+        path = parent + (self.rule_name,)
+        self._token = current_rule.set(path)
+        observers = current_observers.get()
+        if observers:
+            self._start = time.perf_counter()
+            for observer in observers:
+                observer.rule_started(path, self._start)
         return self
 
     def __exit__(self, exc_type, exc, tb):
+        observers = current_observers.get()
+        if observers:
+            end = time.perf_counter()
+            path = current_rule.get()
+            for observer in observers:
+                observer.rule_finished(path, self._start, end, exc)
         if self._token is not None:
             current_rule.reset(self._token)
         return False
@@ -1,50 +1,128 @@
+import asyncio
+import hashlib
 import importlib
-import importlib.util
 import inspect
+import marshal
 import os
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from types import ModuleType
-from typing import Any, Callable, Dict, List, Optional, Type
-
-from pydantic import BaseModel
+from types import CodeType, ModuleType
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
 
 from toolguard.runtime import IToolInvoker
+from toolguard.runtime.audit import AuditSink
+from toolguard.runtime.binding import ArgsBindingPlan
+from loguru import logger
+
 from toolguard.runtime.data_types import (
-    API_PARAM,
-    ARGS_PARAM,
     RESULTS_FILENAME,
     FileTwin,
+    GuardTimeoutException,
+    GuardUnavailableException,
+    PolicyViolationException,
     ToolGuardsCodeGenerationResult,
 )
+from toolguard.runtime.item_guards import (
+    ConditionsMode,
+    ItemGuardsCostModel,
+    ItemGuardsMode,
+    current_conditions_mode,
+    current_cost_model,
+    current_item_guards_mode,
+)
+from toolguard.runtime.deadlines import current_deadline
+from toolguard.runtime.importer import GuardModulesImporter, ModuleSource
+from toolguard.runtime.manifest import (
+    MANIFEST_FILENAME,
+    RuntimeManifest,
+    ToolManifest,
+    file_to_module_name,
+    module_hash,
+    module_to_file_name,
+    result_module_files,
+)
+from toolguard.runtime.observers import (
+    ApiCall,
+    GuardObserver,
+    current_api_calls,
+    current_observers,
+)
+from toolguard.runtime.process_pool import GuardProcessPool, WorkerSpec
+from toolguard.runtime.shadow import ShadowEvaluator, ShadowStats
+from toolguard.runtime.tool_invokers.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerInvoker,
+    ToolUnavailableError,
+)
+from toolguard.runtime.tool_invokers.observed import ObservedToolInvoker
+from toolguard.runtime.tool_invokers.single_flight import (
+    SharedFlightInvoker,
+    SingleFlightInvoker,
+)
+from toolguard.runtime.verdict_cache import VerdictCache
 
 
 def load_toolguards(
-    directory: str | Path, filename: str | Path = RESULTS_FILENAME
+    directory: str | Path, filename: str | Path = RESULTS_FILENAME, **kwargs: Any
 ) -> "ToolguardRuntime":
     """Load toolguards from a directory.
 
+    If the directory has a runtime manifest (MANIFEST_FILENAME, saved by the
+    build), only the manifest is read; the full results file is read only if
+    the result is accessed (ToolguardRuntime.result). A manifest older than the
+    results file is ignored (see RuntimeManifest.is_current).
+
     Args:
         directory: The directory containing the toolguard files.
         filename: The name of the results file to load. Defaults to RESULTS_FILENAME.
+        **kwargs: Additional runtime options, see ToolguardRuntime.
 
     Returns:
         ToolguardRuntime: A runtime instance for executing toolguards.
     """
+    source: ToolGuardsCodeGenerationResult | RuntimeManifest | None = None
+    if filename == RESULTS_FILENAME:
+        source = RuntimeManifest.load_current(directory)
+    if source is None:
+        source = ToolGuardsCodeGenerationResult.load(directory, filename)
     return ToolguardRuntime(
-        ToolGuardsCodeGenerationResult.load(directory, filename),
+        source,
         ctx_dir=Path(directory),
         file_twins=None,
+        **kwargs,
     )
 
 
 def load_toolguards_from_memory(
-    result: ToolGuardsCodeGenerationResult,
+    result: ToolGuardsCodeGenerationResult, **kwargs: Any
 ) -> "ToolguardRuntime":
     """Load toolguards from in-memory FileTwin objects.
 
     Args:
         result: The toolguards code generation result containing FileTwin objects.
+        **kwargs: Additional runtime options, see ToolguardRuntime.
 
     Returns:
         ToolguardRuntime: A runtime instance for executing toolguards.
@@ -66,14 +144,203 @@ def load_toolguards_from_memory(
 
         file_twins.append(tool_result.guard_file)
 
-    return ToolguardRuntime(result, ctx_dir=None, file_twins=file_twins)
+    return ToolguardRuntime(result, ctx_dir=None, file_twins=file_twins, **kwargs)
+
+
+ToolCall = Tuple[str, dict]
+
+
+@dataclass(frozen=True)
+class GuardVerdict:
+    """The outcome of guarding one tool call of a batch.
+
+    Attributes:
+        index: Position of the tool call in the batch (or in the stream).
+        tool_name: The name of the tool being invoked.
+        args: The arguments of the tool call.
+        violation: The policy violation, or None if the tool call is allowed.
+        error: The error that kept the guard from reaching a verdict (e.g. a
+            failed delegate call or invalid arguments), if any.
+    """
+
+    index: int
+    tool_name: str
+    args: dict
+    violation: Optional[PolicyViolationException] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the tool call is allowed: no violation, and no error."""
+        return self.violation is None and self.error is None
+
+
+@dataclass
+class _AuditedDecision:
+    """How a guard decision was made, for its audit record.
+
+    Attributes:
+        fail_open: Whether the tool call was allowed without a verdict, because
+            the guard of its fail-open tool timed out or used an unavailable API.
+    """
+
+    fail_open: bool = False
+
+
+@dataclass(frozen=True)
+class _GuardEntry:
+    """A resolved tool guard: everything needed to call it without reflection."""
+
+    tool_name: str
+    guard_fn: Callable[..., Awaitable[None]]
+    plan: ArgsBindingPlan
+    api_impl_class: Optional[Type]
+    loop_free: bool = False
+    #: keys of the arguments that the verdict depends on, None if not cacheable
+    verdict_keys: Optional[Tuple[str, ...]] = None
+
+
+class _GuardsVersion:
+    """One loaded version of the tool guards.
+
+    Guard evaluations finish on the version they started with, even if the
+    runtime has switched to a newer version meanwhile (see ToolguardRuntime.reload).
+
+    Args:
+        manifest: The tool guards.
+        importer: Imports the modules, or None for plain imports (directory mode).
+        module_hashes: Content hash of each module, by module name. Modules with
+            no hash are considered changed by every reload.
+    """
+
+    def __init__(
+        self,
+        manifest: RuntimeManifest,
+        importer: Optional[GuardModulesImporter],
+        module_hashes: Mapping[str, str],
+    ) -> None:
+        self.manifest = manifest
+        self.importer = importer
+        self.module_hashes = dict(module_hashes)
+        self.entries: Dict[str, _GuardEntry] = {}
+        self.api_impl_class: Optional[Type] = None
+        self.pool: Optional[GuardProcessPool] = None
+        self.verdict_cache: Optional[VerdictCache] = None
+        self.in_flight = 0
+        self.retired = False
+        tool_modules = {
+            name
+            for tool in manifest.tools.values()
+            for name in [tool.guard_module, *tool.item_modules]
+        }
+        self.domain_modules = [m for m in self.module_hashes if m not in tool_modules]
+        self.domain_digest = _digest(
+            manifest.api_impl_module,
+            manifest.api_impl_class_name,
+            *(f"{m}={self.module_hashes[m]}" for m in sorted(self.domain_modules)),
+        )
+
+    @classmethod
+    def from_result(
+        cls,
+        result: ToolGuardsCodeGenerationResult,
+        shared_modules: Optional[Mapping[str, str]] = None,
+    ) -> "_GuardsVersion":
+        manifest = RuntimeManifest.from_result(result)
+        modules = {
+            file_to_module_name(f.file_name): (str(f.file_name), f.content)
+            for f in result_module_files(result)
+        }
+        return cls(
+            manifest,
+            GuardModulesImporter(modules, shared=shared_modules),
+            manifest.module_hashes,
+        )
+
+    @classmethod
+    def from_directory(
+        cls, directory: Path, shared_modules: Optional[Mapping[str, str]] = None
+    ) -> "_GuardsVersion":
+        manifest = RuntimeManifest.load_current(directory)
+        if manifest is None:
+            return cls.from_result(
+                ToolGuardsCodeGenerationResult.load(directory), shared_modules
+            )
+        modules: Dict[str, ModuleSource] = {}
+        for name in manifest.module_hashes:
+            file_name = directory / module_to_file_name(name)
+            modules[name] = (str(file_name), file_name.read_text())
+        return cls(
+            manifest,
+            GuardModulesImporter(modules, shared=shared_modules),
+            manifest.module_hashes,
+        )
+
+    def import_module(self, name: str) -> ModuleType:
+        if self.importer is not None:
+            return self.importer.import_module(name)
+        return importlib.import_module(name)
+
+    def loaded_module(self, name: str) -> Optional[ModuleType]:
+        if self.importer is not None:
+            return self.importer.loaded_module(name)
+        return sys.modules.get(name)
+
+    def tool_digest(self, tool_name: str) -> Optional[str]:
+        """Changes when the guard of a tool, or the domain it uses, changes."""
+        tool = self.manifest.tools.get(tool_name)
+        if tool is None:
+            return None
+        modules = [tool.guard_module, *tool.item_modules]
+        if any(m not in self.module_hashes for m in modules):
+            return None
+        return _digest(
+            self.domain_digest,
+            tool.model_dump_json(),
+            *(self.module_hashes[m] for m in modules),
+        )
+
+    def same_as(self, other: "_GuardsVersion") -> bool:
+        return (
+            self.module_hashes == other.module_hashes
+            and len(self.module_hashes) == len(other.module_hashes) > 0
+            and self.manifest.same_guards(other.manifest)
+        )
+
+    def reuse_unchanged(self, old: "_GuardsVersion") -> None:
+        """Reuse the modules and resolved guards of an older version, if unchanged.
+
+        The importer of this version must be installed.
+        """
+        if self.domain_digest != old.domain_digest:
+            return
+        if self.importer is not None:
+            for name in self.domain_modules:
+                module = old.loaded_module(name)
+                if module is not None:
+                    self.importer.adopt(name, module)
+        self.api_impl_class = old.api_impl_class
+        for tool_name, entry in old.entries.items():
+            digest = self.tool_digest(tool_name)
+            if digest is not None and digest == old.tool_digest(tool_name):
+                self.entries[tool_name] = entry
+
+    def release(self) -> None:
+        """Unload the modules of this version, and stop its worker processes."""
+        self.entries = {}
+        self.api_impl_class = None
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.importer is not None:
+            self.importer.uninstall()
 
 
 class ToolguardRuntime:
     """Runtime environment for executing toolguards.
 
     This class manages the lifecycle of toolguard execution, including:
-    - Loading and caching guard functions
+    - Loading guard functions and resolving them once into a dispatch table
     - Managing Python path modifications (for directory mode)
     - Loading modules from memory (for FileTwin mode)
     - Coordinating guard function calls with proper argument injection
@@ -81,28 +348,183 @@ class ToolguardRuntime:
 
     def __init__(
         self,
-        result: ToolGuardsCodeGenerationResult,
+        result: ToolGuardsCodeGenerationResult | RuntimeManifest,
         ctx_dir: Optional[Path] = None,
         file_twins: Optional[List[FileTwin]] = None,
+        compiled_modules: Optional[List[Tuple[str, CodeType]]] = None,
+        shared_modules: Optional[Mapping[str, str]] = None,
+        memoize_api_calls: bool = True,
+        item_guards_mode: Optional[ItemGuardsMode] = None,
+        conditions_mode: Optional[ConditionsMode] = None,
+        cost_model: Optional[ItemGuardsCostModel] = None,
+        observers: Iterable[GuardObserver] = (),
+        preload: bool = False,
+        process_pool_tools: Iterable[str] = (),
+        process_pool_size: Optional[int] = None,
+        verdict_cache_size: int = 0,
+        timeouts: Optional[Mapping[str, float]] = None,
+        default_timeout: Optional[float] = None,
+        fail_open_tools: Iterable[str] = (),
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        coalesce_tools: Iterable[str] = (),
+        coalesce_scope: Optional[Hashable] = None,
+        shadow_tools: Iterable[str] = (),
+        shadow_sample_rates: Optional[Mapping[str, float]] = None,
+        shadow_queue_size: int = 1000,
+        shadow_concurrency: int = 4,
+        on_shadow_violation: Optional[Callable[["GuardVerdict"], Any]] = None,
+        audit_sink: Optional[AuditSink] = None,
     ) -> None:
         """Initialize the runtime.
 
         Args:
-            result: The toolguards code generation result.
+            result: The toolguards code generation result, or its runtime manifest.
             ctx_dir: Directory containing the toolguard files (for directory mode).
             file_twins: List of FileTwin objects (for in-memory mode).
+            compiled_modules: (module name, code) pairs, in loading order (for
+                bundle mode, see load_toolguards_bundle).
+            shared_modules: In the in-memory and bundle modes, modules that are
+                loaded elsewhere (e.g. domain modules shared by several runtimes):
+                their qualified module names, by the logical name that the guards
+                import.
+            memoize_api_calls: Coalesce identical API calls made while evaluating a
+                single tool call (e.g. the same lookup done by several policy items)
+                into one delegate invocation.
+            item_guards_mode: How tool guards run their policy item guards. If None,
+                the mode the guards were generated with is used.
+            conditions_mode: How `assert_any_condition_met` evaluates its
+                conditions, e.g. racing them concurrently. If None, the mode the
+                guards pass is used (by default, one after the other).
+            cost_model: Orders the item guards in the COST_AWARE mode, and the
+                conditions in the COST_ORDERED conditions mode. If None, a model is
+                created with the item guards classified by static analysis.
+            observers: Receive the events of every guard evaluation, such as rule
+                latencies and API calls (e.g. GuardMetrics).
+            preload: Import all the tool guards when the runtime is entered. By
+                default, the modules of a tool guard are imported when the tool
+                is first guarded.
+            process_pool_tools: Tools whose guards run in a pool of worker
+                processes, for CPU-heavy guards (see GuardProcessPool). The pool
+                is started when the runtime is entered.
+            process_pool_size: Number of worker processes. Defaults to the
+                number of CPUs.
+            verdict_cache_size: Number of verdicts of pure tool guards (see
+                ToolManifest.pure) to cache, keyed by the arguments they read.
+                0 disables the cache. The cache is emptied when the tool guards
+                are reloaded. The verdicts of `process_pool_tools` are not cached.
+            timeouts: Time budget, in seconds, of the guard of each tool. When
+                it runs out, the guard is cancelled with its pending API calls.
+            default_timeout: Time budget of the guards of tools without an entry
+                in `timeouts`. If None, only those tools have a time budget.
+            fail_open_tools: Tools whose calls are allowed when their guard runs
+                out of time, or when an API it uses is unavailable. The calls of
+                the other tools are blocked by a GuardTimeoutException, or a
+                GuardUnavailableException.
+            circuit_breaker: Circuit breakers and bulkheads of the API calls made
+                by the guards, shared by all the guard evaluations. When a circuit
+                is open, the guards that use the API fail fast.
+            coalesce_tools: Read-only API tools whose identical in-flight
+                invocations are coalesced into one delegate invocation, across
+                all the concurrent guard evaluations in the process (see
+                SharedFlightInvoker). Results are not kept after completion.
+            coalesce_scope: Invocations are coalesced only with those of
+                runtimes of the same scope. Runtimes whose delegates see
+                different data (e.g. other tenants) must use different scopes.
+            shadow_tools: Tools guarded in shadow mode: guarding their calls
+                returns right away, and the guard is evaluated in the background
+                (see ShadowEvaluator). Violations are reported, not raised.
+            shadow_sample_rates: Fraction of the calls of each shadow tool to
+                evaluate (1 by default).
+            shadow_queue_size: Maximal number of shadow evaluations queued or
+                running. Calls beyond it are dropped, and counted.
+            shadow_concurrency: Maximal number of shadow evaluations at once.
+            on_shadow_violation: Receives the verdicts of the shadow evaluations
+                that found a violation. If None, violations are logged.
+            audit_sink: Receives a record of every guard decision, with the
+                delegate invocations the guard made. The runtime does not close
+                it, so it can be shared by several runtimes.
 
         Note:
-            Either ctx_dir or file_twins must be provided, but not both.
+            Exactly one of ctx_dir, file_twins or compiled_modules must be provided.
         """
-        if ctx_dir is None and file_twins is None:
-            raise ValueError("Either ctx_dir or file_twins must be provided")
-        if ctx_dir is not None and file_twins is not None:
-            raise ValueError("Only one of ctx_dir or file_twins should be provided")
+        sources = [s for s in (ctx_dir, file_twins, compiled_modules) if s is not None]
+        if not sources:
+            raise ValueError(
+                "Either ctx_dir or file_twins must be provided (or compiled_modules)"
+            )
+        if len(sources) > 1:
+            raise ValueError(
+                "Only one of ctx_dir or file_twins should be provided (or compiled_modules)"
+            )
+        if process_pool_tools and shared_modules:
+            raise ValueError("Shared modules cannot be loaded by worker processes")
 
         self._ctx_dir = ctx_dir
         self._file_twins = file_twins
-        self._result = result
+        self._shared_modules = shared_modules
+        # in directory mode, the full result is read again if needed
+        self._result = (
+            result
+            if isinstance(result, ToolGuardsCodeGenerationResult) and ctx_dir is None
+            else None
+        )
+        manifest = (
+            result
+            if isinstance(result, RuntimeManifest)
+            else RuntimeManifest.from_result(result)
+        )
+        importer: Optional[GuardModulesImporter] = None
+        module_hashes = manifest.module_hashes
+        if file_twins is not None:
+            modules = {
+                file_to_module_name(f.file_name): (str(f.file_name), f.content)
+                for f in file_twins
+                if str(f.file_name).endswith(".py")
+            }
+            importer = GuardModulesImporter(modules, shared=shared_modules)
+            module_hashes = {
+                name: module_hash(content) for name, (_, content) in modules.items()
+            }
+        elif compiled_modules is not None:
+            importer = GuardModulesImporter.from_code(
+                compiled_modules, shared=shared_modules
+            )
+            module_hashes = module_hashes or _code_hashes(compiled_modules)
+        self._version = _GuardsVersion(manifest, importer, module_hashes)
+        self._retired: List[_GuardsVersion] = []
+        self._lock = threading.Lock()
+        self._memoize_api_calls = memoize_api_calls
+        self._item_guards_mode = item_guards_mode
+        self._conditions_mode = conditions_mode
+        # classify the item guards of our own cost model, as they are loaded
+        self._classify_items = cost_model is None
+        self._cost_model = cost_model or ItemGuardsCostModel()
+        self._observers = tuple(observers)
+        self._preload = preload
+        self._process_tools = frozenset(process_pool_tools)
+        self._process_pool_size = process_pool_size or os.cpu_count() or 1
+        self._verdict_cache_size = verdict_cache_size
+        self._timeouts = dict(timeouts or {})
+        self._default_timeout = default_timeout
+        self._fail_open_tools = frozenset(fail_open_tools)
+        self._circuit_breaker = circuit_breaker
+        self._coalesce_tools = frozenset(coalesce_tools)
+        self._coalesce_scope = coalesce_scope
+        self._audit_sink = audit_sink
+        self._shadow_tools = frozenset(shadow_tools)
+        self._shadow = (
+            ShadowEvaluator(
+                self._shadow_verdict,
+                max_pending=shadow_queue_size,
+                concurrency=shadow_concurrency,
+                sample_rates=shadow_sample_rates,
+                on_violation=on_shadow_violation,
+            )
+            if self._shadow_tools
+            else None
+        )
+        self._version.verdict_cache = self._new_verdict_cache()
+        self._entered = False
 
     def __enter__(self):
         if self._ctx_dir is not None:
@@ -110,99 +532,887 @@ class ToolguardRuntime:
             abs_ctx_dir = os.path.abspath(self._ctx_dir)
             if abs_ctx_dir not in sys.path:
                 sys.path.insert(0, abs_ctx_dir)
-        elif self._file_twins:
-            # In-memory mode: load modules from FileTwin objects
-            self._load_modules_from_memory(self._file_twins)
+        if self._version.importer is not None:
+            # In-memory and bundle modes: import the modules on demand
+            self._version.importer.install()
 
+        self._entered = True
+        if self._preload:
+            self._preload_version(self._version)
+        if self._process_tools and self._version.pool is None:
+            self._version.pool = self._start_pool(self._version)
         return self
 
     def __exit__(self, exc_type, exc, tb):
+        version = self._version
+        if version.importer is not None or version.pool is not None or self._retired:
+            self.unload()
+        else:
+            # directory mode: the imported modules stay in sys.modules
+            if self._shadow is not None:
+                self._shadow.close()
+            with self._lock:
+                self._entered = False
         return False
 
-    def _load_modules_from_memory(self, file_twins: List[FileTwin]) -> None:
-        for file_twin in file_twins:
-            if not str(file_twin.file_name).endswith(".py"):
-                continue
+    @property
+    def result(self) -> ToolGuardsCodeGenerationResult:
+        """The full code generation result, with the policy specifications and
+        tests of the tool guards.
+
+        In directory mode, the results file is read on first access.
+        """
+        if self._result is None:
+            if self._ctx_dir is None:
+                raise ValueError("The runtime was not loaded from a result")
+            self._result = ToolGuardsCodeGenerationResult.load(self._ctx_dir)
+        return self._result
+
+    def unload(self) -> None:
+        """Forget the loaded tool guards, and unload their in-memory modules.
+
+        The runtime can be entered again, and then loads the modules again.
+        """
+        if self._shadow is not None:
+            self._shadow.close()
+        with self._lock:
+            self._entered = False
+            for version in [*self._retired, self._version]:
+                version.release()
+            self._retired = []
+
+    def reload(
+        self, source: ToolGuardsCodeGenerationResult | str | Path | None = None
+    ) -> bool:
+        """Switch to a new version of the tool guards, if they changed.
+
+        The new version is loaded alongside the current one: new guard
+        evaluations use it, while the evaluations in flight finish on the
+        current version, which is unloaded afterwards. Only the changed tool
+        guards are loaded again; unchanged tool guards, and unchanged domain
+        modules, are reused (changed domain modules reload all tool guards).
+        Changes are detected by the content hash of the modules.
+
+        Args:
+            source: The regenerated tool guards: a code generation result, a
+                directory with its results file, or a bundle file (see
+                write_toolguards_bundle). Defaults to the directory of the runtime.
+
+        Returns:
+            bool: Whether a new version was loaded.
+        """
+        if source is None:
+            source = self._ctx_dir
+        if source is None:
+            raise ValueError("No source to reload the tool guards from")
+        version = self._load_version(source)
+        version.verdict_cache = self._new_verdict_cache()
+        with self._lock:
+            current = self._version
+            if version.same_as(current):
+                return False
+            if self._entered and version.importer is not None:
+                version.importer.install()
+                version.reuse_unchanged(current)
+                if self._preload:
+                    self._preload_version(version)
+            if self._entered and self._process_tools:
+                version.pool = self._start_pool(version)
+            self._version = version
+            self._result = (
+                source if isinstance(source, ToolGuardsCodeGenerationResult) else None
+            )
+            current.retired = True
+            self._retired.append(current)
+            self._release_if_idle(current)
+        return True
 
-            mod_name = _file_to_module_name(file_twin.file_name)
+    async def watch(
+        self, source: str | Path | None = None, interval: float = 1.0
+    ) -> None:
+        """Reload the tool guards whenever their source is modified, until cancelled.
 
-            # Skip if module is already loaded
-            if mod_name in sys.modules:
-                continue
+        Args:
+            source: A directory with a results file, or a bundle file. Defaults
+                to the directory of the runtime.
+            interval: Seconds between checks of the modification time.
+        """
+        if source is None:
+            source = self._ctx_dir
+        if source is None:
+            raise ValueError("No source to watch")
+        path = Path(source)
+        # a stale manifest is ignored, so both files are watched
+        paths = (
+            [path / RESULTS_FILENAME, path / MANIFEST_FILENAME]
+            if path.is_dir()
+            else [path]
+        )
+        last_modified = _modification_times(paths)
+        while True:
+            await asyncio.sleep(interval)
+            modified = _modification_times(paths)
+            if modified is not None and modified != last_modified:
+                last_modified = modified
+                self.reload(source)
 
-            # Create a module spec and module
-            spec = importlib.util.spec_from_loader(mod_name, loader=None)
-            if spec is None:
-                raise ImportError(f"Could not create spec for module {mod_name}")
+    def _load_version(
+        self, source: ToolGuardsCodeGenerationResult | str | Path
+    ) -> _GuardsVersion:
+        if isinstance(source, ToolGuardsCodeGenerationResult):
+            return _GuardsVersion.from_result(source, self._shared_modules)
+        path = Path(source)
+        if path.is_dir():
+            return _GuardsVersion.from_directory(path, self._shared_modules)
+        from toolguard.runtime.bundle import read_toolguards_bundle
 
-            module = importlib.util.module_from_spec(spec)
+        manifest, compiled_modules = read_toolguards_bundle(path)
+        return _GuardsVersion(
+            manifest,
+            GuardModulesImporter.from_code(
+                compiled_modules, shared=self._shared_modules
+            ),
+            manifest.module_hashes or _code_hashes(compiled_modules),
+        )
 
-            # Execute the code in the module's namespace
-            exec(file_twin.content, module.__dict__)
+    def _start_pool(self, version: _GuardsVersion) -> GuardProcessPool:
+        spec = WorkerSpec.of(
+            version.manifest,
+            self._ctx_dir,
+            version.importer.sources if version.importer is not None else None,
+        )
+        options: Dict[str, Any] = {
+            "memoize_api_calls": self._memoize_api_calls,
+            "item_guards_mode": self._item_guards_mode,
+            "conditions_mode": self._conditions_mode,
+        }
+        return GuardProcessPool(spec, self._process_pool_size, options, self._observers)
+
+    def _new_verdict_cache(self) -> Optional[VerdictCache]:
+        if self._verdict_cache_size <= 0:
+            return None
+        return VerdictCache(self._verdict_cache_size)
+
+    @property
+    def verdict_cache(self) -> Optional[VerdictCache]:
+        """The cache of the verdicts of pure tool guards (of the current
+        version), or None if disabled."""
+        return self._version.verdict_cache
 
-            # Register the module
-            sys.modules[mod_name] = module
+    def _preload_version(self, version: _GuardsVersion) -> None:
+        for tool_name in version.manifest.tools:
+            self._entry(tool_name, version)
+
+    def _release_if_idle(self, version: _GuardsVersion) -> None:
+        if version.retired and not version.in_flight and version in self._retired:
+            self._retired.remove(version)
+            version.release()
+
+    def _enter_version(self) -> _GuardsVersion:
+        """The current version, held by one more guard evaluation until _leave.
+
+        Taken before the evaluation first yields, so that a concurrent reload
+        cannot release it meanwhile.
+        """
+        with self._lock:
+            version = self._version
+            version.in_flight += 1
+            return version
+
+    def _leave(self, version: _GuardsVersion) -> None:
+        with self._lock:
+            version.in_flight -= 1
+            self._release_if_idle(version)
+
+    def _entry(
+        self, tool_name: str, version: Optional[_GuardsVersion] = None
+    ) -> Optional[_GuardEntry]:
+        version = version or self._version
+        entry = version.entries.get(tool_name)
+        if entry is None:
+            tool = version.manifest.tools.get(tool_name)
+            if tool is None:
+                return None
+            entry = version.entries[tool_name] = self._resolve(version, tool_name, tool)
+        return entry
+
+    def _resolve(
+        self, version: _GuardsVersion, tool_name: str, tool: ToolManifest
+    ) -> _GuardEntry:
+        if self._classify_items:
+            for item_module in tool.item_modules:
+                module = version.import_module(item_module)
+                for fn_name, traits in tool.guard_traits.items():
+                    fn = getattr(module, fn_name, None)
+                    if fn is not None:
+                        self._cost_model.classify(fn, api_free=not traits.uses_api)
+
+        module = version.import_module(tool.guard_module)
+        guard_fn = _find_function_in_module(module, tool.guard_fn_name)
+        plan = ArgsBindingPlan(guard_fn)
+        if plan.needs_api and version.api_impl_class is None:
+            version.api_impl_class = self._find_api_impl_class(version)
+        return _GuardEntry(
+            tool_name=tool_name,
+            guard_fn=guard_fn,
+            plan=plan,
+            api_impl_class=version.api_impl_class if plan.needs_api else None,
+            loop_free=tool.loop_free,
+            verdict_keys=(
+                plan.arg_keys(tool.read_args)
+                if tool.pure and tool.read_args is not None
+                else None
+            ),
+        )
+
+    def _cached_verdict(
+        self, version: _GuardsVersion, tool_name: str, args: dict
+    ) -> Tuple[Optional[Hashable], bool]:
+        """Look up the cached verdict of a tool call.
+
+        Returns:
+            The key to store the verdict under (None if it is not cacheable),
+            and whether the tool call is known to be allowed.
+
+        Raises:
+            PolicyViolationException: If the tool call is known to violate a policy.
+        """
+        cache = version.verdict_cache
+        if cache is None:
+            return None, False
+        key = cache.key(tool_name, args, self._verdict_keys(version, tool_name))
+        return key, key is not None and cache.replay(key)
+
+    def _store_verdict(
+        self,
+        version: _GuardsVersion,
+        key: Optional[Hashable],
+        violation: Optional[PolicyViolationException],
+    ) -> None:
+        """Cache the verdict of a tool call: its violation, or None if allowed."""
+        cache = version.verdict_cache
+        if cache is None or key is None:
+            return
+        if violation is None or _is_verdict(violation):
+            cache.put(key, violation)
+
+    def _verdict_keys(
+        self, version: _GuardsVersion, tool_name: str
+    ) -> Optional[Tuple[str, ...]]:
+        if tool_name in self._process_tools:
+            # resolving the argument keys would import the guard modules here
+            return None
+        entry = self._entry(tool_name, version)
+        return entry.verdict_keys if entry is not None else None
+
+    @property
+    def manifest(self) -> RuntimeManifest:
+        """The tool guards loaded by this runtime (of the current version)."""
+        return self._version.manifest
+
+    @property
+    def cost_model(self) -> ItemGuardsCostModel:
+        """The cost model used by the COST_AWARE item guards mode."""
+        return self._cost_model
+
+    def _find_api_impl_class(self, version: Optional[_GuardsVersion] = None) -> Type:
+        version = version or self._version
+        manifest = version.manifest
+        module = version.import_module(manifest.api_impl_module)
+        clazz = _find_class_in_module(module, manifest.api_impl_class_name)
+        assert clazz, (
+            f"class {manifest.api_impl_class_name} not found in {manifest.api_impl_module}"
+        )
+        return clazz
+
+    def _wrap_delegate(
+        self, delegate: IToolInvoker, keep_results: bool = True
+    ) -> IToolInvoker:
+        if self._observers or self._audit_sink is not None:
+            # below the memo, so that only actual invocations are reported
+            delegate = ObservedToolInvoker(delegate)
+        if self._circuit_breaker is not None:
+            # rejected invocations are not reported; identical ones are admitted once
+            delegate = CircuitBreakerInvoker(delegate, self._circuit_breaker)
+        if self._coalesce_tools:
+            # a coalesced invocation is admitted by the circuit breaker once
+            delegate = SharedFlightInvoker(
+                delegate, self._coalesce_tools, self._coalesce_scope
+            )
+        if self._memoize_api_calls:
+            delegate = SingleFlightInvoker(delegate, keep_results=keep_results)
+        return delegate
 
     def _make_args(
-        self, guard_fn: Callable, args: dict, delegate: IToolInvoker
+        self, entry: _GuardEntry, args: dict, delegate: IToolInvoker, wrap: bool
     ) -> Dict[str, Any]:
-        sig = inspect.signature(guard_fn)
-        guard_args = {}
-        for p_name, param in sig.parameters.items():
-            if p_name == API_PARAM:
-                mod_name = _file_to_module_name(
-                    self._result.domain.app_api_impl.file_name
-                )
-                module = importlib.import_module(mod_name)
-                clazz = _find_class_in_module(
-                    module, self._result.domain.app_api_impl_class_name
-                )
-                assert clazz, (
-                    f"class {self._result.domain.app_api_impl_class_name} not found in {self._result.domain.app_api_impl.file_name}"
-                )
-                guard_args[p_name] = clazz(delegate)
-            else:
-                arg_val = args.get(p_name)
-                if arg_val is None and p_name == ARGS_PARAM:
-                    arg_val = args
-
-                if inspect.isclass(param.annotation) and issubclass(
-                    param.annotation, BaseModel
-                ):
-                    # Ensure arg_val is a dict before unpacking
-                    if isinstance(arg_val, dict):
-                        # Use model_validate instead of model_construct to ensure
-                        # nested Pydantic models are properly constructed recursively
-                        guard_args[p_name] = param.annotation.model_validate(arg_val)
-                    else:
-                        guard_args[p_name] = arg_val
-                else:
-                    guard_args[p_name] = arg_val
-        return guard_args
+        api = None
+        if entry.api_impl_class:
+            if wrap:
+                # request-scoped: lives as long as this guard evaluation
+                delegate = self._wrap_delegate(delegate)
+            api = entry.api_impl_class(delegate)
+        return entry.plan.bind(args, api)
 
-    async def guard_toolcall(self, tool_name: str, args: dict, delegate: IToolInvoker):
+    @contextmanager
+    def _evaluation_scope(
+        self,
+        mode: Optional[ItemGuardsMode],
+        conditions_mode: Optional[ConditionsMode],
+    ) -> Iterator[None]:
+        mode_token = current_item_guards_mode.set(mode)
+        conditions_token = current_conditions_mode.set(conditions_mode)
+        cost_token = current_cost_model.set(self._cost_model)
+        observers_token = current_observers.set(self._observers)
+        try:
+            yield
+        finally:
+            current_observers.reset(observers_token)
+            current_cost_model.reset(cost_token)
+            current_conditions_mode.reset(conditions_token)
+            current_item_guards_mode.reset(mode_token)
+
+    async def guard_toolcall(
+        self,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        deadline: Optional[float] = None,
+    ):
         """Execute a guard function for a specific tool call.
 
         Args:
             tool_name: The name of the tool being invoked.
             args: Dictionary of arguments to pass to the tool.
             delegate: The tool invoker instance for executing the actual tool.
+            deadline: When the guard must be done, as a `time.monotonic()`
+                reading. The tool's time budget (see `timeouts`) may end it
+                sooner. While the guard runs, the deadline is available to the
+                delegate as `current_deadline`.
+
+        Raises:
+            PolicyViolationException: If the guard function detects a policy violation.
+            GuardTimeoutException: If the guard of a fail-closed tool runs out of time.
+            RuntimeError: If the runtime is used outside of its context manager.
+        """
+        if self._shadowed(tool_name, args, delegate):
+            return
+        await self._guard(tool_name, args, delegate, wrap=True, deadline=deadline)
+
+    def guard_toolcall_sync(
+        self,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """Synchronous variant of guard_toolcall, for agents without an event loop.
+
+        If no item guard of the tool uses the api, and the tool guard runs them
+        through `run_item_guards`, the guard runs in the calling thread without
+        an event loop. Otherwise, it runs in a new event loop
+        (`asyncio.run`), so it must not be called from a running loop. Guards
+        that run without an event loop do not wait for I/O, and are not
+        interrupted by their deadline.
+
+        Args:
+            tool_name: The name of the tool being invoked.
+            args: Dictionary of arguments to pass to the tool.
+            delegate: The tool invoker instance for executing the actual tool.
+            deadline: When the guard must be done, see guard_toolcall.
 
         Raises:
             PolicyViolationException: If the guard function detects a policy violation.
+            GuardTimeoutException: If the guard of a fail-closed tool runs out of time.
+            RuntimeError: If the runtime is used outside of its context manager.
+        """
+        if self._shadowed(tool_name, args, delegate):
+            return
+        self._check_entered()
+        if self._audit_sink is None:
+            self._guard_sync(tool_name, args, delegate, deadline)
+            return
+        with self._audited(tool_name, args) as decision:
+            decision.fail_open = not self._guard_sync(
+                tool_name, args, delegate, deadline
+            )
+
+    def _guard_sync(
+        self,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        deadline: Optional[float],
+    ) -> bool:
+        """Returns: False if the guard of a fail-open tool did not reach a verdict."""
+        version = self._enter_version()
+        try:
+            key, allowed = self._cached_verdict(version, tool_name, args)
+            if allowed:
+                return True
+            try:
+                decided = self._evaluate_sync(
+                    version, tool_name, args, delegate, deadline
+                )
+            except PolicyViolationException as e:
+                self._store_verdict(version, key, e)
+                raise
+            if decided:
+                self._store_verdict(version, key, None)
+            return decided
+        finally:
+            self._leave(version)
+
+    @property
+    def shadow_stats(self) -> Optional[ShadowStats]:
+        """The counters of the shadow evaluations, or None without shadow tools."""
+        return self._shadow.stats if self._shadow is not None else None
+
+    async def drain_shadow(self) -> None:
+        """Wait until the queued shadow evaluations are done."""
+        if self._shadow is not None:
+            await self._shadow.drain()
+
+    def _shadowed(self, tool_name: str, args: dict, delegate: IToolInvoker) -> bool:
+        """Queue the shadow evaluation of a tool call of a shadow tool.
+
+        Returns:
+            bool: Whether the tool is a shadow tool; its tool call is then
+                allowed right away.
+        """
+        if tool_name not in self._shadow_tools:
+            return False
+        self._shadow_submit(tool_name, args, delegate)
+        return True
+
+    def _shadow_submit(
+        self, tool_name: str, args: dict, delegate: IToolInvoker
+    ) -> None:
+        self._check_entered()
+        self._shadow.submit(tool_name, args, delegate)  # type: ignore[union-attr]
+
+    async def _shadow_verdict(
+        self, index: int, tool_name: str, args: dict, delegate: IToolInvoker
+    ) -> GuardVerdict:
+        self._check_entered()
+        return await self._verdict(
+            index, tool_name, args, self._wrap_delegate(delegate), shadow=True
+        )
+
+    def _evaluate_sync(
+        self,
+        version: _GuardsVersion,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        deadline: Optional[float],
+    ) -> bool:
+        if tool_name not in self._process_tools:
+            entry = self._entry(tool_name, version)
+            if entry is None:
+                return True
+            if entry.loop_free:
+                try:
+                    self._guard_without_loop(entry, args, delegate)
+                    return True
+                except _NeedsEventLoop:
+                    pass
+        return asyncio.run(
+            self._evaluate_in_time(version, tool_name, args, delegate, True, deadline)
+        )
+
+    def _guard_without_loop(
+        self, entry: _GuardEntry, args: dict, delegate: IToolInvoker
+    ) -> None:
+        guard_args = self._make_args(entry, args, delegate, wrap=True)
+        # racing conditions needs an event loop
+        conditions_mode = (
+            ConditionsMode.COST_ORDERED
+            if self._conditions_mode == ConditionsMode.COST_ORDERED
+            else ConditionsMode.SEQUENTIAL
+        )
+        with self._evaluation_scope(ItemGuardsMode.SEQUENTIAL, conditions_mode):
+            _run_without_loop(
+                cast(Coroutine[Any, Any, None], entry.guard_fn(**guard_args))
+            )
+
+    async def guard_toolcalls(
+        self,
+        calls: Iterable[ToolCall],
+        delegate: IToolInvoker,
+        max_concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> List[GuardVerdict]:
+        """Guard a batch of tool calls concurrently, such as the parallel tool
+        calls of one LLM turn.
+
+        A violation of one tool call, or an error of its guard, does not abort the
+        others. If API calls are memoized, identical API calls are made once for
+        the whole batch.
+
+        Args:
+            calls: The (tool_name, args) pairs to guard.
+            delegate: The tool invoker instance for executing the actual tools.
+            max_concurrency: Maximal number of tool calls guarded at once. If None,
+                all tool calls are guarded at once.
+            deadline: When all the guards must be done, see guard_toolcall.
+
+        Returns:
+            List[GuardVerdict]: The verdict of each tool call, in the order of `calls`.
+
+        Raises:
+            RuntimeError: If the runtime is used outside of its context manager.
+        """
+        self._check_entered()
+        wrapped = self._wrap_delegate(delegate)
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def verdict(index: int, tool_name: str, args: dict) -> GuardVerdict:
+            if self._shadowed(tool_name, args, delegate):
+                return GuardVerdict(index, tool_name, args)
+            if semaphore is None:
+                return await self._verdict(index, tool_name, args, wrapped, deadline)
+            async with semaphore:
+                return await self._verdict(index, tool_name, args, wrapped, deadline)
+
+        tasks = [
+            asyncio.ensure_future(verdict(i, tool_name, args))
+            for i, (tool_name, args) in enumerate(calls)
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def iter_guard_toolcalls(
+        self,
+        calls: Iterable[ToolCall] | AsyncIterable[ToolCall],
+        delegate: IToolInvoker,
+        max_concurrency: int = 8,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[GuardVerdict]:
+        """Guard a stream of tool calls, with bounded in-flight work.
+
+        At most `max_concurrency` tool calls are guarded at once, and the next
+        tool call is pulled from `calls` only when a slot is free. Verdicts are
+        yielded as soon as they are ready, so not necessarily in order (see
+        GuardVerdict.index). Identical API calls that are in flight at the same
+        time are shared, but results are not kept for the rest of the stream.
+
+        Args:
+            calls: The (tool_name, args) pairs to guard.
+            delegate: The tool invoker instance for executing the actual tools.
+            max_concurrency: Maximal number of tool calls guarded at once.
+            deadline: When all the guards must be done, see guard_toolcall.
+
+        Yields:
+            GuardVerdict: The verdict of each tool call.
+
+        Raises:
+            RuntimeError: If the runtime is used outside of its context manager.
         """
-        tool_result = self._result.tools.get(tool_name)
-        if not tool_result:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self._check_entered()
+        wrapped = self._wrap_delegate(delegate, keep_results=False)
+
+        source = _aiter(calls)
+        pending: Set[asyncio.Task] = set()
+        exhausted = False
+        index = 0
+        try:
+            while True:
+                while not exhausted and len(pending) < max_concurrency:
+                    try:
+                        tool_name, args = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    if self._shadowed(tool_name, args, delegate):
+                        yield GuardVerdict(index, tool_name, args)
+                    else:
+                        pending.add(
+                            asyncio.ensure_future(
+                                self._verdict(index, tool_name, args, wrapped, deadline)
+                            )
+                        )
+                    index += 1
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=lambda t: t.result().index):
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _verdict(
+        self,
+        index: int,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        deadline: Optional[float] = None,
+        shadow: bool = False,
+    ) -> GuardVerdict:
+        try:
+            await self._guard(
+                tool_name, args, delegate, wrap=False, deadline=deadline, shadow=shadow
+            )
+        except PolicyViolationException as e:
+            return GuardVerdict(index, tool_name, args, e)
+        except Exception as e:
+            # the other tool calls of the batch still get their verdicts
+            return GuardVerdict(index, tool_name, args, error=e)
+        return GuardVerdict(index, tool_name, args)
+
+    async def _guard(
+        self,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        wrap: bool,
+        deadline: Optional[float] = None,
+        shadow: bool = False,
+    ) -> None:
+        self._check_entered()
+        if self._audit_sink is None:
+            await self._decide(tool_name, args, delegate, wrap, deadline)
             return
-        mod_name = _file_to_module_name(tool_result.guard_file.file_name)
-        module = importlib.import_module(mod_name)
-        guard_fn = _find_function_in_module(module, tool_result.guard_fn_name)
-        guard_args = self._make_args(guard_fn, args, delegate)
-        await guard_fn(**guard_args)
+        with self._audited(tool_name, args, shadow) as decision:
+            decision.fail_open = not await self._decide(
+                tool_name, args, delegate, wrap, deadline
+            )
+
+    @contextmanager
+    def _audited(
+        self, tool_name: str, args: dict, shadow: bool = False
+    ) -> Iterator[_AuditedDecision]:
+        """Record the guard decision made in the scope to the audit sink.
+
+        Cancelled guards made no decision, and are not recorded.
+        """
+        sink: AuditSink = self._audit_sink  # type: ignore[assignment]
+        decision = _AuditedDecision()
+        api_calls: List[ApiCall] = []
+        token = current_api_calls.set(api_calls)
+        start = time.perf_counter()
+        try:
+            yield decision
+        except Exception as e:
+            sink.record(
+                tool_name, args, start, time.perf_counter(), e, api_calls, shadow
+            )
+            raise
+        finally:
+            current_api_calls.reset(token)
+        sink.record(
+            tool_name,
+            args,
+            start,
+            time.perf_counter(),
+            None,
+            api_calls,
+            shadow,
+            decision.fail_open,
+        )
+
+    async def _decide(
+        self,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        wrap: bool,
+        deadline: Optional[float],
+    ) -> bool:
+        """Returns: False if the guard of a fail-open tool did not reach a verdict."""
+        version = self._enter_version()
+        try:
+            key, allowed = self._cached_verdict(version, tool_name, args)
+            if allowed:
+                return True
+            try:
+                decided = await self._evaluate_in_time(
+                    version, tool_name, args, delegate, wrap, deadline
+                )
+            except PolicyViolationException as e:
+                self._store_verdict(version, key, e)
+                raise
+            if decided:
+                self._store_verdict(version, key, None)
+            return decided
+        finally:
+            self._leave(version)
+
+    async def _evaluate_in_time(
+        self,
+        version: _GuardsVersion,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        wrap: bool,
+        deadline: Optional[float],
+    ) -> bool:
+        """Evaluate a guard within its deadline.
+
+        Returns:
+            bool: False if the guard of a fail-open tool did not reach a verdict.
+        """
+        try:
+            return await self._evaluate_until(
+                version, tool_name, args, delegate, wrap, deadline
+            )
+        except ToolUnavailableError as e:
+            if tool_name not in self._fail_open_tools:
+                raise GuardUnavailableException(
+                    tool_name, f"uses an unavailable API: {e}"
+                ) from e
+            logger.warning(
+                "Guard uses an unavailable API, allowing the tool call",
+                extra={"tool": tool_name, "error": str(e)},
+            )
+            return False
+
+    async def _evaluate_until(
+        self,
+        version: _GuardsVersion,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        wrap: bool,
+        deadline: Optional[float],
+    ) -> bool:
+        deadline = self._deadline_of(tool_name, deadline)
+        if deadline is None:
+            await self._evaluate(version, tool_name, args, delegate, wrap)
+            return True
+        budget = deadline - time.monotonic()
+        token = current_deadline.set(deadline)
+        try:
+            task = asyncio.ensure_future(
+                self._evaluate(version, tool_name, args, delegate, wrap)
+            )
+        finally:
+            current_deadline.reset(token)
+        try:
+            await asyncio.wait([task], timeout=max(budget, 0.0))
+        finally:
+            # On the deadline, or if we are cancelled ourselves
+            timed_out = not task.done()
+            if timed_out:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        if not timed_out:
+            task.result()
+            return True
+
+        fail_open = tool_name in self._fail_open_tools
+        for observer in self._observers:
+            observer.guard_timed_out(tool_name, budget, fail_open)
+        if not fail_open:
+            raise GuardTimeoutException(tool_name, budget)
+        logger.warning(
+            "Guard timed out, allowing the tool call",
+            extra={"tool": tool_name, "timeout": budget},
+        )
+        return False
+
+    def _deadline_of(
+        self, tool_name: str, deadline: Optional[float]
+    ) -> Optional[float]:
+        timeout = self._timeouts.get(tool_name, self._default_timeout)
+        deadlines = [d for d in (deadline, current_deadline.get()) if d is not None]
+        if timeout is not None:
+            deadlines.append(time.monotonic() + timeout)
+        return min(deadlines) if deadlines else None
+
+    async def _evaluate(
+        self,
+        version: _GuardsVersion,
+        tool_name: str,
+        args: dict,
+        delegate: IToolInvoker,
+        wrap: bool,
+    ) -> None:
+        if version.pool is not None and tool_name in self._process_tools:
+            if tool_name not in version.manifest.tools:
+                return
+            if wrap:
+                delegate = self._wrap_delegate(delegate)
+            await version.pool.guard(tool_name, args, delegate)
+            return
+        entry = self._entry(tool_name, version)
+        if entry is None:
+            return
+        guard_args = self._make_args(entry, args, delegate, wrap)
+        with self._evaluation_scope(self._item_guards_mode, self._conditions_mode):
+            await entry.guard_fn(**guard_args)
+
+    def _check_entered(self) -> None:
+        if not self._entered:
+            raise RuntimeError(
+                "ToolguardRuntime must be entered (`with load_toolguards(...)`) before use"
+            )
+
+
+def _is_verdict(error: PolicyViolationException) -> bool:
+    """Whether the guard decided (rather than could not be evaluated)."""
+    return not isinstance(error, GuardUnavailableException)
+
+
+def _modification_times(paths: List[Path]) -> Optional[List[Optional[int]]]:
+    """The modification times of the files (None for a missing one), or None
+    if they are all missing (e.g. being rewritten)."""
+    times: List[Optional[int]] = []
+    for path in paths:
+        try:
+            times.append(path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            times.append(None)
+    return times if any(t is not None for t in times) else None
+
+
+def _digest(*parts: str | bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode() if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _code_hashes(compiled_modules: List[Tuple[str, CodeType]]) -> Dict[str, str]:
+    return {name: _digest(marshal.dumps(code)) for name, code in compiled_modules}
+
+
+class _NeedsEventLoop(Exception):
+    """The coroutine suspended, so it must be run again in an event loop."""
+
+
+def _run_without_loop(coro: Coroutine[Any, Any, Any]) -> None:
+    """Run a coroutine that never suspends to completion, in the calling thread.
+
+    Raises _NeedsEventLoop if the coroutine did suspend (awaiting real I/O); it
+    is then closed, and must be run again in an event loop. Any error of the
+    coroutine itself propagates, so it is never run twice.
+    """
+    try:
+        coro.send(None)
+    except StopIteration:
+        return
+    coro.close()
+    raise _NeedsEventLoop()
 
 
-def _file_to_module_name(file_path: str | Path):
-    return str(file_path).removesuffix(".py").replace("/", ".")
+async def _aiter(items: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[Any]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
 
 
 def _find_function_in_module(module: ModuleType, function_name: str):
@@ -0,0 +1,232 @@
+import asyncio
+import contextvars
+import itertools
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from loguru import logger
+
+from toolguard.runtime.data_types import IToolInvoker
+
+if TYPE_CHECKING:
+    from toolguard.runtime.runtime import GuardVerdict
+
+_ShadowCall = Tuple[int, str, dict, IToolInvoker]
+
+
+@dataclass
+class ShadowStats:
+    """Counters of the shadow evaluations.
+
+    Attributes:
+        scheduled: Tool calls queued for evaluation.
+        sampled_out: Tool calls skipped by sampling.
+        dropped: Tool calls skipped because the queue was full.
+        evaluated: Completed evaluations.
+        violations: Evaluations that found a policy violation.
+        errors: Evaluations that failed with another error.
+    """
+
+    scheduled: int = 0
+    sampled_out: int = 0
+    dropped: int = 0
+    evaluated: int = 0
+    violations: int = 0
+    errors: int = 0
+
+
+class ShadowEvaluator:
+    """Evaluates tool guards in the background, off the critical path of the
+    tool calls.
+
+    Tool calls are queued, and evaluated by at most `concurrency` tasks at once.
+    At most `max_pending` tool calls are queued or being evaluated; beyond it,
+    new tool calls are dropped (and counted), so that spikes cannot grow the
+    queue without bound. Each tool call is sampled with the rate of its tool.
+
+    The evaluations run on the event loop of the first submitter, or, if it
+    has none, on an event loop of their own in a background thread.
+
+    Args:
+        evaluate: Evaluates one tool call: (index, tool_name, args, delegate) ->
+            GuardVerdict.
+        max_pending: Maximal number of tool calls queued or being evaluated.
+        concurrency: Maximal number of evaluations at once.
+        sample_rates: Fraction of the calls of each tool to evaluate.
+        default_rate: Fraction of the calls of tools without an entry in
+            `sample_rates` to evaluate.
+        on_violation: Receives the verdict of each evaluation that found a policy
+            violation. If None, violations are logged.
+        random: Source of uniform random numbers in [0, 1), for sampling.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[int, str, dict, IToolInvoker], Awaitable["GuardVerdict"]],
+        max_pending: int = 1000,
+        concurrency: int = 4,
+        sample_rates: Optional[Mapping[str, float]] = None,
+        default_rate: float = 1.0,
+        on_violation: Optional[Callable[["GuardVerdict"], Any]] = None,
+        random: Callable[[], float] = random.random,
+    ) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        self._evaluate = evaluate
+        self._max_pending = max_pending
+        self._concurrency = concurrency
+        self._sample_rates = dict(sample_rates or {})
+        self._default_rate = default_rate
+        self._on_violation = on_violation
+        self._random = random
+        self._lock = threading.Lock()
+        self._queue: Deque[_ShadowCall] = deque()
+        self._tasks: Set[asyncio.Task] = set()
+        self._running = 0
+        self._ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stats = ShadowStats()
+
+    @property
+    def stats(self) -> ShadowStats:
+        """A snapshot of the counters."""
+        with self._lock:
+            return ShadowStats(**vars(self._stats))
+
+    @property
+    def pending(self) -> int:
+        """The number of tool calls queued or being evaluated."""
+        return len(self._queue) + self._running
+
+    def submit(self, tool_name: str, args: dict, delegate: IToolInvoker) -> bool:
+        """Queue a tool call for evaluation, without waiting for it.
+
+        Returns:
+            bool: Whether the tool call was queued (or else sampled out or dropped).
+        """
+        rate = self._sample_rates.get(tool_name, self._default_rate)
+        with self._lock:
+            if rate < 1.0 and self._random() >= rate:
+                self._stats.sampled_out += 1
+                return False
+            if self.pending >= self._max_pending:
+                self._stats.dropped += 1
+                return False
+            self._stats.scheduled += 1
+            self._queue.append((next(self._ids), tool_name, args, delegate))
+            loop = self._event_loop()
+        # in a fresh context: the evaluations must not see the deadline (or any
+        # other context variable) of the submitting guard call
+        loop.call_soon_threadsafe(self._pump, context=contextvars.Context())
+        return True
+
+    async def drain(self) -> None:
+        """Wait until all the queued tool calls are evaluated."""
+        while self.pending:
+            await asyncio.sleep(0.005)
+
+    def close(self) -> None:
+        """Cancel the queued and running evaluations."""
+        with self._lock:
+            self._queue.clear()
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+            tasks = list(self._tasks)
+        if loop is None or loop.is_closed():
+            return
+        for task in tasks:
+            loop.call_soon_threadsafe(task.cancel)
+        if thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=1)
+            if not thread.is_alive():
+                loop.close()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None and not self._loop.is_closed():
+            return self._loop
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._thread = None
+        except RuntimeError:  # no running loop: run one of our own
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="toolguard-shadow", daemon=True
+            )
+            self._thread.start()
+        self._running = 0
+        return self._loop
+
+    def _pump(self) -> None:
+        with self._lock:
+            loop = self._loop
+            if loop is None:  # closed
+                return
+            while self._queue and self._running < self._concurrency:
+                call = self._queue.popleft()
+                self._running += 1
+                task = loop.create_task(self._run(*call))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, index: int, tool_name: str, args: dict, delegate: IToolInvoker
+    ) -> None:
+        try:
+            verdict = await self._evaluate(index, tool_name, args, delegate)
+        except Exception as e:
+            with self._lock:
+                self._stats.errors += 1
+            logger.warning(
+                "Shadow guard evaluation failed",
+                extra={"tool": tool_name, "error": str(e)},
+            )
+            return
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._pump()
+
+        if verdict.error is not None:
+            with self._lock:
+                self._stats.errors += 1
+            logger.warning(
+                "Shadow guard evaluation failed",
+                extra={"tool": tool_name, "error": str(verdict.error)},
+            )
+            return
+        with self._lock:
+            self._stats.evaluated += 1
+            if verdict.violation is not None:
+                self._stats.violations += 1
+        if verdict.violation is None:
+            return
+        if self._on_violation is None:
+            logger.warning(
+                "Shadow guard found a policy violation",
+                extra={"tool": tool_name, "violation": str(verdict.violation)},
+            )
+            return
+        try:
+            self._on_violation(verdict)
+        except Exception as e:
+            logger.warning(
+                "Shadow violation callback failed",
+                extra={"tool": tool_name, "error": str(e)},
+            )
@@ -1,11 +1,35 @@
+from .caching import CacheStats, CachingToolInvoker
+from .circuit_breaker import (
+    BulkheadFullError,
+    CircuitBreaker,
+    CircuitBreakerInvoker,
+    CircuitOpenError,
+    CircuitState,
+    ToolUnavailableError,
+    TRANSPORT_ERRORS,
+)
 from .functions import ToolFunctionsInvoker
 from .langchain import LangchainToolInvoker
 from .methods import ToolMethodsInvoker
 from .mcp_invoker import MCPToolInvoker
+from .observed import ObservedToolInvoker
+from .single_flight import SharedFlightInvoker, SingleFlightInvoker
 
 __all__ = [
+    "CacheStats",
+    "CachingToolInvoker",
+    "CircuitBreaker",
+    "CircuitBreakerInvoker",
+    "CircuitState",
+    "TRANSPORT_ERRORS",
+    "ToolUnavailableError",
+    "CircuitOpenError",
+    "BulkheadFullError",
     "LangchainToolInvoker",
     "ToolFunctionsInvoker",
     "ToolMethodsInvoker",
     "MCPToolInvoker",
+    "ObservedToolInvoker",
+    "SingleFlightInvoker",
+    "SharedFlightInvoker",
 ]
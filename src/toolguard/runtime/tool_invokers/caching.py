@@ -0,0 +1,150 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from toolguard.runtime.canonical import call_key
+from toolguard.runtime.data_types import IToolInvoker
+from toolguard.runtime.tool_invokers.single_flight import SingleFlight
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheStats:
+    """Counters of a CachingToolInvoker.
+
+    Attributes:
+        hits: Invocations served from the cache.
+        misses: Cacheable invocations that went to the delegate.
+        bypassed: Invocations of non-cacheable tools (or with arguments that cannot
+            be used as a cache key).
+        evictions: Entries removed because the cache was full.
+        expirations: Entries removed because their TTL passed.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachingToolInvoker(IToolInvoker):
+    """Tool invoker that caches results of read-only tools across invocations.
+
+    Wraps any other invoker (e.g. ToolFunctionsInvoker, ToolMethodsInvoker,
+    LangchainToolInvoker or MCPToolInvoker). Results are kept in a bounded LRU,
+    keyed by tool name and canonicalized arguments, and expire after the TTL
+    of their tool. Concurrent misses of the same key share one delegate call.
+    Cached results are shared between callers and must not be mutated.
+
+    Caching is opt-in per tool: a tool is cached if it has an entry in `ttls`,
+    or if `default_ttl` is set. Tools in `non_cacheable` always bypass the cache.
+
+    Args:
+        delegate: The invoker performing the actual tool calls.
+        ttls: Time to live, in seconds, of the results of each cacheable tool.
+        default_ttl: Time to live of tools without an entry in `ttls`. If None,
+            only the tools in `ttls` are cached.
+        non_cacheable: Tools that are never cached (e.g. tools with side effects).
+        max_entries: Maximal number of cached results. The least recently used
+            entries are evicted first.
+        clock: Monotonic time source, in seconds.
+    """
+
+    T = TypeVar("T")
+
+    def __init__(
+        self,
+        delegate: IToolInvoker,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: Optional[float] = None,
+        non_cacheable: Iterable[str] = (),
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._delegate = delegate
+        self._ttls = dict(ttls or {})
+        self._default_ttl = default_ttl
+        self._non_cacheable = frozenset(non_cacheable)
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._flight = SingleFlight()
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache counters."""
+        return CacheStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_of(self, toolname: str) -> Optional[float]:
+        """The TTL of a tool's results, or None if the tool is not cacheable."""
+        if toolname in self._non_cacheable:
+            return None
+        return self._ttls.get(toolname, self._default_ttl)
+
+    def invalidate(self, toolname: Optional[str] = None) -> None:
+        """Drop cached results, of a single tool or of all tools."""
+        if toolname is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == toolname]:  # type: ignore[index]
+            del self._entries[key]
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
+    ) -> T:
+        ttl = self.ttl_of(toolname)
+        key = call_key(toolname, arguments) if ttl is not None else None
+        if ttl is None or key is None:
+            self._stats.bypassed += 1
+            return await self._delegate.invoke(toolname, arguments, return_type)
+
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return value
+            del self._entries[key]
+            self._stats.expirations += 1
+
+        self._stats.misses += 1
+
+        async def fetch():
+            value = await self._delegate.invoke(toolname, arguments, return_type)
+            self._put(key, self._clock() + ttl, value)
+            return value
+
+        return await self._flight.do(key, fetch)
+
+    def _put(self, key: Hashable, expires_at: float, value: Any) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
@@ -0,0 +1,337 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from toolguard.runtime.data_types import IToolInvoker
+from toolguard.runtime.deadlines import current_deadline
+from toolguard.runtime.observers import current_observers
+
+T = TypeVar("T")
+
+#: Errors of the transport, not of the tool: connection failures and timeouts
+#: (ConnectionError and TimeoutError are OSErrors).
+TRANSPORT_ERRORS: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError)
+
+#: Seconds before a deadline from which a cancellation is blamed on it.
+_DEADLINE_SLACK = 0.001
+
+# (tool name, old state, new state)
+_Transition = Tuple[str, "CircuitState", "CircuitState"]
+
+
+class CircuitState(str, Enum):
+    """The state of the circuit of a tool.
+
+    Attributes:
+        CLOSED: Invocations go through; consecutive failures are counted.
+        OPEN: Invocations fail right away, until the reset timeout passes.
+        HALF_OPEN: A few probe invocations go through. A successful probe closes
+            the circuit, a failed one opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ToolUnavailableError(Exception):
+    """Raised instead of invoking a tool that is considered unavailable.
+
+    Attributes:
+        toolname: The name of the tool.
+    """
+
+    def __init__(self, toolname: str, message: str) -> None:
+        super().__init__(message)
+        self.toolname = toolname
+
+    def __reduce__(self):
+        # picklable, to be raised in guard worker processes
+        return type(self), (self.toolname, str(self))
+
+
+class CircuitOpenError(ToolUnavailableError):
+    """The circuit of the tool is open."""
+
+    def __init__(self, toolname: str, message: Optional[str] = None) -> None:
+        super().__init__(
+            toolname, message or f"The circuit of tool '{toolname}' is open"
+        )
+
+
+class BulkheadFullError(ToolUnavailableError):
+    """The tool has the maximal number of invocations in flight."""
+
+    def __init__(self, toolname: str, message: Optional[str] = None) -> None:
+        super().__init__(
+            toolname, message or f"Too many invocations of tool '{toolname}' in flight"
+        )
+
+
+@dataclass
+class _Circuit:
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probes: int = 0
+    in_flight: int = 0
+
+
+class CircuitBreaker:
+    """Per-tool circuit breakers and bulkheads, shared by many guard evaluations.
+
+    Each invoked tool has its own circuit. A circuit opens after
+    `failure_threshold` consecutive failed invocations: invocations that raise
+    one of `failure_exceptions`, that are cancelled because the deadline of
+    their guard passed (see current_deadline), or that are slower than
+    `slow_call_duration`. Other errors (e.g. a tool rejecting its arguments)
+    show that the tool is up, and count as successes. While it is open, invocations
+    of the tool fail right away (CircuitOpenError), so that guards do not add load
+    to a degraded service. After `reset_timeout`, up to `half_open_probes`
+    invocations probe the tool: the circuit closes on a success, and opens again
+    on a failure.
+
+    The bulkhead limits the invocations of each tool in flight to
+    `max_concurrency`; invocations beyond it fail right away (BulkheadFullError).
+
+    State transitions are reported to the current observers (see
+    GuardObserver.circuit_state_changed).
+
+    Args:
+        failure_threshold: Consecutive failures that open a circuit.
+        reset_timeout: Seconds an open circuit waits before probing the tool.
+        slow_call_duration: Latency, in seconds, above which an invocation counts
+            as a failure. If None, only errors and deadline cancellations are
+            failures.
+        failure_exceptions: The errors that count as failures. Defaults to
+            TRANSPORT_ERRORS.
+        half_open_probes: Invocations allowed at once while probing a tool.
+        max_concurrency: Maximal invocations of each tool in flight. If None,
+            unlimited.
+        excluded_tools: Tools that are always invoked, without a circuit or a
+            bulkhead.
+        clock: Monotonic time source, in seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        slow_call_duration: Optional[float] = None,
+        half_open_probes: int = 1,
+        max_concurrency: Optional[int] = None,
+        excluded_tools: Iterable[str] = (),
+        clock: Callable[[], float] = time.monotonic,
+        failure_exceptions: Tuple[Type[BaseException], ...] = TRANSPORT_ERRORS,
+    ) -> None:
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        if half_open_probes <= 0:
+            raise ValueError("half_open_probes must be positive")
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._slow_call_duration = slow_call_duration
+        self._half_open_probes = half_open_probes
+        self._max_concurrency = max_concurrency
+        self._excluded_tools = frozenset(excluded_tools)
+        self._clock = clock
+        self._failure_exceptions = failure_exceptions
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def state(self, toolname: str) -> CircuitState:
+        """The state of the circuit of a tool."""
+        transitions: List[_Transition] = []
+        with self._lock:
+            circuit = self._circuits.get(toolname)
+            if circuit is None:
+                return CircuitState.CLOSED
+            self._maybe_half_open(toolname, circuit, transitions)
+            state = circuit.state
+        _notify(transitions)
+        return state
+
+    def in_flight(self, toolname: str) -> int:
+        """The number of invocations of a tool in flight."""
+        circuit = self._circuits.get(toolname)
+        return circuit.in_flight if circuit else 0
+
+    def reset(self) -> None:
+        """Close all the circuits."""
+        transitions: List[_Transition] = []
+        with self._lock:
+            for toolname, circuit in self._circuits.items():
+                self._transition(toolname, circuit, CircuitState.CLOSED, transitions)
+                circuit.failures = 0
+        _notify(transitions)
+
+    def excluded(self, toolname: str) -> bool:
+        return toolname in self._excluded_tools
+
+    def is_failure(self, error: BaseException) -> bool:
+        """Whether an error of an invocation counts as a failure of the tool."""
+        return isinstance(error, self._failure_exceptions)
+
+    def acquire(self, toolname: str) -> bool:
+        """Admit an invocation of a tool, or fail right away.
+
+        Returns:
+            bool: Whether the invocation is a probe of a half-open circuit.
+
+        Raises:
+            CircuitOpenError: If the circuit of the tool is open.
+            BulkheadFullError: If the tool has too many invocations in flight.
+        """
+        transitions: List[_Transition] = []
+        error: Optional[ToolUnavailableError] = None
+        with self._lock:
+            circuit = self._circuits.setdefault(toolname, _Circuit())
+            self._maybe_half_open(toolname, circuit, transitions)
+            probe = circuit.state == CircuitState.HALF_OPEN
+            if circuit.state == CircuitState.OPEN or (
+                probe and circuit.probes >= self._half_open_probes
+            ):
+                error = CircuitOpenError(toolname)
+            elif (
+                self._max_concurrency is not None
+                and circuit.in_flight >= self._max_concurrency
+            ):
+                error = BulkheadFullError(toolname)
+            else:
+                circuit.in_flight += 1
+                if probe:
+                    circuit.probes += 1
+        _notify(transitions)
+        if error is not None:
+            raise error
+        return probe
+
+    def release(
+        self, toolname: str, probe: bool, latency: float, failed: Optional[bool]
+    ) -> None:
+        """Record the outcome of an admitted invocation.
+
+        Args:
+            toolname: The name of the invoked tool.
+            probe: Whether the invocation was a probe (see acquire).
+            latency: The latency of the invocation, in seconds.
+            failed: Whether the invocation failed, or None if the outcome is
+                unknown (e.g. the invocation was cancelled).
+        """
+        slow = (
+            self._slow_call_duration is not None and latency > self._slow_call_duration
+        )
+        transitions: List[_Transition] = []
+        with self._lock:
+            circuit = self._circuits[toolname]
+            circuit.in_flight -= 1
+            if probe:
+                circuit.probes = max(circuit.probes - 1, 0)
+            if failed or slow:
+                self._on_failure(toolname, circuit, transitions)
+            elif failed is not None:
+                self._on_success(toolname, circuit, transitions)
+        _notify(transitions)
+
+    def _on_failure(
+        self, toolname: str, circuit: _Circuit, transitions: List[_Transition]
+    ) -> None:
+        circuit.failures += 1
+        if circuit.state == CircuitState.HALF_OPEN or (
+            circuit.state == CircuitState.CLOSED
+            and circuit.failures >= self._failure_threshold
+        ):
+            circuit.opened_at = self._clock()
+            self._transition(toolname, circuit, CircuitState.OPEN, transitions)
+
+    def _on_success(
+        self, toolname: str, circuit: _Circuit, transitions: List[_Transition]
+    ) -> None:
+        if circuit.state == CircuitState.OPEN:
+            return  # started before the circuit opened
+        circuit.failures = 0
+        self._transition(toolname, circuit, CircuitState.CLOSED, transitions)
+
+    def _maybe_half_open(
+        self, toolname: str, circuit: _Circuit, transitions: List[_Transition]
+    ) -> None:
+        if (
+            circuit.state == CircuitState.OPEN
+            and self._clock() - circuit.opened_at >= self._reset_timeout
+        ):
+            self._transition(toolname, circuit, CircuitState.HALF_OPEN, transitions)
+
+    def _transition(
+        self,
+        toolname: str,
+        circuit: _Circuit,
+        state: CircuitState,
+        transitions: List[_Transition],
+    ) -> None:
+        """Change the state of a circuit. The transition is recorded, for the
+        observers to be notified once the lock is released."""
+        old, circuit.state = circuit.state, state
+        if old != state:
+            transitions.append((toolname, old, state))
+
+
+def _deadline_passed() -> bool:
+    deadline = current_deadline.get()
+    # timers may fire up to the clock resolution early
+    return deadline is not None and time.monotonic() >= deadline - _DEADLINE_SLACK
+
+
+def _notify(transitions: List[_Transition]) -> None:
+    for toolname, old, new in transitions:
+        for observer in current_observers.get():
+            observer.circuit_state_changed(toolname, old, new)
+
+
+class CircuitBreakerInvoker(IToolInvoker):
+    """Tool invoker that passes invocations through a CircuitBreaker.
+
+    Invocations of a tool whose circuit is open, or whose bulkhead is full, raise
+    a ToolUnavailableError without calling the delegate. Errors of the delegate
+    count as failures of the tool only if the breaker says so (see
+    CircuitBreaker.is_failure). An invocation cancelled at the deadline of its
+    guard counts as a failure, so that a hanging tool opens its circuit; other
+    cancellations have an unknown outcome.
+
+    Args:
+        delegate: The invoker performing the actual tool calls.
+        breaker: The circuits, usually shared by all the guard evaluations.
+    """
+
+    T = TypeVar("T")
+
+    def __init__(self, delegate: IToolInvoker, breaker: CircuitBreaker) -> None:
+        self._delegate = delegate
+        self._breaker = breaker
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
+    ) -> T:
+        if self._breaker.excluded(toolname):
+            return await self._delegate.invoke(toolname, arguments, return_type)
+
+        probe = self._breaker.acquire(toolname)
+        failed: Optional[bool] = None
+        start = time.perf_counter()
+        try:
+            result = await self._delegate.invoke(toolname, arguments, return_type)
+            failed = False
+            return result
+        except asyncio.CancelledError:
+            if _deadline_passed():
+                failed = True
+            raise
+        except Exception as e:
+            failed = self._breaker.is_failure(e)
+            raise
+        finally:
+            self._breaker.release(toolname, probe, time.perf_counter() - start, failed)
@@ -1,27 +1,167 @@
-from typing import Any, Dict, Type, TypeVar, cast
+import asyncio
+import weakref
+from typing import Any, AsyncGenerator, Dict, List, Optional, Type, TypeVar, cast
 
 from fastmcp.client import Client
+from fastmcp.exceptions import ToolError
 from toolguard.runtime.data_types import IToolInvoker
 
 T = TypeVar("T")
 
 
-class MCPToolInvoker(IToolInvoker):  # pylint: disable=too-few-public-methods
+class MCPToolInvoker(IToolInvoker):
     """Tool invoker implementation for MCP (Model Context Protocol) servers.
 
     This invoker enables interaction with MCP servers through the fastmcp client,
     allowing tools to be invoked remotely via the MCP protocol.
 
+    Sessions are long-lived: a session is connected on first use and reused by
+    later invocations. Up to `pool_size` sessions serve concurrent invocations
+    (the first one is `client` itself, the others are created with
+    `client.new()`). A session that fails for any reason other than a tool error
+    is disconnected, and the invocation is retried on a fresh connection.
+
+    Connections belong to the event loop that opened them, so each event loop
+    has its own sessions (e.g. `guard_toolcall_sync` runs each guard in a new
+    loop, and then connects again). `client` itself is used by one loop at a
+    time. The sessions of a loop are disconnected when the loop shuts down its
+    async generators, as `asyncio.run` does before it closes the loop.
+
+    Close the sessions with `aclose()`, or use the invoker as an async context
+    manager:
+
+        async with MCPToolInvoker(client, pool_size=4) as invoker:
+            ...
+
     Args:
         client: An initialized fastmcp Client instance for communicating with the MCP server.
+        pool_size: Maximal number of concurrently connected sessions.
+        reconnect_attempts: How many times an invocation is retried on a new
+            connection after a connection failure.
     """
 
-    def __init__(self, client: Client) -> None:
+    def __init__(
+        self, client: Client, pool_size: int = 1, reconnect_attempts: int = 1
+    ) -> None:
+        if pool_size <= 0:
+            raise ValueError("pool_size must be positive")
         self._client = client
+        self._pool_size = pool_size
+        self._reconnect_attempts = reconnect_attempts
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _SessionPool]" = weakref.WeakKeyDictionary()
+        self._client_taken = False
+
+    async def __aenter__(self) -> "MCPToolInvoker":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Disconnect the sessions of all event loops. The sessions of a loop
+        that is neither running nor closed are disconnected when it shuts down.
+        The invoker reconnects if it is used again."""
+        loop = asyncio.get_running_loop()
+        for pool_loop, pool in list(self._pools.items()):
+            if pool_loop is loop:
+                await pool.close()
+            elif pool_loop.is_closed():
+                # its connections died with it
+                self._pools.pop(pool_loop, None)
+                self._forget(pool.sessions)
+            elif pool_loop.is_running():
+                # connections can only be closed from their own loop
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(pool.close(), pool_loop)
+                )
 
     async def invoke(
         self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
     ) -> T:
-        async with self._client:
-            result = await self._client.call_tool(name=toolname, arguments=arguments)
-            return cast(T, result.data)
+        pool = await self._pool()
+        async with pool.slots:
+            session = pool.idle.pop() if pool.idle else self._new_session(pool)
+            try:
+                result = await self._call_tool(session, toolname, arguments)
+            finally:
+                if session in pool.sessions:  # not closed meanwhile
+                    pool.idle.append(session)
+        return cast(T, result.data)
+
+    async def _pool(self) -> "_SessionPool":
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = _SessionPool(self._pool_size)
+            # finalized by the loop's shutdown_asyncgens, in the loop
+            pool.closer = self._close_at_shutdown(pool)
+            await pool.closer.__anext__()
+        return pool
+
+    async def _close_at_shutdown(
+        self, pool: "_SessionPool"
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            # not kept while suspended: the pools hold only weak references to
+            # their loops
+            loop = asyncio.get_running_loop()
+            if self._pools.get(loop) is pool:
+                del self._pools[loop]
+            sessions, pool.sessions, pool.idle = pool.sessions, [], []
+            for session in sessions:
+                await _disconnect(session)
+            self._forget(sessions)
+
+    def _new_session(self, pool: "_SessionPool") -> Client:
+        if self._client_taken:
+            session = self._client.new()
+        else:
+            session = self._client
+            self._client_taken = True
+        pool.sessions.append(session)
+        return session
+
+    def _forget(self, sessions: List[Client]) -> None:
+        if self._client in sessions:
+            self._client_taken = False
+
+    async def _call_tool(
+        self, session: Client, toolname: str, arguments: Dict[str, Any]
+    ) -> Any:
+        attempt = 0
+        while True:
+            try:
+                if not session.is_connected():
+                    await session.__aenter__()
+                return await session.call_tool(name=toolname, arguments=arguments)
+            except ToolError:
+                raise
+            except Exception:
+                await _disconnect(session)
+                if attempt >= self._reconnect_attempts:
+                    raise
+                attempt += 1
+
+
+class _SessionPool:
+    """The sessions of one event loop."""
+
+    def __init__(self, size: int) -> None:
+        self.sessions: List[Client] = []
+        self.idle: List[Client] = []
+        self.slots = asyncio.Semaphore(size)
+        #: disconnects the sessions when closed
+        self.closer: Optional[AsyncGenerator[None, None]] = None
+
+    async def close(self) -> None:
+        if self.closer is not None:
+            await self.closer.aclose()
+
+
+async def _disconnect(session: Client) -> None:
+    try:
+        await session.close()
+    except Exception:  # already broken
+        pass
@@ -0,0 +1,48 @@
+import time
+from typing import Any, Dict, Type, TypeVar
+
+from toolguard.runtime.data_types import IToolInvoker
+from toolguard.runtime.observers import current_api_calls, current_observers
+from toolguard.runtime.rules import current_rule
+
+T = TypeVar("T")
+
+
+class ObservedToolInvoker(IToolInvoker):
+    """Tool invoker that reports every invocation to the current observers.
+
+    Invocations are attributed to the rule that made them (see `current_rule`).
+    If the guard evaluation is audited, they are also added to its record (see
+    `current_api_calls`).
+
+    Args:
+        delegate: The invoker performing the actual tool calls.
+    """
+
+    T = TypeVar("T")
+
+    def __init__(self, delegate: IToolInvoker) -> None:
+        self._delegate = delegate
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
+    ) -> T:
+        observers = current_observers.get()
+        api_calls = current_api_calls.get()
+        if not observers and api_calls is None:
+            return await self._delegate.invoke(toolname, arguments, return_type)
+
+        error = None
+        start = time.perf_counter()
+        try:
+            return await self._delegate.invoke(toolname, arguments, return_type)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end = time.perf_counter()
+            if api_calls is not None:
+                api_calls.append((toolname, start, end, error))
+            rule = current_rule.get()
+            for observer in observers:
+                observer.tool_invoked(rule, toolname, start, end, error)
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import weakref
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Type,
+    TypeVar,
+)
+
+from toolguard.runtime.canonical import call_key
+from toolguard.runtime.data_types import IToolInvoker
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent executions of the same keyed operation.
+
+    The first caller of a key starts the operation as a shared task, and later
+    callers with the same key await that task instead of starting their own.
+    Each waiter is shielded: a cancelled waiter does not cancel the shared task
+    while other waiters still depend on it. When the last waiter is cancelled,
+    the shared task is cancelled too.
+
+    Args:
+        keep_results: If True, successful results are kept and served to later
+            callers of the same key (memoization). If False, a key is forgotten as
+            soon as its task completes. Failed operations are never kept.
+    """
+
+    def __init__(self, keep_results: bool = False) -> None:
+        self._keep_results = keep_results
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn`, or join the in-flight (or memoized) run for the same key.
+
+        Args:
+            key: Identifies operations that can be shared.
+            fn: Starts the operation. Called at most once per in-flight key.
+
+        Returns:
+            The result of the shared operation.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+
+        if task.done():
+            return task.result()
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(task) == 1:
+                task.cancel()
+                # callers arriving before it is done must start a new task
+                if self._tasks.get(key) is task:
+                    del self._tasks[key]
+            raise
+        finally:
+            remaining = self._waiters.get(task, 1) - 1
+            if remaining:
+                self._waiters[task] = remaining
+            else:
+                self._waiters.pop(task, None)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        failed = task.cancelled() or task.exception() is not None
+        if (failed or not self._keep_results) and self._tasks.get(key) is task:
+            del self._tasks[key]
+
+
+class SingleFlightInvoker(IToolInvoker):
+    """Tool invoker that coalesces identical invocations into one delegate call.
+
+    Invocations are identified by the tool name and the canonicalized arguments.
+    Invocations whose arguments cannot be canonicalized go straight to the delegate.
+
+    Args:
+        delegate: The invoker performing the actual tool calls.
+        keep_results: Memoize successful results for the lifetime of this invoker.
+            Use it for a bounded scope, such as a single guard evaluation.
+    """
+
+    T = TypeVar("T")
+
+    def __init__(self, delegate: IToolInvoker, keep_results: bool = True) -> None:
+        self._delegate = delegate
+        self._flight = SingleFlight(keep_results=keep_results)
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
+    ) -> T:
+        key = call_key(toolname, arguments)
+        if key is None:
+            return await self._delegate.invoke(toolname, arguments, return_type)
+        return await self._flight.do(
+            key, lambda: self._delegate.invoke(toolname, arguments, return_type)
+        )
+
+
+#: The process-wide flights, by event loop and scope.
+_shared_flights: "weakref.WeakKeyDictionary[Any, Dict[Hashable, SingleFlight]]" = (
+    weakref.WeakKeyDictionary()
+)
+_shared_flights_lock = threading.Lock()
+
+
+def shared_flight(scope: Hashable = None) -> SingleFlight:
+    """The process-wide SingleFlight of a scope, in the running event loop.
+
+    Tasks belong to an event loop, so each loop has its own flights.
+    """
+    loop = asyncio.get_running_loop()
+    with _shared_flights_lock:
+        flights = _shared_flights.setdefault(loop, {})
+        flight = flights.get(scope)
+        if flight is None:
+            flight = flights[scope] = SingleFlight(keep_results=False)
+        return flight
+
+
+class SharedFlightInvoker(IToolInvoker):
+    """Tool invoker that coalesces identical in-flight invocations of read-only
+    tools across all the invokers of the same scope in the process.
+
+    Unlike SingleFlightInvoker with `keep_results`, nothing is kept once the
+    shared invocation completes, so results are never stale. The shared
+    invocation is made through the delegate of the first caller; all the
+    delegates of a scope must therefore see the same backend data (use a scope
+    per backend or tenant).
+
+    Args:
+        delegate: The invoker performing the actual tool calls.
+        tools: The read-only tools to coalesce. Other tools go straight to the
+            delegate.
+        scope: Invokers coalesce only with invokers of the same scope.
+    """
+
+    T = TypeVar("T")
+
+    def __init__(
+        self,
+        delegate: IToolInvoker,
+        tools: Iterable[str],
+        scope: Optional[Hashable] = None,
+    ) -> None:
+        self._delegate = delegate
+        self._tools = frozenset(tools)
+        self._scope = scope
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type[T]
+    ) -> T:
+        key = call_key(toolname, arguments) if toolname in self._tools else None
+        if key is None:
+            return await self._delegate.invoke(toolname, arguments, return_type)
+        return await shared_flight(self._scope).do(
+            (key, return_type),
+            lambda: self._delegate.invoke(toolname, arguments, return_type),
+        )
@@ -0,0 +1,236 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from toolguard.runtime.metrics import CANCELLED, ERROR, outcome_of
+from toolguard.runtime.observers import GuardObserver
+
+RULE = "rule"
+API = "api"
+
+# OTLP span kinds and status codes
+_SPAN_KIND_INTERNAL = 1
+_SPAN_KIND_CLIENT = 3
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+@dataclass(eq=False)
+class Span:
+    """A timed step of a guard evaluation: a rule, or a delegate invocation.
+
+    Attributes:
+        name: The rule name, or `api.<tool>` for a delegate invocation.
+        kind: RULE or API.
+        rule: The rule path (for an invocation, of the rule that made it).
+        start: When the step started, as a `time.perf_counter()` reading.
+        end: When the step finished, or None while it runs.
+        error: The exception the step raised, if any.
+        trace_id: Identifies the guard evaluation.
+        span_id: Identifies the step.
+        parent_id: The span_id of the enclosing rule, or None for the tool guard.
+        children: The nested rules and the invocations made by the rule, in
+            start order.
+    """
+
+    name: str
+    kind: str
+    rule: Tuple[str, ...]
+    start: float
+    end: Optional[float] = None
+    error: Optional[BaseException] = None
+    trace_id: int = 0
+    span_id: int = 0
+    parent_id: Optional[int] = None
+    children: List["Span"] = field(default_factory=list)
+    _token: Optional[Token] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+    @property
+    def outcome(self) -> str:
+        """pass, violation, error or cancelled (see `outcome_of`)."""
+        return outcome_of(self.error)
+
+    def walk(self) -> Iterator["Span"]:
+        """This span and all its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class GuardTracer(GuardObserver):
+    """Records a trace of each guard evaluation: a tree of rule spans, with the
+    tool guard as the root and its item guards (and their nested rules) as
+    children. Each delegate invocation is a span attached to the rule that made
+    it.
+
+    Register it as a runtime observer to turn tracing on:
+
+        tracer = GuardTracer()
+        with load_toolguards(path, observers=[tracer]) as toolguard:
+            ...
+        json.dump(tracer.to_chrome_trace(), open("guards.trace.json", "w"))
+
+    The traces can be exported in the Chrome trace-event format (for
+    chrome://tracing or Perfetto), or as OpenTelemetry spans in the OTLP JSON
+    encoding. Guards evaluated in worker processes (`process_pool_tools`) are
+    not traced.
+
+    Args:
+        max_traces: Number of most recent traces to keep.
+    """
+
+    def __init__(self, max_traces: int = 1000) -> None:
+        self._traces: Deque[Span] = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        # per tracer, so that several tracers do not see each other's spans
+        self._current: ContextVar[Optional[Span]] = ContextVar(
+            f"guard_tracer_{id(self)}", default=None
+        )
+        # converts perf_counter readings to wall-clock time
+        self._epoch = time.time() - time.perf_counter()
+
+    @property
+    def traces(self) -> List[Span]:
+        """The root spans of the finished guard evaluations, oldest first."""
+        with self._lock:
+            return list(self._traces)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+    def rule_started(self, rule, start) -> None:
+        parent = self._current.get()
+        span = Span(
+            name=rule[-1],
+            kind=RULE,
+            rule=rule,
+            start=start,
+            trace_id=parent.trace_id if parent else random.getrandbits(128),
+            span_id=random.getrandbits(64),
+            parent_id=parent.span_id if parent else None,
+        )
+        if parent is not None:
+            parent.children.append(span)
+        span._token = self._current.set(span)
+
+    def rule_finished(self, rule, start, end, error) -> None:
+        span = self._current.get()
+        if span is None or span.rule != rule:
+            return  # replayed from a worker process
+        span.end = end
+        span.error = error
+        self._current.reset(span._token)  # type: ignore[arg-type]
+        span._token = None
+        if span.parent_id is None:
+            with self._lock:
+                self._traces.append(span)
+
+    def tool_invoked(self, rule, toolname, start, end, error) -> None:
+        parent = self._current.get()
+        if parent is None:
+            return
+        parent.children.append(
+            Span(
+                name=f"{API}.{toolname}",
+                kind=API,
+                rule=rule,
+                start=start,
+                end=end,
+                error=error,
+                trace_id=parent.trace_id,
+                span_id=random.getrandbits(64),
+                parent_id=parent.span_id,
+            )
+        )
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Export the traces as Chrome trace events.
+
+        Each guard evaluation is shown on its own row, named after the tool.
+        """
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        for tid, root in enumerate(self.traces, start=1):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": f"{root.name} #{tid}"},
+                }
+            )
+            for span in root.walk():
+                args: Dict[str, Any] = {
+                    "rule": "/".join(span.rule),
+                    "outcome": span.outcome,
+                }
+                if span.error is not None:
+                    args["error"] = str(span.error)
+                events.append(
+                    {
+                        "name": span.name,
+                        "cat": span.kind,
+                        "ph": "X",
+                        "ts": span.start * 1e6,
+                        "dur": span.duration * 1e6,
+                        "pid": pid,
+                        "tid": tid,
+                        "args": args,
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otel_spans(self) -> List[Dict[str, Any]]:
+        """Export the traces as OpenTelemetry spans, in the OTLP JSON encoding
+        (the `spans` of a `ScopeSpans`).
+
+        Rules are internal spans, and delegate invocations client spans. Spans
+        that failed with an error, or were cancelled, have an error status; policy
+        violations are recorded in the `toolguard.outcome` attribute.
+        """
+        spans = []
+        for root in self.traces:
+            for span in root.walk():
+                attributes = {
+                    "toolguard.rule": "/".join(span.rule),
+                    "toolguard.outcome": span.outcome,
+                }
+                otel: Dict[str, Any] = {
+                    "traceId": f"{span.trace_id:032x}",
+                    "spanId": f"{span.span_id:016x}",
+                    "name": span.name,
+                    "kind": _SPAN_KIND_CLIENT
+                    if span.kind == API
+                    else _SPAN_KIND_INTERNAL,
+                    "startTimeUnixNano": str(self._unix_nano(span.start)),
+                    "endTimeUnixNano": str(self._unix_nano(span.start + span.duration)),
+                    "attributes": [
+                        {"key": key, "value": {"stringValue": value}}
+                        for key, value in attributes.items()
+                    ],
+                    "status": _otel_status(span),
+                }
+                if span.parent_id is not None:
+                    otel["parentSpanId"] = f"{span.parent_id:016x}"
+                spans.append(otel)
+        return spans
+
+    def _unix_nano(self, perf_counter: float) -> int:
+        return int((self._epoch + perf_counter) * 1e9)
+
+
+def _otel_status(span: Span) -> Dict[str, Any]:
+    if span.outcome in (ERROR, CANCELLED):
+        return {"code": _STATUS_ERROR, "message": str(span.error)}
+    return {"code": _STATUS_OK}
@@ -0,0 +1,100 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence
+
+from toolguard.runtime.canonical import canonical_json
+from toolguard.runtime.data_types import PolicyViolationException
+from toolguard.runtime.tool_invokers.caching import CacheStats
+
+
+class VerdictCache:
+    """Bounded LRU of the verdicts of pure tool guards.
+
+    A tool guard is pure if the build found that its verdict depends only on
+    the tool call arguments (see ToolManifest.pure): it calls no API, and
+    reads no clock or random numbers. Its verdicts are keyed by the tool name
+    and the canonicalized values of only the arguments it reads (by their keys
+    in the tool call, so field aliases included), so tool calls that differ in
+    other arguments share a verdict.
+
+    A cached violation is raised again as a copy of the original exception,
+    with the same message and rule.
+
+    Args:
+        max_entries: Maximal number of cached verdicts. The least recently used
+            entries are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Optional[PolicyViolationException]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache counters."""
+        return CacheStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(
+        self, tool_name: str, args: dict, arg_keys: Optional[Sequence[str]]
+    ) -> Optional[Hashable]:
+        """The cache key of a tool call, or None if its verdict is not cacheable.
+
+        Args:
+            tool_name: The name of the tool.
+            args: The tool call arguments.
+            arg_keys: The keys of the arguments that the guard reads, or None if
+                its verdict is not cacheable.
+        """
+        if arg_keys is None:
+            self._stats.bypassed += 1
+            return None
+        args_json = canonical_json({k: args[k] for k in arg_keys if k in args})
+        if args_json is None:
+            self._stats.bypassed += 1
+            return None
+        return (tool_name, args_json)
+
+    def replay(self, key: Hashable) -> bool:
+        """Replay the cached verdict of a tool call.
+
+        Returns:
+            bool: True if the tool call is known to be allowed, False if its
+            verdict is not cached.
+
+        Raises:
+            PolicyViolationException: If the tool call is known to violate a policy.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._stats.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            violation = self._entries[key]
+        if violation is not None:
+            # a copy, so that the traceback of the original does not grow
+            raise copy.copy(violation).with_traceback(None)
+        return True
+
+    def put(self, key: Hashable, violation: Optional[PolicyViolationException]) -> None:
+        """Cache the verdict of a tool call: its violation, or None if allowed."""
+        with self._lock:
+            self._entries[key] = violation
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
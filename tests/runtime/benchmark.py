@@ -0,0 +1,293 @@
+"""Micro-benchmarks of ToolguardRuntime.guard_toolcall.
+
+Loads the calculator and appointments example guards (tests/runtime/test_data),
+through both load_toolguards and load_toolguards_from_memory, and measures the
+throughput and latency percentiles of guard_toolcall for pass and violation
+paths, argument-only and API-dependent guards, and several numbers of
+concurrent callers. The API is served by in-memory invokers with a
+configurable latency.
+
+Run from the repository root:
+
+    python -m tests.runtime.benchmark --out bench.json
+    python -m tests.runtime.benchmark --out new.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from toolguard.runtime import (
+    IToolInvoker,
+    PolicyViolationException,
+    load_toolguards,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.runtime import ToolguardRuntime
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+LOADERS = ("directory", "memory")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    app_dir: Path
+    tool_name: str
+    args: Dict[str, Any]
+    violation: bool
+    uses_api: bool
+
+
+SCENARIOS = (
+    Scenario("calculator_add_pass", CALCULATOR_DIR, "add_tool", {"a": 5, "b": 3}, False, False),
+    Scenario("calculator_divide_violation", CALCULATOR_DIR, "divide_tool", {"a": 1, "b": 0}, True, False),
+    Scenario("appointments_add_user_pass", APPOINTMENTS_DIR, "add_user", add_user_args(), False, False),
+    Scenario(
+        "appointments_add_user_violation",
+        APPOINTMENTS_DIR,
+        "add_user",
+        add_user_args(membership_type="platinum"),
+        True,
+        False,
+    ),
+    Scenario("appointments_schedule_pass", APPOINTMENTS_DIR, "schedule_appointment", schedule_args(), False, True),
+    Scenario(
+        "appointments_schedule_violation",
+        APPOINTMENTS_DIR,
+        "schedule_appointment",
+        schedule_args(pay_id=20),
+        True,
+        True,
+    ),
+)  # fmt: skip
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    tool_name: str
+    loader: str
+    outcome: str
+    uses_api: bool
+    concurrency: int
+    calls: int
+    throughput_per_s: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}/{self.loader}/c{self.concurrency}"
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values, for q in [0, 100]."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def measure(
+    runtime: ToolguardRuntime,
+    scenario: Scenario,
+    invoker: IToolInvoker,
+    concurrency: int,
+    calls: int,
+) -> List[float]:
+    """Guard `calls` tool calls with `concurrency` concurrent callers.
+
+    Returns:
+        The latency of each call, in seconds.
+    """
+    latencies: List[float] = []
+    remaining = calls
+
+    async def caller():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                await runtime.guard_toolcall(scenario.tool_name, scenario.args, invoker)
+                violated = False
+            except PolicyViolationException:
+                violated = True
+            latencies.append(time.perf_counter() - start)
+            if violated != scenario.violation:
+                raise AssertionError(f"{scenario.name}: unexpected outcome")
+
+    await asyncio.gather(*[caller() for _ in range(concurrency)])
+    return latencies
+
+
+def _open_runtime(app_dir: Path, loader: str) -> ToolguardRuntime:
+    if loader == "directory":
+        return load_toolguards(app_dir)
+    return load_toolguards_from_memory(ToolGuardsCodeGenerationResult.load(app_dir))
+
+
+async def run_benchmarks(
+    calls: int = 500,
+    concurrency: Sequence[int] = DEFAULT_CONCURRENCY,
+    api_latency: float = 0.001,
+    loaders: Sequence[str] = LOADERS,
+    scenarios: Sequence[Scenario] = SCENARIOS,
+    warmup: int = 20,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> Dict[str, Any]:
+    """Run the benchmarks.
+
+    Args:
+        calls: Number of measured guard_toolcall calls per configuration.
+        concurrency: Numbers of concurrent callers to measure.
+        api_latency: Latency, in seconds, of every API call.
+        loaders: "directory" (load_toolguards) and/or "memory"
+            (load_toolguards_from_memory).
+        scenarios: The tool calls to guard.
+        warmup: Number of unmeasured calls before each configuration.
+        progress: Called with each result as soon as it is measured.
+
+    Returns:
+        A JSON-serializable report, with the environment and the results.
+    """
+    results: List[BenchmarkResult] = []
+    for loader in loaders:
+        for scenario in scenarios:
+            invoker = (
+                FakeAppointmentsInvoker(latency=api_latency)
+                if scenario.uses_api
+                else NoApiInvoker()
+            )
+            with _open_runtime(scenario.app_dir, loader) as runtime:
+                for n in concurrency:
+                    await measure(runtime, scenario, invoker, n, warmup)
+                    if isinstance(invoker, FakeAppointmentsInvoker):
+                        invoker.calls.clear()
+                    start = time.perf_counter()
+                    latencies = await measure(runtime, scenario, invoker, n, calls)
+                    elapsed = time.perf_counter() - start
+                    latencies.sort()
+                    result = BenchmarkResult(
+                        scenario=scenario.name,
+                        tool_name=scenario.tool_name,
+                        loader=loader,
+                        outcome="violation" if scenario.violation else "pass",
+                        uses_api=scenario.uses_api,
+                        concurrency=n,
+                        calls=len(latencies),
+                        throughput_per_s=len(latencies) / elapsed,
+                        mean_ms=1000 * sum(latencies) / len(latencies),
+                        p50_ms=1000 * percentile(latencies, 50),
+                        p95_ms=1000 * percentile(latencies, 95),
+                        p99_ms=1000 * percentile(latencies, 99),
+                    )
+                    results.append(result)
+                    if progress:
+                        progress(result)
+
+    return {
+        "environment": _environment(),
+        "config": {
+            "calls": calls,
+            "concurrency": list(concurrency),
+            "api_latency_s": api_latency,
+            "warmup": warmup,
+        },
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Describe the change of throughput and p99 of each configuration."""
+
+    def by_key(report):
+        return {BenchmarkResult(**r).key: r for r in report["results"]}
+
+    baseline_results = by_key(baseline)
+    lines = []
+    for key, new in by_key(current).items():
+        old = baseline_results.get(key)
+        if old is None:
+            continue
+        throughput = new["throughput_per_s"] / old["throughput_per_s"] - 1
+        p99 = new["p99_ms"] / old["p99_ms"] - 1 if old["p99_ms"] else 0.0
+        lines.append(f"{key:60} throughput {throughput:+7.1%}  p99 {p99:+7.1%}")
+    return lines
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        toolguard_version = version("toolguard")
+    except PackageNotFoundError:
+        toolguard_version = None
+    return {
+        "toolguard": toolguard_version,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _format(result: BenchmarkResult) -> str:
+    return (
+        f"{result.key:60} {result.throughput_per_s:10.0f}/s  "
+        f"p50 {result.p50_ms:7.3f}ms  p95 {result.p95_ms:7.3f}ms  "
+        f"p99 {result.p99_ms:7.3f}ms"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, help="Write the JSON report to this file.")
+    parser.add_argument(
+        "--compare", type=Path, help="A previous JSON report to compare with."
+    )
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY)
+    )
+    parser.add_argument("--api-latency", type=float, default=0.001)
+    parser.add_argument("--loaders", nargs="+", choices=LOADERS, default=list(LOADERS))
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_benchmarks(
+            calls=args.calls,
+            concurrency=args.concurrency,
+            api_latency=args.api_latency,
+            loaders=args.loaders,
+            progress=lambda r: print(_format(r)),
+        )
+    )
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        print(f"\nCompared with {args.compare}:")
+        for line in compare(json.loads(args.compare.read_text()), report):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
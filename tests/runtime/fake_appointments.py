@@ -0,0 +1,119 @@
+"""An in-memory backend for the appointments example guards (tests/runtime/test_data/appointments)."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Type
+
+from toolguard.runtime import IToolInvoker
+
+APPOINTMENTS_DIR = Path(__file__).parent / "test_data" / "appointments"
+
+USERS = {
+    1: {"membership_type": "gold", "first_name": "Gil"},
+    2: {"membership_type": "regular", "first_name": "Rina"},
+}
+PAYMENT_METHODS = {1: [10, 11], 2: [20]}
+
+
+def _slot(slot_id: int, date: str, start_time: str, fee: float) -> Dict[str, Any]:
+    return {
+        "slot_id": slot_id,
+        "dr_name": "Dr. Who",
+        "specialty": "family",
+        "date": date,
+        "start_time": start_time,
+        "end_time": start_time,
+        "visit_fee": fee,
+        "rating": 4.5,
+    }
+
+
+SLOTS = {
+    100: _slot(100, "2030-01-05", "09:00", 100.0),
+    101: _slot(101, "2030-01-05", "10:00", 200.0),
+    200: _slot(200, "2030-01-05", "10:00", 150.0),
+}
+USER_APPOINTMENTS = {1: [], 2: [200]}
+
+
+class FakeAppointmentsInvoker(IToolInvoker):
+    """Answers the read-only appointments tools, after an optional latency.
+
+    Args:
+        latency: Seconds to sleep in every invocation.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type
+    ) -> Any:
+        self.calls.append((toolname, arguments))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        data = getattr(self, toolname)(**arguments)
+        validate = getattr(return_type, "model_validate", None)
+        return validate(data) if validate else data
+
+    def get_user(self, user_id: int):
+        user = USERS.get(user_id)
+        if user is None:
+            return None
+        return {
+            "user_id": str(user_id),
+            "ssn": 1000 + user_id,
+            "last_name": "Levi",
+            "address": "Haifa",
+            "email": f"{user_id}@example.com",
+            "phone": "050",
+            "enter_date": "2020-01-01",
+            **user,
+        }
+
+    def get_user_payment_methods(self, user_id: int):
+        return [
+            {
+                "pay_id": pay_id,
+                "card_last_4": 1234,
+                "card_brand": "Visa",
+                "card_exp": "01/35",
+                "card_id": f"card-{pay_id}",
+            }
+            for pay_id in PAYMENT_METHODS.get(user_id, [])
+        ]
+
+    def get_appointment_slot(self, slot_id: int):
+        return SLOTS.get(slot_id)
+
+    def get_user_appointments(self, user_id: Any):
+        return [SLOTS[slot_id] for slot_id in USER_APPOINTMENTS.get(user_id, [])]
+
+
+def schedule_args(
+    user_id: int = 1, pay_id: int = 10, slot_id: int = 100, payment_amount=90.0
+):
+    return {
+        "user_id": user_id,
+        "pay_id": pay_id,
+        "slot_id": slot_id,
+        "payment_amount": payment_amount,
+    }
+
+
+def add_user_args(membership_type: str = "gold", amount: float = 500.0):
+    return {
+        "social_security_number": 123,
+        "first_name": "Dana",
+        "last_name": "Cohen",
+        "address": "Tel Aviv",
+        "email": "dana@example.com",
+        "phone_number": "052",
+        "card_last_4": 4321,
+        "card_brand": "Visa",
+        "card_exp": "02/33",
+        "card_id": "card-x",
+        "amount": amount,
+        "membership_type": membership_type,
+    }
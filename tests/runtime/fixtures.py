@@ -0,0 +1,17 @@
+"""Fixtures shared by the runtime tests."""
+
+from pathlib import Path
+from typing import Any, Dict, Type
+
+from toolguard.runtime import IToolInvoker
+
+CALCULATOR_DIR = Path(__file__).parent / "test_data" / "calculator"
+
+
+class NoApiInvoker(IToolInvoker):
+    """Invoker for guards that do not call the API."""
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type
+    ) -> Any:
+        raise AssertionError(f"unexpected API call {toolname}")
@@ -0,0 +1,207 @@
+"""Unit tests for the static analysis of guard modules."""
+
+from toolguard.runtime.analysis import (
+    analyze_guard_module,
+    analyze_tool_guard,
+    awaits_only,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.manifest import RuntimeManifest
+
+from tests.runtime.fake_appointments import APPOINTMENTS_DIR
+
+SOURCE = """
+from toolguard.runtime import rule
+import toolguard.runtime as rt
+
+
+@rule("args_only")
+async def guard_args_only(api, args, amount):
+    if amount < 0:
+        raise ValueError()
+
+
+@rt.rule("with_api")
+async def guard_with_api(api, user_id):
+    await api.get_user(user_id)
+
+
+async def helper(api):
+    await api.get_user(1)
+"""
+
+
+def test_analyze_guard_module():
+    traits = analyze_guard_module(SOURCE)
+    assert set(traits) == {"guard_args_only", "guard_with_api"}
+    assert traits["guard_args_only"].rule_name == "args_only"
+    assert not traits["guard_args_only"].uses_api
+    assert traits["guard_with_api"].uses_api
+
+
+def test_analyze_invalid_source():
+    assert analyze_guard_module("def (") == {}
+
+
+def test_analyze_appointments_items():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    uses_api = {}
+    for item_file in result.tools["schedule_appointment"].item_guard_files:
+        for traits in analyze_guard_module(item_file.content).values():
+            uses_api[traits.rule_name] = traits.uses_api
+    assert uses_api == {
+        "non_negative_payment": False,
+        "gold_member_discount": True,
+        "own_payment_method": True,
+        "no_overlapping_appointments": True,
+    }
+
+
+TOOL_GUARD_SOURCE = """
+import random
+from toolguard.runtime import rule, run_item_guards
+
+
+@rule("book")
+async def guard_book(api, args):
+    await run_item_guards([guard_limit, guard_owner], api, args)
+
+
+@rule("lucky")
+async def guard_lucky(api, args):
+    if random.random() < 0.5 and args.amount > 10:
+        raise ValueError()
+
+
+@rule("dump")
+async def guard_dump(api, args):
+    if len(args.model_dump()) > 3:
+        raise ValueError()
+"""
+
+
+def test_analyze_tool_guard():
+    items = {"guard_limit", "guard_owner"}
+    book = analyze_tool_guard(TOOL_GUARD_SOURCE, "guard_book", items)
+    assert book is not None
+    assert not book.uses_api
+    assert book.read_args == ["args"]
+    assert book.deterministic
+
+    lucky = analyze_tool_guard(TOOL_GUARD_SOURCE, "guard_lucky")
+    assert lucky is not None
+    assert lucky.read_args == ["amount", "args"]
+    assert not lucky.deterministic
+
+    dump = analyze_tool_guard(TOOL_GUARD_SOURCE, "guard_dump")
+    assert dump is not None and dump.read_args is None
+    assert analyze_tool_guard(TOOL_GUARD_SOURCE, "guard_missing") is None
+
+
+HELPERS_SOURCE = """
+import math
+import random
+from datetime import date
+from toolguard.runtime import PolicyViolationException, rule
+from pricing import fee_of
+
+
+def _limit(amount):
+    return math.floor(amount) * 2
+
+
+def _jitter():
+    return random.random()
+
+
+def _fetch(user_id):
+    return api.get_user(user_id)
+
+
+@rule("local_helper")
+async def guard_local_helper(api, args):
+    if args.amount > _limit(args.budget):
+        raise PolicyViolationException("over")
+
+
+@rule("random_helper")
+async def guard_random_helper(api, args):
+    if _jitter() > args.amount:
+        raise PolicyViolationException("unlucky")
+
+
+@rule("api_helper")
+async def guard_api_helper(api, args):
+    await _fetch(args.user_id)
+
+
+@rule("imported_function")
+async def guard_imported_function(api, args):
+    if fee_of(args.slot_id) > args.amount:
+        raise PolicyViolationException("fee")
+
+
+@rule("imported_class")
+async def guard_imported_class(api, args):
+    if date.fromisoformat(args.date).weekday() > 4:
+        raise PolicyViolationException("weekend")
+
+
+@rule("unsafe_builtin")
+async def guard_unsafe_builtin(api, args):
+    if eval(args.expression):
+        raise PolicyViolationException("eval")
+"""
+
+
+def test_analyze_calls_transitively():
+    traits = analyze_guard_module(HELPERS_SOURCE)
+    deterministic = {t.rule_name: t.deterministic for t in traits.values()}
+    assert deterministic == {
+        "local_helper": True,
+        "random_helper": False,
+        "api_helper": True,
+        "imported_function": False,
+        "imported_class": False,
+        "unsafe_builtin": False,
+    }
+    assert traits["guard_api_helper"].uses_api
+    assert not traits["guard_local_helper"].uses_api
+
+
+def test_analyze_appointments_tool_guards():
+    manifest = RuntimeManifest.from_result(
+        ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    )
+    add_user = manifest.tools["add_user"]
+    assert add_user.pure
+    assert add_user.read_args == ["amount", "args", "membership_type"]
+    assert not manifest.tools["schedule_appointment"].pure
+
+
+AWAITING_SOURCE = """
+import asyncio
+
+
+async def guard_runner(api, args):
+    await run_item_guards([guard_limit], api, args)
+    await guard_limit(api, args)
+
+
+async def guard_gather(api, args):
+    await asyncio.gather(guard_limit(api, args))
+
+
+async def guard_loop(api, args):
+    async for item in items():
+        pass
+"""
+
+
+def test_awaits_only():
+    allowed = {"run_item_guards", "guard_limit"}
+    assert awaits_only(AWAITING_SOURCE, "guard_runner", allowed)
+    assert not awaits_only(AWAITING_SOURCE, "guard_runner", {"run_item_guards"})
+    assert not awaits_only(AWAITING_SOURCE, "guard_gather", allowed)
+    assert not awaits_only(AWAITING_SOURCE, "guard_loop", allowed)
+    assert not awaits_only(AWAITING_SOURCE, "guard_missing", allowed)
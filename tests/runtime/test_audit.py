@@ -0,0 +1,162 @@
+"""Unit tests for the audit records of guard decisions."""
+
+import gzip
+import json
+
+import pytest
+
+from toolguard.runtime import (
+    AuditSink,
+    AuditStats,
+    PolicyViolationException,
+    load_toolguards,
+)
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import NoApiInvoker
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_runtime_records_every_decision(tmp_path):
+    backend = FakeAppointmentsInvoker()
+    with AuditSink(tmp_path / "audit.jsonl") as sink:
+        with load_toolguards(APPOINTMENTS_DIR, audit_sink=sink) as runtime:
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(), backend
+            )
+            with pytest.raises(PolicyViolationException):
+                await runtime.guard_toolcall(
+                    "schedule_appointment", schedule_args(pay_id=20), backend
+                )
+            with pytest.raises(PolicyViolationException):
+                runtime.guard_toolcall_sync(
+                    "add_user", add_user_args(membership_type="platinum"), backend
+                )
+        assert sink.flush(timeout=5)
+        records = read_records(sink.path)
+
+    allowed, blocked, sync_blocked = records
+    assert allowed["tool"] == "schedule_appointment"
+    assert allowed["verdict"] == "allowed"
+    assert "rule" not in allowed
+    assert allowed["args_sha256"] != blocked["args_sha256"]
+    assert {call["api"] for call in allowed["api_calls"]} >= {"get_user"}
+    assert all(call["latency"] >= 0 for call in allowed["api_calls"])
+    assert blocked["verdict"] == "blocked"
+    assert blocked["rule"][0] == "schedule_appointment"
+    assert blocked["message"]
+    assert sync_blocked["rule"] == ["add_user", "valid_membership_type"]
+    assert sync_blocked["api_calls"] == []
+
+
+@pytest.mark.asyncio
+async def test_shadow_and_fail_open_decisions_are_flagged(tmp_path):
+    with AuditSink(tmp_path / "audit.jsonl") as sink:
+        with load_toolguards(
+            APPOINTMENTS_DIR,
+            audit_sink=sink,
+            shadow_tools=["add_user"],
+            fail_open_tools=["schedule_appointment"],
+            timeouts={"schedule_appointment": 0.05},
+        ) as runtime:
+            await runtime.guard_toolcall(
+                "add_user", add_user_args(membership_type="platinum"), NoApiInvoker()
+            )
+            await runtime.drain_shadow()
+            await runtime.guard_toolcall(
+                "schedule_appointment",
+                schedule_args(),
+                FakeAppointmentsInvoker(latency=1.0),
+            )
+        assert sink.flush(timeout=5)
+        shadow, fail_open = read_records(sink.path)
+
+    assert shadow["verdict"] == "blocked"
+    assert shadow["shadow"] and not shadow["fail_open"]
+    assert fail_open["verdict"] == "allowed"
+    assert fail_open["fail_open"] and not fail_open["shadow"]
+    assert fail_open["api_calls"]
+    assert all(
+        call["cancelled"] and "error" not in call for call in fail_open["api_calls"]
+    )
+
+
+def test_full_queue_drops_records(tmp_path):
+    sink = AuditSink(tmp_path / "audit.jsonl", max_queue=2, flush_interval=60)
+    for _ in range(3):
+        sink.record("get_user", {"user_id": 1}, 0.0, 0.001, None, [])
+    assert sink.stats == AuditStats(recorded=2, dropped=1)
+    sink.close()
+    assert sink.stats == AuditStats(recorded=2, dropped=1, written=2)
+    assert len(read_records(sink.path)) == 2
+    # decisions after close are ignored
+    sink.record("get_user", {"user_id": 1}, 0.0, 0.001, None, [])
+    assert sink.stats.recorded == 2
+
+
+def test_files_are_rotated_and_compressed(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = AuditSink(path, batch_size=1, max_bytes=1, backups=2, compress=True)
+    for i in range(4):
+        sink.record("get_user", {"user_id": i}, 0.0, 0.001, None, [])
+        assert sink.flush(timeout=5)
+    sink.close()
+
+    assert sink.stats.rotations == 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "audit.jsonl.1.gz",
+        "audit.jsonl.2.gz",
+    ]
+    with gzip.open(tmp_path / "audit.jsonl.1.gz", "rt") as f:
+        (newest,) = [json.loads(line) for line in f]
+    assert newest["tool"] == "get_user"
+    assert newest["verdict"] == "allowed"
+
+
+def test_records_without_backups_are_discarded_on_rotation(tmp_path):
+    with pytest.raises(ValueError):
+        AuditSink(tmp_path / "audit.jsonl", backups=-1)
+
+    sink = AuditSink(tmp_path / "audit.jsonl", max_bytes=1, backups=0)
+    sink.record("get_user", {"user_id": 1}, 0.0, 0.001, None, [])
+    sink.close()
+    assert sink.stats.rotations == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+class UnprintableError(Exception):
+    def __str__(self) -> str:
+        raise ValueError("no message")
+
+
+def test_invalid_records_are_skipped(tmp_path):
+    sink = AuditSink(tmp_path / "audit.jsonl")
+    sink.record("get_user", {"user_id": 1}, 0.0, 0.001, UnprintableError(), [])
+    sink.record("get_user", {"user_id": 2}, 0.0, 0.001, None, [])
+    assert sink.flush(timeout=5)
+    sink.record("get_user", {"user_id": 3}, 0.0, 0.001, None, [])
+    sink.close()
+
+    assert sink.stats == AuditStats(recorded=2, written=2, invalid=1)
+    assert len(read_records(sink.path)) == 2
+
+
+def test_records_are_taken_when_recorded(tmp_path):
+    sink = AuditSink(tmp_path / "audit.jsonl", flush_interval=60)
+    args = {"user_id": 1}
+    sink.record("get_user", args, 0.0, 0.001, None, [])
+    args["user_id"] = 2  # e.g. the agent reuses its arguments dict
+    sink.record("get_user", args, 0.0, 0.001, None, [])
+    sink.close()
+
+    first, second = read_records(sink.path)
+    assert first["args_sha256"] != second["args_sha256"]
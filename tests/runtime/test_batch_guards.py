@@ -0,0 +1,140 @@
+"""Unit tests for guarding batches and streams of tool calls."""
+
+import pytest
+
+from toolguard.runtime import GuardVerdict, load_toolguards
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+CALLS = [
+    ("schedule_appointment", schedule_args()),
+    ("schedule_appointment", schedule_args(pay_id=20)),
+    ("add_user", add_user_args(membership_type="platinum")),
+    ("remove_appointment", {"slot_id": 100}),
+    ("unguarded_tool", {}),
+]
+VIOLATING = {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_guard_toolcalls_returns_verdict_per_call():
+    backend = FakeAppointmentsInvoker(latency=0.01)
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        verdicts = await runtime.guard_toolcalls(CALLS, backend)
+
+    assert [v.index for v in verdicts] == list(range(len(CALLS)))
+    assert {v.index for v in verdicts if not v.ok} == VIOLATING
+    assert verdicts[1].violation.rule[0] == "schedule_appointment"
+    assert verdicts[2].tool_name == "add_user"
+
+
+@pytest.mark.asyncio
+async def test_guard_error_does_not_abort_the_batch():
+    class Failing(FakeAppointmentsInvoker):
+        def get_user_payment_methods(self, user_id: int):
+            if user_id == 2:
+                raise ConnectionError("backend down")
+            return super().get_user_payment_methods(user_id)
+
+    calls = [
+        (
+            "schedule_appointment",
+            schedule_args(user_id=2, pay_id=20, payment_amount=100.0),
+        ),
+        *CALLS,
+    ]
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        verdicts = await runtime.guard_toolcalls(calls, Failing())
+        streamed = [v async for v in runtime.iter_guard_toolcalls(calls, Failing())]
+
+    for results in (verdicts, sorted(streamed, key=lambda v: v.index)):
+        assert isinstance(results[0].error, ConnectionError)
+        assert results[0].violation is None and not results[0].ok
+        assert {v.index - 1 for v in results[1:] if not v.ok} == VIOLATING
+        assert all(v.error is None for v in results[1:])
+
+
+@pytest.mark.asyncio
+async def test_guard_toolcalls_shares_fetches_across_calls():
+    backend = FakeAppointmentsInvoker(latency=0.01)
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        await runtime.guard_toolcalls(
+            [("schedule_appointment", schedule_args())] * 3, backend
+        )
+    names = [name for name, _ in backend.calls]
+    assert len(names) == len(set(names))
+
+
+@pytest.mark.asyncio
+async def test_guard_toolcalls_max_concurrency():
+    in_flight = 0
+    peak = 0
+
+    class Tracking(FakeAppointmentsInvoker):
+        async def invoke(self, toolname, arguments, return_type):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await super().invoke(toolname, arguments, return_type)
+            finally:
+                in_flight -= 1
+
+    calls = [("remove_appointment", {"slot_id": i}) for i in range(6)]
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        verdicts = await runtime.guard_toolcalls(
+            calls, Tracking(latency=0.01), max_concurrency=2
+        )
+    assert peak <= 2
+    assert [v.ok for v in verdicts] == [False] * 6
+
+
+@pytest.mark.asyncio
+async def test_iter_guard_toolcalls_bounds_in_flight_calls():
+    pulled = []
+
+    async def stream():
+        for i, call in enumerate(CALLS):
+            pulled.append(i)
+            yield call
+
+    verdicts = []
+    backend = FakeAppointmentsInvoker(latency=0.01)
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        async for verdict in runtime.iter_guard_toolcalls(
+            stream(), backend, max_concurrency=2
+        ):
+            assert isinstance(verdict, GuardVerdict)
+            # never more than max_concurrency calls pulled ahead of the results
+            assert len(pulled) - len(verdicts) <= 2
+            verdicts.append(verdict)
+
+    assert sorted(v.index for v in verdicts) == list(range(len(CALLS)))
+    assert {v.index for v in verdicts if not v.ok} == VIOLATING
+
+
+@pytest.mark.asyncio
+async def test_batch_requires_entered_runtime():
+    runtime = load_toolguards(APPOINTMENTS_DIR)
+    with pytest.raises(RuntimeError):
+        await runtime.guard_toolcalls(CALLS, FakeAppointmentsInvoker())
+    with pytest.raises(RuntimeError):
+        await anext_verdict(runtime)
+
+
+async def anext_verdict(runtime):
+    return await runtime.iter_guard_toolcalls(
+        CALLS, FakeAppointmentsInvoker()
+    ).__anext__()
+
+
+@pytest.mark.asyncio
+async def test_empty_batch():
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        assert await runtime.guard_toolcalls([], FakeAppointmentsInvoker()) == []
+        assert [v async for v in runtime.iter_guard_toolcalls([], None)] == []
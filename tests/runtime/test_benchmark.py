@@ -0,0 +1,44 @@
+"""Smoke test of the runtime micro-benchmarks (tests/runtime/benchmark.py)."""
+
+import json
+
+import pytest
+
+from tests.runtime import benchmark
+
+
+@pytest.mark.asyncio
+async def test_benchmark_report():
+    report = await benchmark.run_benchmarks(
+        calls=10, concurrency=(1, 4), api_latency=0.0, warmup=2
+    )
+    results = report["results"]
+    assert len(results) == len(benchmark.LOADERS) * len(benchmark.SCENARIOS) * 2
+    assert {r["outcome"] for r in results} == {"pass", "violation"}
+    assert {r["uses_api"] for r in results} == {True, False}
+    for r in results:
+        assert r["calls"] == 10
+        assert r["throughput_per_s"] > 0
+        assert 0 <= r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+
+    report = json.loads(json.dumps(report))
+    lines = benchmark.compare(report, report)
+    assert len(lines) == len(results)
+    assert "+0.0%" in lines[0]
+
+
+def test_benchmark_cli(tmp_path):
+    out = tmp_path / "bench.json"
+    benchmark.main(
+        ["--out", str(out), "--calls", "5", "--concurrency", "2", "--loaders", "memory"]
+    )
+    report = json.loads(out.read_text())
+    assert report["config"]["concurrency"] == [2]
+    assert {r["loader"] for r in report["results"]} == {"memory"}
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([], 50) == 0.0
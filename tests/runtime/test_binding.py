@@ -0,0 +1,177 @@
+"""Unit tests for the guard argument binding plans."""
+
+from typing import List, Optional
+
+import pytest
+from pydantic import (
+    AliasChoices,
+    BaseModel,
+    Field,
+    ValidationError,
+    model_validator,
+)
+
+from toolguard.runtime.binding import ArgsBindingPlan, ParamKind
+
+
+class Passenger(BaseModel):
+    name: str
+    age: int
+
+
+class Booking(BaseModel):
+    user_id: str
+    passengers: List[Passenger]
+
+
+class ForeignPassenger:
+    """A caller-side class that is structurally compatible with Passenger."""
+
+    def __init__(self, name: str, age: int):
+        self.name = name
+        self.age = age
+
+
+async def guard_book(api, user_id: str, passengers: list[Passenger | dict]):
+    pass
+
+
+async def guard_booking(args: Booking):
+    pass
+
+
+async def guard_optional(api, user_id: str, note: Optional[str] = None):
+    pass
+
+
+def test_param_kinds():
+    plan = ArgsBindingPlan(guard_book)
+    assert [(p.name, p.kind) for p in plan.params] == [
+        ("api", ParamKind.API),
+        ("user_id", ParamKind.VALUE),
+        ("passengers", ParamKind.VALUE),
+    ]
+    assert plan.needs_api
+    assert not ArgsBindingPlan(guard_booking).needs_api
+
+
+def test_bind_nested_generic_union():
+    plan = ArgsBindingPlan(guard_book)
+    api = object()
+    bound = plan.bind(
+        {"user_id": "u1", "passengers": [{"name": "a", "age": 3}]},
+        api,
+    )
+    assert bound["api"] is api
+    assert bound["user_id"] == "u1"
+    assert bound["passengers"] == [Passenger(name="a", age=3)]
+    assert isinstance(bound["passengers"][0], Passenger)
+
+
+def test_bind_model_instances_are_kept():
+    plan = ArgsBindingPlan(guard_book)
+    passenger = Passenger(name="a", age=3)
+    bound = plan.bind({"user_id": "u1", "passengers": [passenger]})
+    assert bound["passengers"][0] is passenger
+
+
+def test_bind_from_attributes():
+    plan = ArgsBindingPlan(guard_booking)
+    bound = plan.bind(
+        {"user_id": "u1", "passengers": [ForeignPassenger(name="a", age=3)]}
+    )
+    assert bound["args"] == Booking(
+        user_id="u1", passengers=[Passenger(name="a", age=3)]
+    )
+
+
+def test_bind_args_catch_all():
+    plan = ArgsBindingPlan(guard_booking)
+    bound = plan.bind({"args": {"user_id": "u1", "passengers": []}})
+    assert bound == {"args": Booking(user_id="u1", passengers=[])}
+
+    bound = plan.bind({"user_id": "u1", "passengers": []})
+    assert bound == {"args": Booking(user_id="u1", passengers=[])}
+
+
+def test_bind_missing_and_none_values():
+    plan = ArgsBindingPlan(guard_optional)
+    assert plan.bind({"user_id": "u1", "note": None}) == {
+        "user_id": "u1",
+        "note": None,
+        "api": None,
+    }
+    assert plan.bind({}) == {"user_id": None, "note": None, "api": None}
+
+
+def test_bind_invalid_value():
+    plan = ArgsBindingPlan(guard_booking)
+    with pytest.raises(ValidationError):
+        plan.bind({"user_id": "u1", "passengers": [{"name": "a", "age": "old"}]})
+
+    # The dict alternative of the union accepts it as-is
+    plan = ArgsBindingPlan(guard_book)
+    bound = plan.bind({"user_id": "u1", "passengers": [{"name": "a", "age": "old"}]})
+    assert bound["passengers"] == [{"name": "a", "age": "old"}]
+
+
+def test_bind_plain_values_are_passed_as_is():
+    plan = ArgsBindingPlan(guard_optional)
+    bound = plan.bind({"user_id": 5, "note": ["not", "a", "str"]})
+    assert bound["user_id"] == 5
+    assert bound["note"] == ["not", "a", "str"]
+
+
+def test_unsupported_annotation_is_not_validated():
+    class Opaque:
+        pass
+
+    async def guard_opaque(api, value: "UnknownType", other: Opaque):  # type: ignore[name-defined]  # noqa: F821
+        pass
+
+    plan = ArgsBindingPlan(guard_opaque)
+    obj = Opaque()
+    bound = plan.bind({"value": 1, "other": obj})
+    assert bound["value"] == 1
+    assert bound["other"] is obj
+
+
+def test_arg_keys():
+    class Transfer(BaseModel):
+        from_: str = Field(alias="from")
+        to: str = Field(validation_alias=AliasChoices("to", "recipient"))
+        amount: int
+
+        @property
+        def cents(self) -> int:
+            return self.amount * 100
+
+    async def guard_transfer(api, args: Transfer):
+        pass
+
+    plan = ArgsBindingPlan(guard_transfer)
+    assert plan.arg_keys(["amount", "from_", "to"]) == (
+        "amount",
+        "from",
+        "from_",
+        "recipient",
+        "to",
+    )
+    assert plan.arg_keys(["args"]) == ("args",)
+    assert plan.arg_keys(["cents"]) is None
+    assert ArgsBindingPlan(guard_book).arg_keys(["user_id"]) == ("user_id",)
+
+
+def test_arg_keys_of_rewritten_input_are_unknown():
+    class Rewritten(BaseModel):
+        amount: int
+
+        @model_validator(mode="before")
+        @classmethod
+        def from_total(cls, data):
+            return {"amount": data["total"]}
+
+    async def guard_rewritten(args: Rewritten):
+        pass
+
+    assert ArgsBindingPlan(guard_rewritten).arg_keys(["amount"]) is None
@@ -0,0 +1,97 @@
+"""Unit tests for bundled tool guards."""
+
+import marshal
+import sys
+
+import pytest
+
+from toolguard.runtime import PolicyViolationException, load_toolguards_bundle
+from toolguard.runtime.bundle import (
+    _FORMAT,
+    read_toolguards_bundle,
+    write_toolguards_bundle,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+
+@pytest.fixture
+def bundle_path(tmp_path):
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    return write_toolguards_bundle(result, tmp_path / "toolguards.bundle")
+
+
+@pytest.fixture
+def fresh_modules(monkeypatch):
+    """Unload the appointments modules, so that the bundle cannot rely on them."""
+    for name in list(sys.modules):
+        if name == "appointments" or name.startswith("appointments."):
+            monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if "appointments" not in p])
+
+
+def test_read_bundle(bundle_path):
+    manifest, modules = read_toolguards_bundle(bundle_path)
+    assert manifest.app_name == "appointments"
+    assert manifest.api_impl_class_name == "AppointmentsImpl"
+    assert set(manifest.tools) == {
+        "schedule_appointment",
+        "add_user",
+        "remove_appointment",
+    }
+    names = [name for name, _ in modules]
+    assert names[:3] == [
+        "appointments.appointments_types",
+        "appointments.i_appointments",
+        "appointments.appointments_impl",
+    ]
+    # item guards load before their tool guard
+    tool = manifest.tools["add_user"]
+    assert all(
+        names.index(item) < names.index(tool.guard_module) for item in tool.item_modules
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_bundle(bundle_path, fresh_modules):
+    backend = FakeAppointmentsInvoker()
+    with load_toolguards_bundle(bundle_path) as runtime:
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), backend)
+        await runtime.guard_toolcall("add_user", add_user_args(), backend)
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(pay_id=20), backend
+            )
+
+
+@pytest.mark.asyncio
+async def test_load_bundle_of_other_python(bundle_path, fresh_modules):
+    payload = marshal.loads(bundle_path.read_bytes()[len(_FORMAT) :])
+    payload["magic"] = b"\x00\x00\r\n"
+    payload["modules"] = [
+        (name, file_name, b"not bytecode", source)
+        for name, file_name, _, source in payload["modules"]
+    ]
+    bundle_path.write_bytes(_FORMAT + marshal.dumps(payload))
+
+    with load_toolguards_bundle(bundle_path) as runtime:
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "add_user", add_user_args(amount=100), FakeAppointmentsInvoker()
+            )
+
+
+def test_invalid_bundle(tmp_path):
+    path = tmp_path / "toolguards.bundle"
+    path.write_bytes(b"not a bundle")
+    with pytest.raises(ValueError, match="not a toolguards bundle"):
+        load_toolguards_bundle(path)
+    path.write_bytes(_FORMAT + b"\xff")
+    with pytest.raises(ValueError, match="Corrupted"):
+        load_toolguards_bundle(path)
@@ -0,0 +1,138 @@
+"""Unit tests for CachingToolInvoker."""
+
+import asyncio
+
+import pytest
+
+from toolguard.runtime import CachingToolInvoker, ToolFunctionsInvoker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+calls: list = []
+
+
+def get_user(user_id: str) -> dict:
+    calls.append(("get_user", user_id))
+    return {"id": user_id}
+
+
+async def get_flight(number: str) -> dict:
+    calls.append(("get_flight", number))
+    await asyncio.sleep(0.01)
+    return {"number": number}
+
+
+def book(user_id: str) -> str:
+    calls.append(("book", user_id))
+    return "booked"
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def delegate():
+    return ToolFunctionsInvoker([get_user, get_flight, book])
+
+
+@pytest.mark.asyncio
+async def test_hits_and_misses(delegate, clock):
+    invoker = CachingToolInvoker(delegate, ttls={"get_user": 10}, clock=clock)
+    assert await invoker.invoke("get_user", {"user_id": "u1"}, dict) == {"id": "u1"}
+    assert await invoker.invoke("get_user", {"user_id": "u1"}, dict) == {"id": "u1"}
+    assert await invoker.invoke("get_user", {"user_id": "u2"}, dict) == {"id": "u2"}
+
+    assert calls == [("get_user", "u1"), ("get_user", "u2")]
+    stats = invoker.stats
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert stats.hit_ratio == pytest.approx(1 / 3)
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiration(delegate, clock):
+    invoker = CachingToolInvoker(delegate, ttls={"get_user": 10}, clock=clock)
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+    clock.now = 9.9
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+    clock.now = 10.0
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+
+    assert len(calls) == 2
+    assert invoker.stats.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction(delegate, clock):
+    invoker = CachingToolInvoker(
+        delegate, ttls={"get_user": 10}, max_entries=2, clock=clock
+    )
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+    await invoker.invoke("get_user", {"user_id": "u2"}, dict)
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)  # u1 most recent
+    await invoker.invoke("get_user", {"user_id": "u3"}, dict)  # evicts u2
+    assert len(invoker) == 2
+    assert invoker.stats.evictions == 1
+
+    calls.clear()
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+    await invoker.invoke("get_user", {"user_id": "u2"}, dict)
+    assert calls == [("get_user", "u2")]
+
+
+@pytest.mark.asyncio
+async def test_non_cacheable_tools_bypass(delegate, clock):
+    invoker = CachingToolInvoker(
+        delegate, default_ttl=10, non_cacheable=["book"], clock=clock
+    )
+    await invoker.invoke("book", {"user_id": "u1"}, str)
+    await invoker.invoke("book", {"user_id": "u1"}, str)
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+
+    assert calls == [("book", "u1"), ("book", "u1"), ("get_user", "u1")]
+    assert invoker.stats.bypassed == 2
+    assert invoker.ttl_of("book") is None
+    assert invoker.ttl_of("get_user") == 10
+
+
+@pytest.mark.asyncio
+async def test_only_listed_tools_are_cached(delegate, clock):
+    invoker = CachingToolInvoker(delegate, ttls={"get_user": 10}, clock=clock)
+    await invoker.invoke("get_flight", {"number": "F1"}, dict)
+    await invoker.invoke("get_flight", {"number": "F1"}, dict)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call(delegate, clock):
+    invoker = CachingToolInvoker(delegate, ttls={"get_flight": 10}, clock=clock)
+    results = await asyncio.gather(
+        *[invoker.invoke("get_flight", {"number": "F1"}, dict) for _ in range(4)]
+    )
+    assert results == [{"number": "F1"}] * 4
+    assert calls == [("get_flight", "F1")]
+
+
+@pytest.mark.asyncio
+async def test_invalidate(delegate, clock):
+    invoker = CachingToolInvoker(delegate, default_ttl=10, clock=clock)
+    await invoker.invoke("get_user", {"user_id": "u1"}, dict)
+    await invoker.invoke("get_flight", {"number": "F1"}, dict)
+    invoker.invalidate("get_user")
+    assert len(invoker) == 1
+    invoker.invalidate()
+    assert len(invoker) == 0
@@ -0,0 +1,253 @@
+"""Unit tests for the circuit breaker and bulkhead of delegate calls."""
+
+import asyncio
+import pickle
+from typing import Any, Dict, List, Type
+
+import pytest
+
+from toolguard.runtime import (
+    CircuitBreaker,
+    GuardMetrics,
+    GuardObserver,
+    GuardTimeoutException,
+    GuardUnavailableException,
+    IToolInvoker,
+    load_toolguards,
+)
+from toolguard.runtime.observers import current_observers
+from toolguard.runtime.tool_invokers import (
+    BulkheadFullError,
+    CircuitBreakerInvoker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    schedule_args,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FlakyInvoker(IToolInvoker):
+    def __init__(
+        self,
+        failing: bool = True,
+        latency: float = 0.0,
+        error: Exception = ConnectionError("backend down"),
+    ) -> None:
+        self.failing = failing
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type
+    ) -> Any:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failing:
+            raise self.error
+        return {"ok": True}
+
+
+class TransitionRecorder(GuardObserver):
+    def __init__(self) -> None:
+        self.transitions: List[tuple] = []
+
+    def circuit_state_changed(self, toolname, old, new) -> None:
+        self.transitions.append((toolname, old, new))
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_probes_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    backend = FlakyInvoker()
+    invoker = CircuitBreakerInvoker(backend, breaker)
+    recorder = TransitionRecorder()
+    token = current_observers.set((recorder,))
+    try:
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await invoker.invoke("get_user", {}, dict)
+        assert breaker.state("get_user") == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            await invoker.invoke("get_user", {}, dict)
+        assert backend.calls == 2
+        # other tools have their own circuit
+        await CircuitBreakerInvoker(FlakyInvoker(failing=False), breaker).invoke(
+            "get_slot", {}, dict
+        )
+
+        clock.now = 10
+        assert breaker.state("get_user") == CircuitState.HALF_OPEN
+        with pytest.raises(ConnectionError):
+            await invoker.invoke("get_user", {}, dict)
+        assert breaker.state("get_user") == CircuitState.OPEN
+
+        clock.now = 20
+        backend.failing = False
+        assert await invoker.invoke("get_user", {}, dict) == {"ok": True}
+        assert breaker.state("get_user") == CircuitState.CLOSED
+    finally:
+        current_observers.reset(token)
+    assert [new for _, _, new in recorder.transitions] == [
+        CircuitState.OPEN,
+        CircuitState.HALF_OPEN,
+        CircuitState.OPEN,
+        CircuitState.HALF_OPEN,
+        CircuitState.CLOSED,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_duration=0.01)
+    invoker = CircuitBreakerInvoker(FlakyInvoker(failing=False, latency=0.02), breaker)
+    await invoker.invoke("get_user", {}, dict)
+    assert breaker.state("get_user") == CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_limits_calls_in_flight():
+    breaker = CircuitBreaker(max_concurrency=2)
+    invoker = CircuitBreakerInvoker(FlakyInvoker(failing=False, latency=0.05), breaker)
+    results = await asyncio.gather(
+        *[invoker.invoke("get_user", {}, dict) for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert [type(r) for r in results].count(BulkheadFullError) == 1
+    assert breaker.in_flight("get_user") == 0
+    assert breaker.state("get_user") == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_only_transport_errors_are_failures():
+    breaker = CircuitBreaker(failure_threshold=1)
+    invoker = CircuitBreakerInvoker(
+        FlakyInvoker(error=ValueError("unknown user")), breaker
+    )
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await invoker.invoke("get_user", {}, dict)
+    assert breaker.state("get_user") == CircuitState.CLOSED
+
+    breaker = CircuitBreaker(failure_threshold=1, failure_exceptions=(ValueError,))
+    invoker = CircuitBreakerInvoker(
+        FlakyInvoker(error=ValueError("unknown user")), breaker
+    )
+    with pytest.raises(ValueError):
+        await invoker.invoke("get_user", {}, dict)
+    assert breaker.state("get_user") == CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_observers_are_notified_outside_the_lock():
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    class StateReader(GuardObserver):
+        def circuit_state_changed(self, toolname, old, new) -> None:
+            # would deadlock if notified while the breaker holds its lock
+            self.state = breaker.state(toolname)
+
+    reader = StateReader()
+    token = current_observers.set((reader,))
+    try:
+        with pytest.raises(ConnectionError):
+            await CircuitBreakerInvoker(FlakyInvoker(), breaker).invoke(
+                "get_user", {}, dict
+            )
+    finally:
+        current_observers.reset(token)
+    assert reader.state == CircuitState.OPEN
+
+
+def test_errors_are_picklable():
+    error = pickle.loads(pickle.dumps(CircuitOpenError("get_user")))
+    assert isinstance(error, CircuitOpenError)
+    assert error.toolname == "get_user"
+
+
+@pytest.mark.asyncio
+async def test_runtime_fails_fast_by_tool_policy():
+    breaker = CircuitBreaker(failure_threshold=1)
+    metrics = GuardMetrics()
+    backend = FlakyInvoker()
+    with load_toolguards(
+        APPOINTMENTS_DIR, circuit_breaker=breaker, observers=[metrics]
+    ) as runtime:
+        with pytest.raises(ConnectionError):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(), backend
+            )
+        calls = backend.calls
+        with pytest.raises(GuardUnavailableException) as exc_info:
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(), backend
+            )
+        assert exc_info.value.rule == ("schedule_appointment",)
+        assert backend.calls == calls
+
+    with load_toolguards(
+        APPOINTMENTS_DIR,
+        circuit_breaker=breaker,
+        fail_open_tools=["schedule_appointment"],
+    ) as runtime:
+        await runtime.guard_toolcall(
+            "schedule_appointment", schedule_args(), FakeAppointmentsInvoker()
+        )
+    assert metrics.circuit_transitions("get_user") == {"open": 1}
+    assert 'api="get_user",state="open"' in metrics.to_prometheus()
+
+
+class HangingInvoker(IToolInvoker):
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type
+    ) -> Any:
+        self.calls.append(toolname)
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_hanging_tool_opens_its_circuit():
+    breaker = CircuitBreaker(failure_threshold=2)
+    backend = HangingInvoker()
+    with load_toolguards(
+        APPOINTMENTS_DIR, circuit_breaker=breaker, default_timeout=0.05
+    ) as runtime:
+        for _ in range(2):
+            with pytest.raises(GuardTimeoutException):
+                await runtime.guard_toolcall(
+                    "schedule_appointment", schedule_args(), backend
+                )
+        assert {breaker.state(tool) for tool in backend.calls} == {CircuitState.OPEN}
+
+        calls = len(backend.calls)
+        with pytest.raises(GuardUnavailableException):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(), backend
+            )
+        assert len(backend.calls) == calls
+
+    # cancelled before the deadline: the outcome is unknown
+    breaker = CircuitBreaker(failure_threshold=1)
+    invoker = CircuitBreakerInvoker(backend, breaker)
+    task = asyncio.ensure_future(invoker.invoke("get_user", {}, dict))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert breaker.state("get_user") == CircuitState.CLOSED
@@ -0,0 +1,129 @@
+"""Unit tests for the modes of assert_any_condition_met."""
+
+import asyncio
+
+import pytest
+
+from toolguard.runtime import (
+    ConditionsMode,
+    ItemGuardsCostModel,
+    PolicyViolationException,
+    assert_any_condition_met,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.item_guards import current_conditions_mode, current_cost_model
+
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+
+def make_checks(log: list):
+    async def slow_met():
+        try:
+            await asyncio.sleep(0.1)
+            log.append("slow_met finished")
+            return True
+        except asyncio.CancelledError:
+            log.append("slow_met cancelled")
+            raise
+
+    async def fast_met():
+        await asyncio.sleep(0)
+        log.append("fast_met finished")
+        return True
+
+    return [slow_met, fast_met]
+
+
+@pytest.mark.asyncio
+async def test_sequential_mode_is_the_default():
+    log: list = []
+    await assert_any_condition_met(*make_checks(log))
+    assert log == ["slow_met finished"]
+
+
+@pytest.mark.asyncio
+async def test_race_mode_cancels_the_other_conditions():
+    log: list = []
+    await assert_any_condition_met(*make_checks(log), mode=ConditionsMode.RACE)
+    assert log == ["fast_met finished", "slow_met cancelled"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", list(ConditionsMode))
+async def test_errors_when_no_condition_is_met(mode):
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("first")
+
+    def not_met():
+        return False
+
+    def also_failing():
+        raise KeyError("second")
+
+    with pytest.raises(ValueError):
+        await assert_any_condition_met(failing, not_met, also_failing, mode=mode)
+    with pytest.raises(PolicyViolationException, match="No conditions met"):
+        await assert_any_condition_met(not_met, lambda: False, mode=mode)
+
+
+@pytest.mark.asyncio
+async def test_cost_ordered_mode_runs_likely_conditions_first():
+    calls: list = []
+
+    async def unlikely():
+        calls.append("unlikely")
+        await asyncio.sleep(0.01)
+        return False
+
+    async def likely():
+        calls.append("likely")
+        return True
+
+    model = ItemGuardsCostModel()
+    token = current_cost_model.set(model)
+    try:
+        for _ in range(3):
+            await assert_any_condition_met(
+                unlikely, likely, mode=ConditionsMode.COST_ORDERED
+            )
+    finally:
+        current_cost_model.reset(token)
+    assert calls == ["unlikely", "likely", "likely", "likely"]
+    assert model.stats(likely.__code__).violations == 3
+
+
+@pytest.mark.asyncio
+async def test_runtime_mode_overrides_the_guard_mode():
+    log: list = []
+    token = current_conditions_mode.set(ConditionsMode.RACE)
+    try:
+        await assert_any_condition_met(*make_checks(log))
+    finally:
+        current_conditions_mode.reset(token)
+    assert log == ["fast_met finished", "slow_met cancelled"]
+
+
+@pytest.mark.asyncio
+async def test_runtime_conditions_mode():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    guard_file = result.tools["divide_tool"].guard_file
+    guard_file.content = (
+        "from toolguard.runtime import assert_any_condition_met\n"
+        + guard_file.content.replace(
+            "    if args.b == 0:\n        raise",
+            "    await assert_any_condition_met(lambda: args.b != 0, lambda: False)\n"
+            "    if False:\n        raise",
+        )
+    )
+    with load_toolguards_from_memory(
+        result, conditions_mode=ConditionsMode.RACE
+    ) as runtime:
+        await runtime.guard_toolcall("divide_tool", {"a": 1, "b": 2}, NoApiInvoker())
+        with pytest.raises(PolicyViolationException, match="No conditions met"):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b": 0}, NoApiInvoker()
+            )
+        # without an event loop, the conditions run one after the other
+        runtime.guard_toolcall_sync("divide_tool", {"a": 1, "b": 2}, NoApiInvoker())
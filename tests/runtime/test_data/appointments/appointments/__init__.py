@@ -0,0 +1 @@
+from . import appointments_types
@@ -0,0 +1,36 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, run_item_guards
+from toolguard.runtime.rules import rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+from appointments.add_user.guard_valid_membership_type import (
+    guard_valid_membership_type,
+)
+from appointments.add_user.guard_membership_initial_charge import (
+    guard_membership_initial_charge,
+)
+
+
+@rule("add_user")
+async def guard_add_user(api: IAppointments, args: AddUserArgs):
+    """
+    Checks that a tool call complies to the policies.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (AddUserArgs): the tool call arguments.
+
+    Raises:
+        PolicyViolationException: If the tool call does not comply to the policy.
+    """
+    await run_item_guards(
+        [
+            guard_valid_membership_type,
+            guard_membership_initial_charge,
+        ],
+        api,
+        args,
+        mode="parallel",
+    )
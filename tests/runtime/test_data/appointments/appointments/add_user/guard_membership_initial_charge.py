@@ -0,0 +1,21 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("membership_initial_charge")
+async def guard_membership_initial_charge(api: IAppointments, args: AddUserArgs):
+    """
+    Policy to check: Gold members are charged at least 500 on registration, silver members at least 200.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (AddUserArgs): the tool call arguments.
+    """
+    minimum = {"gold": 500, "silver": 200}.get(args.membership_type or "regular", 0)
+    if args.amount < minimum:
+        raise PolicyViolationException(
+            f"A {args.membership_type} membership requires an initial charge of at least {minimum}."
+        )
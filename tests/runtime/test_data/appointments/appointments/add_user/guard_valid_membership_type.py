@@ -0,0 +1,20 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("valid_membership_type")
+async def guard_valid_membership_type(api: IAppointments, args: AddUserArgs):
+    """
+    Policy to check: The membership type must be one of regular, silver or gold.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (AddUserArgs): the tool call arguments.
+    """
+    if args.membership_type not in (None, "regular", "silver", "gold"):
+        raise PolicyViolationException(
+            f"Unknown membership type '{args.membership_type}'."
+        )
@@ -0,0 +1,76 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Type, Callable, TypeVar
+from appointments.appointments_types import *
+from appointments.i_appointments import *
+from toolguard.runtime import IToolInvoker
+
+
+class AppointmentsImpl(IAppointments):
+    def __init__(self, delegate: IToolInvoker):
+        self._delegate = delegate
+
+    async def add_payment_method(self, args: AddPaymentMethodArgs) -> int:
+        return await self._delegate.invoke("add_payment_method", args.model_dump(), int)
+
+    async def add_user(self, args: AddUserArgs) -> int:
+        return await self._delegate.invoke("add_user", args.model_dump(), int)
+
+    async def get_user_id(self, app: str, args: GetUserIdArgs) -> int:
+        return await self._delegate.invoke("get_user_id", args.model_dump(), int)
+
+    async def get_user(self, args: GetUserArgs) -> GetUserResponse:
+        return await self._delegate.invoke(
+            "get_user", args.model_dump(), GetUserResponse
+        )
+
+    async def get_user_payment_methods(
+        self, args: GetUserPaymentMethodsArgs
+    ) -> GetUserPaymentMethodsResponse:
+        return await self._delegate.invoke(
+            "get_user_payment_methods", args.model_dump(), GetUserPaymentMethodsResponse
+        )
+
+    async def get_user_appointments(
+        self, args: GetUserAppointmentsArgs
+    ) -> GetUserAppointmentsResponse:
+        return await self._delegate.invoke(
+            "get_user_appointments", args.model_dump(), GetUserAppointmentsResponse
+        )
+
+    async def get_available_dr_specialties(
+        self, args: GetAvailableDrSpecialtiesArgs
+    ) -> GetAvailableDrSpecialtiesResponse:
+        return await self._delegate.invoke(
+            "get_available_dr_specialties",
+            args.model_dump(),
+            GetAvailableDrSpecialtiesResponse,
+        )
+
+    async def get_appointment_slot(
+        self, args: GetAppointmentSlotArgs
+    ) -> GetAppointmentSlotResponse:
+        return await self._delegate.invoke(
+            "get_appointment_slot", args.model_dump(), GetAppointmentSlotResponse
+        )
+
+    async def search_doctors(self, args: SearchDoctorsArgs) -> SearchDoctorsResponse:
+        return await self._delegate.invoke(
+            "search_doctors", args.model_dump(), SearchDoctorsResponse
+        )
+
+    async def search_available_appointments(
+        self, args: SearchAvailableAppointmentsArgs
+    ) -> SearchAvailableAppointmentsResponse:
+        return await self._delegate.invoke(
+            "search_available_appointments",
+            args.model_dump(),
+            SearchAvailableAppointmentsResponse,
+        )
+
+    async def schedule_appointment(self, args: ScheduleAppointmentArgs) -> int:
+        return await self._delegate.invoke(
+            "schedule_appointment", args.model_dump(), int
+        )
+
+    async def remove_appointment(self, args: RemoveAppointmentArgs) -> Any:
+        return await self._delegate.invoke("remove_appointment", args.model_dump(), Any)
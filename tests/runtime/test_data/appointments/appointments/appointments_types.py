@@ -0,0 +1,218 @@
+# generated by datamodel-codegen:
+#   filename:  oas.json
+#   timestamp: 2026-10-17T07:03:02+00:00
+
+from __future__ import annotations
+
+from typing import Any, Literal
+
+from pydantic import BaseModel, RootModel
+
+
+class AddPaymentMethodArgs(BaseModel):
+    user_id: int
+    """
+    The ID of the user to whom the payment method will be added.
+    """
+    card_last_4: int
+    card_brand: str
+    card_exp: str
+    card_id: str
+
+
+class AddUserArgs(BaseModel):
+    social_security_number: int
+    first_name: str
+    last_name: str
+    address: str
+    email: str
+    phone_number: str
+    card_last_4: int
+    card_brand: str
+    card_exp: str
+    card_id: str
+    amount: float
+    membership_type: str | None = "regular"
+
+
+class GetUserIdArgs(BaseModel):
+    social_security_number: int
+
+
+class GetUserArgs(BaseModel):
+    user_id: int
+
+
+class GetUserPaymentMethodsArgs(GetUserArgs):
+    pass
+
+
+class GetUserAppointmentsArgs(BaseModel):
+    user_id: Any
+
+
+class GetAvailableDrSpecialtiesArgs(BaseModel):
+    pass
+
+
+class GetAppointmentSlotArgs(BaseModel):
+    slot_id: int
+
+
+class SearchDoctorsArgs(BaseModel):
+    specialty: str | None = None
+    min_rank: float | None = None
+    max_fee: float | None = None
+
+
+class SearchAvailableAppointmentsArgs(BaseModel):
+    specialty: Any
+    doctor_name: Any = None
+    start_date: Any = None
+    end_date: Any = None
+
+
+class ScheduleAppointmentArgs(BaseModel):
+    user_id: int
+    pay_id: int
+    slot_id: int
+    payment_amount: float | None = None
+
+
+class RemoveAppointmentArgs(GetAppointmentSlotArgs):
+    pass
+
+
+class GetUserResponse1(BaseModel):
+    user_id: str
+    ssn: int
+    first_name: str
+    last_name: str
+    address: str
+    email: str
+    phone: str
+    enter_date: str
+    membership_type: Literal["regular", "gold", "silver"]
+
+
+class GetUserResponse(RootModel[GetUserResponse1 | None]):
+    root: GetUserResponse1 | None
+
+
+class GetUserPaymentMethodsResponseItem(BaseModel):
+    pay_id: int
+    """
+    Internal ID of the payment method.
+    """
+    card_last_4: int
+    """
+    Last 4 digits of the card number.
+    """
+    card_brand: str
+    """
+    Brand of the card (e.g., "Visa", "MasterCard").
+    """
+    card_exp: str
+    """
+    Expiration date in MM/YY format.
+    """
+    card_id: str
+    """
+    Unique identifier used to store the card securely.
+    """
+
+
+class GetUserPaymentMethodsResponse(RootModel[list[GetUserPaymentMethodsResponseItem]]):
+    root: list[GetUserPaymentMethodsResponseItem]
+
+
+class GetUserAppointmentsResponseItem(BaseModel):
+    slot_id: int
+    """
+    Unique identifier of the slot.
+    """
+    dr_name: str
+    """
+    Doctor's name.
+    """
+    specialty: str
+    """
+    Doctor's specialty.
+    """
+    date: str
+    """
+    Date of the appointment (YYYY-MM-DD).
+    """
+    start_time: str
+    """
+    Start time of the appointment (HH:MM format).
+    """
+    end_time: str
+    """
+    End time of the appointment (HH:MM format).
+    """
+    visit_fee: float
+    """
+    Cost of the visit.
+    """
+    rating: float
+    """
+    Doctor's average rating.
+    """
+
+
+class GetUserAppointmentsResponse(RootModel[list[GetUserAppointmentsResponseItem]]):
+    root: list[GetUserAppointmentsResponseItem]
+
+
+class GetAvailableDrSpecialtiesResponse(RootModel[list[str]]):
+    root: list[str]
+
+
+class GetAppointmentSlotResponse1(GetUserAppointmentsResponseItem):
+    pass
+
+
+class GetAppointmentSlotResponse(RootModel[GetAppointmentSlotResponse1 | None]):
+    root: GetAppointmentSlotResponse1 | None
+
+
+class SearchDoctorsResponseItem(BaseModel):
+    dr_id: int
+    """
+    Doctor's unique ID.
+    """
+    dr_name: str
+    """
+    Doctor's full name.
+    """
+    specialty: str
+    """
+    Medical specialty.
+    """
+    rating: float
+    """
+    Average patient rating.
+    """
+    visit_fee: float
+    """
+    Consultation fee.
+    """
+    next_available_appointment: str | None = None
+    """
+    Next available appointment date and time, or None if unavailable.
+    """
+
+
+class SearchDoctorsResponse(RootModel[list[SearchDoctorsResponseItem]]):
+    root: list[SearchDoctorsResponseItem]
+
+
+class SearchAvailableAppointmentsResponseItem(GetUserAppointmentsResponseItem):
+    pass
+
+
+class SearchAvailableAppointmentsResponse(
+    RootModel[list[SearchAvailableAppointmentsResponseItem]]
+):
+    root: list[SearchAvailableAppointmentsResponseItem]
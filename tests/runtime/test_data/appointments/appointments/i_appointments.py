@@ -0,0 +1,76 @@
+from typing import Any, Dict, List
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from appointments.appointments_types import *
+
+
+class IAppointments(ABC):
+    @abstractmethod
+    async def add_payment_method(self, args: AddPaymentMethodArgs) -> int:
+
+        pass
+
+    @abstractmethod
+    async def add_user(self, args: AddUserArgs) -> int:
+
+        pass
+
+    @abstractmethod
+    async def get_user_id(self, app: str, args: GetUserIdArgs) -> int:
+
+        pass
+
+    @abstractmethod
+    async def get_user(self, args: GetUserArgs) -> GetUserResponse:
+
+        pass
+
+    @abstractmethod
+    async def get_user_payment_methods(
+        self, args: GetUserPaymentMethodsArgs
+    ) -> GetUserPaymentMethodsResponse:
+
+        pass
+
+    @abstractmethod
+    async def get_user_appointments(
+        self, args: GetUserAppointmentsArgs
+    ) -> GetUserAppointmentsResponse:
+
+        pass
+
+    @abstractmethod
+    async def get_available_dr_specialties(
+        self, args: GetAvailableDrSpecialtiesArgs
+    ) -> GetAvailableDrSpecialtiesResponse:
+
+        pass
+
+    @abstractmethod
+    async def get_appointment_slot(
+        self, args: GetAppointmentSlotArgs
+    ) -> GetAppointmentSlotResponse:
+
+        pass
+
+    @abstractmethod
+    async def search_doctors(self, args: SearchDoctorsArgs) -> SearchDoctorsResponse:
+
+        pass
+
+    @abstractmethod
+    async def search_available_appointments(
+        self, args: SearchAvailableAppointmentsArgs
+    ) -> SearchAvailableAppointmentsResponse:
+
+        pass
+
+    @abstractmethod
+    async def schedule_appointment(self, args: ScheduleAppointmentArgs) -> int:
+
+        pass
+
+    @abstractmethod
+    async def remove_appointment(self, args: RemoveAppointmentArgs) -> Any:
+
+        pass
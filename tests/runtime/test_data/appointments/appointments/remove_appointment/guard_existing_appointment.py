@@ -0,0 +1,19 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("existing_appointment")
+async def guard_existing_appointment(api: IAppointments, args: RemoveAppointmentArgs):
+    """
+    Policy to check: Only existing, booked appointments can be removed.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (RemoveAppointmentArgs): the tool call arguments.
+    """
+    slot = await api.get_appointment_slot(GetAppointmentSlotArgs(slot_id=args.slot_id))
+    if slot.root is None:
+        raise PolicyViolationException("The appointment does not exist.")
@@ -0,0 +1,32 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, run_item_guards
+from toolguard.runtime.rules import rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+from appointments.remove_appointment.guard_existing_appointment import (
+    guard_existing_appointment,
+)
+
+
+@rule("remove_appointment")
+async def guard_remove_appointment(api: IAppointments, args: RemoveAppointmentArgs):
+    """
+    Checks that a tool call complies to the policies.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (RemoveAppointmentArgs): the tool call arguments.
+
+    Raises:
+        PolicyViolationException: If the tool call does not comply to the policy.
+    """
+    await run_item_guards(
+        [
+            guard_existing_appointment,
+        ],
+        api,
+        args,
+        mode="parallel",
+    )
@@ -0,0 +1,29 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("gold_member_discount")
+async def guard_gold_member_discount(api: IAppointments, args: ScheduleAppointmentArgs):
+    """
+    Policy to check: Gold members receive a 10% discount on the slot visit fee. Other members pay the full visit fee.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (ScheduleAppointmentArgs): the tool call arguments.
+    """
+    if args.payment_amount is None:
+        return
+    user = await api.get_user(GetUserArgs(user_id=args.user_id))
+    slot = await api.get_appointment_slot(GetAppointmentSlotArgs(slot_id=args.slot_id))
+    if user.root is None or slot.root is None:
+        raise PolicyViolationException("Unknown user or appointment slot.")
+    fee = slot.root.visit_fee
+    if user.root.membership_type == "gold":
+        fee = round(fee * 0.9, 2)
+    if abs(args.payment_amount - fee) > 0.005:
+        raise PolicyViolationException(
+            f"The payment amount must be {fee} for a {user.root.membership_type} member."
+        )
@@ -0,0 +1,32 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("no_overlapping_appointments")
+async def guard_no_overlapping_appointments(
+    api: IAppointments, args: ScheduleAppointmentArgs
+):
+    """
+    Policy to check: A user cannot book two appointments at the same date and time.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (ScheduleAppointmentArgs): the tool call arguments.
+    """
+    slot = await api.get_appointment_slot(GetAppointmentSlotArgs(slot_id=args.slot_id))
+    if slot.root is None:
+        raise PolicyViolationException("Unknown appointment slot.")
+    booked = await api.get_user_appointments(
+        GetUserAppointmentsArgs(user_id=args.user_id)
+    )
+    for appointment in booked.root:
+        if (
+            appointment.date == slot.root.date
+            and appointment.start_time == slot.root.start_time
+        ):
+            raise PolicyViolationException(
+                "The user already has an appointment at that time."
+            )
@@ -0,0 +1,18 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("non_negative_payment")
+async def guard_non_negative_payment(api: IAppointments, args: ScheduleAppointmentArgs):
+    """
+    Policy to check: The payment amount must not be negative.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (ScheduleAppointmentArgs): the tool call arguments.
+    """
+    if args.payment_amount is not None and args.payment_amount < 0:
+        raise PolicyViolationException("The payment amount must not be negative.")
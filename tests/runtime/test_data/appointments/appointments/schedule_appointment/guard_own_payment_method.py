@@ -0,0 +1,23 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, assert_any_condition_met, rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+
+@rule("own_payment_method")
+async def guard_own_payment_method(api: IAppointments, args: ScheduleAppointmentArgs):
+    """
+    Policy to check: The visit must be paid with a payment method registered to the user.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (ScheduleAppointmentArgs): the tool call arguments.
+    """
+    methods = await api.get_user_payment_methods(
+        GetUserPaymentMethodsArgs(user_id=args.user_id)
+    )
+    if all(m.pay_id != args.pay_id for m in methods.root):
+        raise PolicyViolationException(
+            "The payment method is not registered to the user."
+        )
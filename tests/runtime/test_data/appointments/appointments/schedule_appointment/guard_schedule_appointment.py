@@ -0,0 +1,44 @@
+from typing import *
+
+from toolguard.runtime import PolicyViolationException, run_item_guards
+from toolguard.runtime.rules import rule
+from appointments.appointments_types import *
+from appointments.i_appointments import IAppointments
+
+from appointments.schedule_appointment.guard_non_negative_payment import (
+    guard_non_negative_payment,
+)
+from appointments.schedule_appointment.guard_gold_member_discount import (
+    guard_gold_member_discount,
+)
+from appointments.schedule_appointment.guard_own_payment_method import (
+    guard_own_payment_method,
+)
+from appointments.schedule_appointment.guard_no_overlapping_appointments import (
+    guard_no_overlapping_appointments,
+)
+
+
+@rule("schedule_appointment")
+async def guard_schedule_appointment(api: IAppointments, args: ScheduleAppointmentArgs):
+    """
+    Checks that a tool call complies to the policies.
+
+    Args:
+        api (IAppointments): api to access other tools.
+        args (ScheduleAppointmentArgs): the tool call arguments.
+
+    Raises:
+        PolicyViolationException: If the tool call does not comply to the policy.
+    """
+    await run_item_guards(
+        [
+            guard_non_negative_payment,
+            guard_gold_member_discount,
+            guard_own_payment_method,
+            guard_no_overlapping_appointments,
+        ],
+        api,
+        args,
+        mode="parallel",
+    )
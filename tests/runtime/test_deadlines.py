@@ -0,0 +1,146 @@
+"""Unit tests for guard deadlines and timeouts."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Type
+
+import pytest
+
+from toolguard.runtime import (
+    GuardMetrics,
+    GuardTimeoutException,
+    IToolInvoker,
+    PolicyViolationException,
+    current_deadline,
+    load_toolguards,
+    remaining_time,
+)
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+
+class HangingInvoker(IToolInvoker):
+    """Never answers; records the deadline seen by each invocation, and whether
+    it was cancelled."""
+
+    def __init__(self) -> None:
+        self.deadlines: List[Optional[float]] = []
+        self.cancelled = 0
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type
+    ) -> Any:
+        self.deadlines.append(current_deadline.get())
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+@pytest.mark.asyncio
+async def test_fail_closed_timeout_cancels_pending_calls():
+    invoker = HangingInvoker()
+    metrics = GuardMetrics()
+    with load_toolguards(
+        APPOINTMENTS_DIR, default_timeout=0.05, observers=[metrics]
+    ) as runtime:
+        start = time.monotonic()
+        with pytest.raises(GuardTimeoutException) as exc_info:
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(), invoker
+            )
+    assert time.monotonic() - start < 1
+    assert isinstance(exc_info.value, PolicyViolationException)
+    assert exc_info.value.rule == ("schedule_appointment",)
+    assert invoker.deadlines and all(d is not None for d in invoker.deadlines)
+    assert invoker.cancelled == len(invoker.deadlines)
+    assert metrics.timeouts("schedule_appointment") == {"blocked": 1}
+    assert 'action="blocked"' in metrics.to_prometheus()
+
+
+@pytest.mark.asyncio
+async def test_fail_open_timeout_allows_the_call():
+    metrics = GuardMetrics()
+    with load_toolguards(
+        APPOINTMENTS_DIR,
+        timeouts={"schedule_appointment": 0.05},
+        fail_open_tools=["schedule_appointment"],
+        observers=[metrics],
+    ) as runtime:
+        await runtime.guard_toolcall(
+            "schedule_appointment", schedule_args(), HangingInvoker()
+        )
+        # other tools have no time budget
+        await runtime.guard_toolcall("add_user", add_user_args(), HangingInvoker())
+    assert metrics.timeouts("schedule_appointment") == {"allowed": 1}
+
+
+@pytest.mark.asyncio
+async def test_deadline_of_the_call():
+    seen: List[Optional[float]] = []
+
+    class RecordingInvoker(FakeAppointmentsInvoker):
+        async def invoke(self, toolname, arguments, return_type):
+            seen.append(remaining_time())
+            return await super().invoke(toolname, arguments, return_type)
+
+    with load_toolguards(APPOINTMENTS_DIR, default_timeout=10) as runtime:
+        await runtime.guard_toolcall(
+            "schedule_appointment",
+            schedule_args(),
+            RecordingInvoker(),
+            deadline=time.monotonic() + 1,
+        )
+        with pytest.raises(GuardTimeoutException):
+            await runtime.guard_toolcall(
+                "schedule_appointment",
+                schedule_args(),
+                HangingInvoker(),
+                deadline=time.monotonic() + 0.05,
+            )
+        # violations within the deadline are raised as usual
+        with pytest.raises(PolicyViolationException) as exc_info:
+            await runtime.guard_toolcall(
+                "schedule_appointment",
+                schedule_args(pay_id=20),
+                FakeAppointmentsInvoker(),
+                deadline=time.monotonic() + 1,
+            )
+        assert not isinstance(exc_info.value, GuardTimeoutException)
+    assert seen and all(r is not None and 0 < r <= 1 for r in seen)
+
+
+def test_sync_guard_timeout():
+    with load_toolguards(APPOINTMENTS_DIR, default_timeout=0.05) as runtime:
+        with pytest.raises(GuardTimeoutException):
+            runtime.guard_toolcall_sync(
+                "schedule_appointment", schedule_args(), HangingInvoker()
+            )
+
+
+@pytest.mark.asyncio
+async def test_batch_deadline():
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        verdicts = await runtime.guard_toolcalls(
+            [("schedule_appointment", schedule_args()), ("add_user", add_user_args())],
+            HangingInvoker(),
+            deadline=time.monotonic() + 0.05,
+        )
+    assert isinstance(verdicts[0].violation, GuardTimeoutException)
+    assert verdicts[1].ok
+
+
+@pytest.mark.asyncio
+async def test_timed_out_verdicts_are_not_cached():
+    with load_toolguards(
+        APPOINTMENTS_DIR, verdict_cache_size=16, default_timeout=0
+    ) as runtime:
+        with pytest.raises(GuardTimeoutException):
+            await runtime.guard_toolcall("add_user", add_user_args(), HangingInvoker())
+        assert len(runtime.verdict_cache) == 0
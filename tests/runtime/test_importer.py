@@ -0,0 +1,64 @@
+"""Unit tests for GuardModulesImporter."""
+
+import sys
+
+import pytest
+
+from toolguard.runtime.importer import GuardModulesImporter
+
+MODULES = {
+    "shop.types": ("shop/types.py", "LIMIT = 5\n"),
+    "shop.api": ("shop/api.py", "import shop.types\nLIMIT = shop.types.LIMIT\n"),
+    "shop.buy.guard_buy": (
+        "shop/buy/guard_buy.py",
+        "from shop.types import LIMIT\nfrom ..api import LIMIT as API_LIMIT\n"
+        "import json\n",
+    ),
+}
+
+
+@pytest.fixture
+def importer():
+    importer = GuardModulesImporter(MODULES)
+    importer.install()
+    yield importer
+    importer.uninstall()
+
+
+def test_imports_on_demand(importer):
+    assert importer.loaded_modules() == []
+    module = importer.import_module("shop.buy.guard_buy")
+    assert module.LIMIT == module.API_LIMIT == 5
+    assert module.json is sys.modules["json"]
+    assert sorted(importer.loaded_modules()) == [
+        "shop.api",
+        "shop.buy.guard_buy",
+        "shop.types",
+    ]
+    assert "shop.types" not in sys.modules
+
+
+def test_namespaces_are_isolated(importer):
+    other = GuardModulesImporter(
+        {"shop.types": ("shop/types.py", "LIMIT = 7\n")}, prefix=importer.prefix + "x"
+    )
+    other.install()
+    try:
+        assert other.import_module("shop.types").LIMIT == 7
+        assert importer.import_module("shop.types").LIMIT == 5
+    finally:
+        other.uninstall()
+
+
+def test_uninstall_unloads(importer):
+    module = importer.import_module("shop.api")
+    importer.uninstall()
+    assert module.__name__ not in sys.modules
+    assert importer not in sys.meta_path
+    with pytest.raises(ModuleNotFoundError):
+        importer.import_module("shop.api")
+
+
+def test_unknown_modules(importer):
+    with pytest.raises(ModuleNotFoundError):
+        importer.import_module("shop.missing")
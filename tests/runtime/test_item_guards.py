@@ -0,0 +1,194 @@
+"""Unit tests for running the item guards of a tool guard."""
+
+import asyncio
+
+import pytest
+
+from toolguard.runtime import (
+    ItemGuardsCostModel,
+    ItemGuardsMode,
+    PolicyViolationException,
+    load_toolguards,
+    load_toolguards_from_memory,
+    run_item_guards,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.item_guards import current_cost_model
+from toolguard.runtime.rules import rule
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+
+def make_items(log: list):
+    @rule("fast_violation")
+    async def fast_violation(api, x):
+        await asyncio.sleep(0)
+        raise PolicyViolationException("fast")
+
+    @rule("slow_ok")
+    async def slow_ok(api, x):
+        try:
+            await asyncio.sleep(0.1)
+            log.append("slow_ok finished")
+        except asyncio.CancelledError:
+            log.append("slow_ok cancelled")
+            raise
+
+    return [slow_ok, fast_violation]
+
+
+@pytest.mark.asyncio
+async def test_parallel_mode_keeps_siblings_running():
+    log: list = []
+    with pytest.raises(PolicyViolationException) as exc_info:
+        await run_item_guards(make_items(log), None, 1, mode="parallel")
+    assert exc_info.value.rule == ("fast_violation",)
+    await asyncio.sleep(0.2)
+    assert log == ["slow_ok finished"]
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_mode_cancels_siblings():
+    log: list = []
+    with pytest.raises(PolicyViolationException) as exc_info:
+        await run_item_guards(make_items(log), None, 1, mode=ItemGuardsMode.FAIL_FAST)
+    assert exc_info.value.rule == ("fast_violation",)
+    assert log == ["slow_ok cancelled"]
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_mode_all_pass():
+    calls = []
+
+    async def item(api, x):
+        calls.append(x)
+
+    await run_item_guards([item, item], None, 7, mode=ItemGuardsMode.FAIL_FAST)
+    await run_item_guards([], None, 7, mode=ItemGuardsMode.FAIL_FAST)
+    assert calls == [7, 7]
+
+
+@pytest.mark.asyncio
+async def test_appointments_guards():
+    backend = FakeAppointmentsInvoker()
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), backend)
+        await runtime.guard_toolcall(
+            "schedule_appointment",
+            schedule_args(user_id=2, pay_id=20, payment_amount=100.0),
+            backend,
+        )
+        await runtime.guard_toolcall("add_user", add_user_args(), backend)
+        await runtime.guard_toolcall("remove_appointment", {"slot_id": 100}, backend)
+
+        violations = [
+            ("schedule_appointment", schedule_args(payment_amount=100.0)),
+            ("schedule_appointment", schedule_args(pay_id=20)),
+            ("schedule_appointment", schedule_args(payment_amount=-1)),
+            (
+                "schedule_appointment",
+                schedule_args(user_id=2, pay_id=20, slot_id=101, payment_amount=200),
+            ),
+            ("add_user", add_user_args(membership_type="platinum")),
+            ("add_user", add_user_args(amount=100)),
+            ("remove_appointment", {"slot_id": 999}),
+        ]
+        for tool_name, args in violations:
+            with pytest.raises(PolicyViolationException):
+                await runtime.guard_toolcall(tool_name, args, backend)
+
+
+@pytest.mark.asyncio
+async def test_runtime_selects_fail_fast_mode():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    violating = schedule_args(payment_amount=-1)
+
+    backend = FakeAppointmentsInvoker(latency=0.02)
+    with load_toolguards_from_memory(result) as runtime:
+        with pytest.raises(PolicyViolationException) as exc_info:
+            await runtime.guard_toolcall("schedule_appointment", violating, backend)
+        assert exc_info.value.rule == ("schedule_appointment", "non_negative_payment")
+        await asyncio.sleep(0.1)
+    assert "get_user_appointments" in [name for name, _ in backend.calls]
+
+    backend = FakeAppointmentsInvoker(latency=0.02)
+    with load_toolguards_from_memory(
+        result, item_guards_mode=ItemGuardsMode.FAIL_FAST
+    ) as runtime:
+        with pytest.raises(PolicyViolationException) as exc_info:
+            await runtime.guard_toolcall("schedule_appointment", violating, backend)
+        assert exc_info.value.rule == ("schedule_appointment", "non_negative_payment")
+        await asyncio.sleep(0.1)
+    assert "get_user_appointments" not in [name for name, _ in backend.calls]
+
+
+@pytest.mark.asyncio
+async def test_cost_aware_mode_runs_cheap_items_first():
+    log: list = []
+
+    @rule("costly")
+    async def costly(api, x):
+        log.append("costly")
+
+    @rule("cheap_violation")
+    async def cheap_violation(api, x):
+        log.append("cheap_violation")
+        raise PolicyViolationException("cheap")
+
+    model = ItemGuardsCostModel(api_free={costly: False, cheap_violation: True})
+    token = current_cost_model.set(model)
+    try:
+        with pytest.raises(PolicyViolationException) as exc_info:
+            await run_item_guards(
+                [costly, cheap_violation], None, 1, mode=ItemGuardsMode.COST_AWARE
+            )
+    finally:
+        current_cost_model.reset(token)
+    assert exc_info.value.rule == ("cheap_violation",)
+    assert log == ["cheap_violation"]
+    assert model.stats(cheap_violation).violations == 1
+    assert model.stats(costly).calls == 0
+
+
+def test_cost_model_orders_by_violation_rate_per_latency():
+    async def a(api, x): ...
+
+    async def b(api, x): ...
+
+    async def c(api, x): ...
+
+    model = ItemGuardsCostModel(min_samples=2, cheap_latency=0.01)
+    for _ in range(4):
+        model.observe(a, 0.1, violated=False)
+        model.observe(b, 0.1, violated=True)
+        model.observe(c, 0.001, violated=False)
+    assert model.order([a, b, c]) == [c, b, a]
+    assert model.is_cheap(c) and not model.is_cheap(a)
+    assert model.stats(b).violation_rate == pytest.approx(5 / 6)
+
+
+@pytest.mark.asyncio
+async def test_runtime_cost_aware_mode_skips_api_calls():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    backend = FakeAppointmentsInvoker()
+    with load_toolguards_from_memory(
+        result, item_guards_mode=ItemGuardsMode.COST_AWARE
+    ) as runtime:
+        with pytest.raises(PolicyViolationException) as exc_info:
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(payment_amount=-1), backend
+            )
+        assert exc_info.value.rule == ("schedule_appointment", "non_negative_payment")
+        assert backend.calls == []
+
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), backend)
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(pay_id=20), backend
+            )
+        assert runtime.cost_model is not None
@@ -0,0 +1,104 @@
+"""Unit tests for the runtime manifest, and loading guards from it."""
+
+import shutil
+
+import pytest
+
+from toolguard.runtime import PolicyViolationException, load_toolguards
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.manifest import (
+    MANIFEST_FILENAME,
+    RuntimeManifest,
+    module_hash,
+    module_to_file_name,
+)
+
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    app_dir = tmp_path / "calculator"
+    shutil.copytree(CALCULATOR_DIR, app_dir)
+    RuntimeManifest.from_result(ToolGuardsCodeGenerationResult.load(app_dir)).save(
+        app_dir
+    )
+    return app_dir
+
+
+def test_manifest_round_trip(app_dir):
+    manifest = RuntimeManifest.load(app_dir)
+    assert set(manifest.tools) == {"add_tool", "divide_tool"}
+    assert list(manifest.module_hashes) == [
+        "test_api_types",
+        "test_api",
+        "test_api_impl",
+        "guard_add",
+        "guard_divide",
+    ]
+    result = ToolGuardsCodeGenerationResult.load(app_dir)
+    assert manifest.module_hashes["guard_add"] == module_hash(
+        result.tools["add_tool"].guard_file.content
+    )
+    assert module_to_file_name("appointments.add_user.guard_add_user").as_posix() == (
+        "appointments/add_user/guard_add_user.py"
+    )
+
+    (app_dir / MANIFEST_FILENAME).write_text("{}")
+    with pytest.raises(ValueError):
+        RuntimeManifest.load(app_dir)
+
+
+@pytest.mark.asyncio
+async def test_load_toolguards_reads_only_the_manifest(app_dir, monkeypatch):
+    load_result = ToolGuardsCodeGenerationResult.load
+
+    def no_result(*args, **kwargs):
+        raise ValueError("the results file was read")
+
+    monkeypatch.setattr(ToolGuardsCodeGenerationResult, "load", no_result)
+    with load_toolguards(app_dir) as runtime:
+        await runtime.guard_toolcall("add_tool", {"a": 1, "b": 2}, NoApiInvoker())
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b": 0}, NoApiInvoker()
+            )
+        # the full result is read on demand
+        with pytest.raises(ValueError):
+            runtime.result
+        monkeypatch.setattr(ToolGuardsCodeGenerationResult, "load", load_result)
+        assert runtime.result.tools["add_tool"].guard_fn_name == "guard_add_tool"
+
+
+@pytest.mark.asyncio
+async def test_stale_manifest_is_ignored(app_dir):
+    # a copy of the results file, with another modification time
+    results = app_dir / "result.json"
+    results.write_bytes(results.read_bytes())
+    assert RuntimeManifest.load(app_dir).is_current(app_dir)
+
+    changed = ToolGuardsCodeGenerationResult.load(app_dir)
+    del changed.tools["divide_tool"]
+    changed.save(app_dir)  # without saving the manifest
+    assert not RuntimeManifest.load(app_dir).is_current(app_dir)
+    assert RuntimeManifest.load_current(app_dir) is None
+
+    with load_toolguards(app_dir) as runtime:
+        await runtime.guard_toolcall("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
+
+
+@pytest.mark.asyncio
+async def test_reload_from_manifest(app_dir):
+    with load_toolguards(app_dir) as runtime:
+        assert not runtime.reload()
+
+        guard_file = app_dir / "guard_divide.py"
+        guard_file.write_text(
+            guard_file.read_text().replace("args.b == 0", "args.b == 1")
+        )
+        result = ToolGuardsCodeGenerationResult.load(app_dir)
+        result.tools["divide_tool"].guard_file.content = guard_file.read_text()
+        RuntimeManifest.from_result(result).save(app_dir)
+
+        assert runtime.reload()
+        await runtime.guard_toolcall("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
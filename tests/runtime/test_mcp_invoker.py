@@ -0,0 +1,150 @@
+"""Unit tests for MCPToolInvoker, against an in-memory MCP server."""
+
+import asyncio
+import threading
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.client import Client
+from fastmcp.exceptions import ToolError
+
+from toolguard.runtime.tool_invokers import MCPToolInvoker
+
+
+def make_server() -> FastMCP:
+    server = FastMCP("calculator")
+
+    @server.tool
+    async def add(a: int, b: int) -> int:
+        await asyncio.sleep(0.01)
+        return a + b
+
+    @server.tool
+    def divide(a: int, b: int) -> float:
+        return a / b
+
+    return server
+
+
+@pytest.fixture
+def connects(monkeypatch):
+    counter = {"n": 0}
+    original = Client.__aenter__
+
+    async def counting_aenter(self):
+        counter["n"] += 1
+        return await original(self)
+
+    monkeypatch.setattr(Client, "__aenter__", counting_aenter)
+    return counter
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused(connects):
+    client = Client(make_server())
+    async with MCPToolInvoker(client) as invoker:
+        for i in range(3):
+            assert await invoker.invoke("add", {"a": i, "b": 1}, int) == i + 1
+        assert client.is_connected()
+    assert not client.is_connected()
+    assert connects["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_serves_concurrent_calls(connects):
+    invoker = MCPToolInvoker(Client(make_server()), pool_size=2)
+    results = await asyncio.gather(
+        *[invoker.invoke("add", {"a": i, "b": i}, int) for i in range(6)]
+    )
+    assert results == [2 * i for i in range(6)]
+    assert connects["n"] == 2
+    await invoker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_failure(connects):
+    client = Client(make_server())
+    invoker = MCPToolInvoker(client)
+    assert await invoker.invoke("add", {"a": 1, "b": 1}, int) == 2
+    await client.close()  # e.g. the server dropped the connection
+    assert await invoker.invoke("add", {"a": 2, "b": 2}, int) == 4
+    assert connects["n"] == 2
+    await invoker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_tool_errors_keep_the_session(connects):
+    client = Client(make_server())
+    async with MCPToolInvoker(client) as invoker:
+        with pytest.raises(ToolError):
+            await invoker.invoke("divide", {"a": 1, "b": 0}, float)
+        assert await invoker.invoke("divide", {"a": 1, "b": 2}, float) == 0.5
+    assert connects["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_on_connection_error(connects, monkeypatch):
+    client = Client(make_server())
+    original = Client.call_tool
+    failures = [ConnectionError("broken pipe")]
+
+    async def flaky_call_tool(self, *args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Client, "call_tool", flaky_call_tool)
+    async with MCPToolInvoker(client) as invoker:
+        assert await invoker.invoke("add", {"a": 1, "b": 1}, int) == 2
+    assert connects["n"] == 2
+
+
+def test_each_event_loop_has_its_own_sessions(connects):
+    client = Client(make_server())
+    invoker = MCPToolInvoker(client)
+    in_loop = []
+
+    async def add(a: int) -> int:
+        result = await invoker.invoke("add", {"a": a, "b": 1}, int)
+        in_loop.append(client.is_connected())
+        return result
+
+    # as guard_toolcall_sync does: a new event loop for every guard
+    assert asyncio.run(add(1)) == 2
+    assert asyncio.run(add(2)) == 3
+    assert connects["n"] == 2
+    # the sessions of a loop are closed when the loop ends
+    assert in_loop == [True, True]
+    assert not client.is_connected()
+    assert not invoker._pools
+
+    async def add_and_close(a: int) -> int:
+        try:
+            return await add(a)
+        finally:
+            await invoker.aclose()
+
+    assert asyncio.run(add_and_close(3)) == 4
+    assert not invoker._pools
+
+
+def test_aclose_closes_the_sessions_of_other_loops():
+    client = Client(make_server())
+    invoker = MCPToolInvoker(client)
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever)
+    thread.start()
+    try:
+        added = asyncio.run_coroutine_threadsafe(
+            invoker.invoke("add", {"a": 1, "b": 1}, int), other_loop
+        )
+        assert added.result(timeout=5) == 2
+        assert client.is_connected()
+
+        asyncio.run(invoker.aclose())
+        assert not client.is_connected()
+        assert not invoker._pools
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
@@ -0,0 +1,83 @@
+"""Unit tests for the guard runtime metrics."""
+
+import pytest
+
+from toolguard.runtime import GuardMetrics, PolicyViolationException, load_toolguards
+from toolguard.runtime.metrics import Histogram
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+
+@pytest.fixture
+async def metrics():
+    metrics = GuardMetrics()
+    backend = FakeAppointmentsInvoker(latency=0.005)
+    with load_toolguards(APPOINTMENTS_DIR, observers=[metrics]) as runtime:
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), backend)
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(pay_id=20), backend
+            )
+        runtime.guard_toolcall_sync("add_user", add_user_args(), backend)
+    return metrics
+
+
+@pytest.mark.asyncio
+async def test_rule_latency_and_outcomes(metrics):
+    assert metrics.latency("schedule_appointment").count == 2
+    assert metrics.outcomes("schedule_appointment") == {"pass": 1, "violation": 1}
+    assert metrics.outcomes("schedule_appointment", "own_payment_method") == {
+        "pass": 1,
+        "violation": 1,
+    }
+    assert metrics.outcomes("schedule_appointment", "non_negative_payment") == {
+        "pass": 2
+    }
+    assert metrics.outcomes("add_user", "valid_membership_type") == {"pass": 1}
+    assert metrics.latency("schedule_appointment", "gold_member_discount").mean > 0
+
+
+@pytest.mark.asyncio
+async def test_api_calls_are_attributed_to_rules(metrics):
+    calls = metrics.api_calls("schedule_appointment", "own_payment_method")
+    assert set(calls) == {"get_user_payment_methods"}
+    assert calls["get_user_payment_methods"].count == 2
+    assert metrics.api_calls("schedule_appointment", "non_negative_payment") == {}
+    assert metrics.api_calls("add_user", "valid_membership_type") == {}
+
+
+@pytest.mark.asyncio
+async def test_prometheus_export(metrics):
+    text = metrics.to_prometheus()
+    assert "# TYPE toolguard_guard_duration_seconds histogram" in text
+    assert (
+        'toolguard_guard_outcomes_total{tool="schedule_appointment",outcome="violation"} 1'
+        in text
+    )
+    assert (
+        'toolguard_rule_duration_seconds_count{tool="add_user",rule="valid_membership_type"} 1'
+        in text
+    )
+    assert (
+        "toolguard_api_call_duration_seconds_count"
+        '{tool="schedule_appointment",rule="own_payment_method",api="get_user_payment_methods"} 2'
+        in text
+    )
+    assert text.endswith("\n")
+
+    metrics.reset()
+    assert metrics.to_prometheus() == ""
+
+
+def test_histogram():
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        hist.observe(value)
+    assert hist.cumulative() == [1, 3]
+    assert hist.count == 4
+    assert hist.mean == pytest.approx(4.25 / 4)
@@ -0,0 +1,135 @@
+"""Unit tests for running tool guards in worker processes."""
+
+import asyncio
+import pickle
+
+import pytest
+
+from toolguard.runtime import (
+    GuardTimeoutException,
+    GuardUnavailableException,
+    GuardMetrics,
+    PolicyViolationException,
+    load_toolguards,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.process_pool import RemoteGuardError, _portable
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+
+@pytest.mark.asyncio
+async def test_guards_run_in_worker_processes():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    metrics = GuardMetrics()
+    runtime = load_toolguards_from_memory(
+        result,
+        process_pool_tools=["schedule_appointment"],
+        process_pool_size=2,
+        observers=[metrics],
+    )
+    with runtime:
+        invoker = FakeAppointmentsInvoker()
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), invoker)
+        with pytest.raises(PolicyViolationException) as e:
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(pay_id=20), invoker
+            )
+        assert e.value.rule[0] == "schedule_appointment"
+        # the API calls are made by the delegate of the caller
+        assert {name for name, _ in invoker.calls} >= {"get_user_payment_methods"}
+
+        # concurrent calls are spread over the workers
+        await asyncio.gather(
+            *[
+                runtime.guard_toolcall("schedule_appointment", schedule_args(), invoker)
+                for _ in range(8)
+            ]
+        )
+
+        # other tools run in the calling process
+        await runtime.guard_toolcall("add_user", add_user_args(), NoApiInvoker())
+        loaded = runtime._version.importer.loaded_modules()
+        assert not [m for m in loaded if "schedule_appointment" in m]
+        assert [m for m in loaded if "add_user" in m]
+
+    # rule events of the workers are replayed to the observers
+    assert metrics.outcomes("schedule_appointment") == {"pass": 9, "violation": 1}
+    assert metrics.api_calls("schedule_appointment", "own_payment_method")
+
+
+def test_sync_guard_in_worker_process():
+    with load_toolguards(
+        CALCULATOR_DIR, process_pool_tools=["divide_tool"], process_pool_size=1
+    ) as runtime:
+        runtime.guard_toolcall_sync("divide_tool", {"a": 1, "b": 2}, NoApiInvoker())
+        with pytest.raises(PolicyViolationException):
+            runtime.guard_toolcall_sync("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
+        pool = runtime._version.pool
+    assert pool is not None and runtime._version.pool is None
+
+
+def test_shared_modules_are_not_supported():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    with pytest.raises(ValueError):
+        load_toolguards_from_memory(
+            result,
+            process_pool_tools=["divide_tool"],
+            shared_modules={"test_api": "elsewhere.test_api"},
+        )
+
+
+class _UnpicklableError(Exception):
+    """Pickles, but cannot be rebuilt from its args."""
+
+    def __init__(self, code: int, reason: str) -> None:
+        super().__init__(f"{code} {reason}")
+
+
+class _FailingInvoker(FakeAppointmentsInvoker):
+    async def invoke(self, toolname, arguments, return_type):
+        raise _UnpicklableError(503, "unavailable")
+
+
+@pytest.mark.asyncio
+async def test_errors_that_cannot_cross_processes_are_replaced():
+    with load_toolguards(
+        APPOINTMENTS_DIR,
+        process_pool_tools=["schedule_appointment"],
+        process_pool_size=1,
+    ) as runtime:
+        with pytest.raises(RemoteGuardError) as e:
+            await asyncio.wait_for(
+                runtime.guard_toolcall(
+                    "schedule_appointment", schedule_args(), _FailingInvoker()
+                ),
+                timeout=30,
+            )
+        assert e.value.type_name == "_UnpicklableError"
+        assert e.value.message == "503 unavailable"
+
+        # the worker is still usable
+        await runtime.guard_toolcall(
+            "schedule_appointment", schedule_args(), FakeAppointmentsInvoker()
+        )
+
+
+def test_blocking_exceptions_cross_processes():
+    for error in (
+        PolicyViolationException("Unknown user."),
+        GuardUnavailableException("add_user", "uses an unavailable API"),
+        GuardTimeoutException("add_user", 0.5),
+    ):
+        copy = _portable(error)
+        assert copy is error
+        copy = pickle.loads(pickle.dumps(error))
+        assert type(copy) is type(error)
+        assert str(copy) == str(error)
+        assert copy.rule == error.rule
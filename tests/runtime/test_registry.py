@@ -0,0 +1,156 @@
+"""Unit tests for ToolguardRegistry."""
+
+import asyncio
+import sys
+
+import pytest
+
+from toolguard.runtime import PolicyViolationException, ToolguardRegistry
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+
+@pytest.fixture
+def registry():
+    registry = ToolguardRegistry(max_loaded=2)
+    registry.register("acme", ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR))
+    registry.register("globex", ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR))
+    registry.register("calc", ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR))
+    with registry:
+        yield registry
+
+
+def _domain_modules():
+    return [name for name in sys.modules if name.startswith("_toolguard_domain_")]
+
+
+@pytest.mark.asyncio
+async def test_tenants_are_isolated(registry):
+    await registry.guard_toolcall("acme", "add_user", add_user_args(), NoApiInvoker())
+    await registry.guard_toolcall(
+        "globex", "schedule_appointment", schedule_args(), FakeAppointmentsInvoker()
+    )
+    with pytest.raises(PolicyViolationException):
+        await registry.guard_toolcall(
+            "acme",
+            "add_user",
+            add_user_args(membership_type="platinum"),
+            NoApiInvoker(),
+        )
+    with pytest.raises(KeyError):
+        registry.runtime("initech")
+
+    acme, globex = registry.runtime("acme"), registry.runtime("globex")
+    assert acme is not registry.runtime("globex")
+    assert acme._entry("add_user").guard_fn is not globex._entry("add_user").guard_fn
+
+
+@pytest.mark.asyncio
+async def test_identical_domains_are_shared(registry):
+    await registry.guard_toolcall(
+        "acme", "schedule_appointment", schedule_args(), FakeAppointmentsInvoker()
+    )
+    shared = _domain_modules()
+    assert shared
+    await registry.guard_toolcall(
+        "globex", "schedule_appointment", schedule_args(), FakeAppointmentsInvoker()
+    )
+    assert _domain_modules() == shared
+    assert (
+        registry.runtime("acme")._find_api_impl_class()
+        is registry.runtime("globex")._find_api_impl_class()
+    )
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_tenant_is_evicted(registry):
+    registry.runtime("acme")
+    registry.runtime("globex")
+    registry.runtime("acme")
+    assert registry.loaded_tenants() == ["globex", "acme"]
+
+    await registry.guard_toolcall("calc", "add_tool", {"a": 1, "b": 2}, NoApiInvoker())
+    assert registry.loaded_tenants() == ["acme", "calc"]
+    assert registry.evictions == 1
+
+    # reloaded on demand
+    await registry.guard_toolcall("globex", "add_user", add_user_args(), NoApiInvoker())
+    assert registry.loaded_tenants() == ["calc", "globex"]
+    assert registry.loads == 4
+
+
+@pytest.mark.asyncio
+async def test_busy_tenants_are_not_evicted(registry):
+    slow = FakeAppointmentsInvoker(latency=0.2)
+    acme = asyncio.create_task(
+        registry.guard_toolcall("acme", "schedule_appointment", schedule_args(), slow)
+    )
+    globex = asyncio.create_task(
+        registry.guard_toolcall("globex", "schedule_appointment", schedule_args(), slow)
+    )
+    await asyncio.sleep(0.05)
+    assert registry.loaded_tenants() == ["acme", "globex"]
+
+    # both tenants are busy: calc is loaded beyond the limit, and is the one
+    # evicted once its call completes
+    await registry.guard_toolcall("calc", "add_tool", {"a": 1, "b": 2}, NoApiInvoker())
+    assert registry.loaded_tenants() == ["acme", "globex"]
+    assert registry.loads == 3
+    assert registry.evictions == 1
+
+    await asyncio.gather(acme, globex)
+    assert registry.loaded_tenants() == ["acme", "globex"]
+
+    # the least recently used tenant is busy: an idle one is evicted instead
+    acme = asyncio.create_task(
+        registry.guard_toolcall("acme", "schedule_appointment", schedule_args(), slow)
+    )
+    await asyncio.sleep(0.05)
+    registry.runtime("globex")
+    assert registry.loaded_tenants() == ["acme", "globex"]
+    await registry.guard_toolcall("calc", "add_tool", {"a": 1, "b": 2}, NoApiInvoker())
+    assert registry.loaded_tenants() == ["acme", "calc"]
+    assert registry.evictions == 2
+    await acme
+
+
+def test_close_unloads_all_modules(registry):
+    registry.guard_toolcall_sync("acme", "add_user", add_user_args(), NoApiInvoker())
+    registry.guard_toolcall_sync("calc", "add_tool", {"a": 1, "b": 2}, NoApiInvoker())
+    registry.close()
+    assert registry.loaded_tenants() == []
+    assert _domain_modules() == []
+    assert len(registry) == 3
+
+    registry.unregister("calc")
+    assert "calc" not in registry
+
+
+@pytest.mark.asyncio
+async def test_busy_tenants_are_unloaded_once_idle(registry):
+    slow = FakeAppointmentsInvoker(latency=0.2)
+    acme = asyncio.create_task(
+        registry.guard_toolcall("acme", "schedule_appointment", schedule_args(), slow)
+    )
+    await asyncio.sleep(0.05)
+    replaced = registry.runtime("acme")
+    registry.register("acme", ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR))
+    registry.close()
+
+    # the call in flight still has its guards
+    assert registry.loaded_tenants() == []
+    replaced.guard_toolcall_sync("add_user", add_user_args(), NoApiInvoker())
+    assert _domain_modules()
+
+    await acme
+    assert _domain_modules() == []
+    with pytest.raises(RuntimeError):
+        replaced.guard_toolcall_sync("add_user", add_user_args(), NoApiInvoker())
+    assert registry.runtime("acme") is not replaced
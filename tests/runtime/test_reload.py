@@ -0,0 +1,143 @@
+"""Unit tests for ToolguardRuntime.reload and watch."""
+
+import asyncio
+import shutil
+import sys
+
+import pytest
+
+from toolguard.runtime import (
+    PolicyViolationException,
+    load_toolguards,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+
+def _allow_zero_division(
+    result: ToolGuardsCodeGenerationResult,
+) -> ToolGuardsCodeGenerationResult:
+    result = result.model_copy(deep=True)
+    guard_file = result.tools["divide_tool"].guard_file
+    guard_file.content = guard_file.content.replace("args.b == 0", "args.b == 1")
+    return result
+
+
+def _loaded(prefix: str):
+    return [name for name in sys.modules if name.startswith(prefix + ".")]
+
+
+@pytest.mark.asyncio
+async def test_reload_only_changed_tools():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    with load_toolguards_from_memory(result) as runtime:
+        await runtime.guard_toolcall("add_tool", {"a": 1, "b": 2}, NoApiInvoker())
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b": 0}, NoApiInvoker()
+            )
+        add_entry = runtime._entry("add_tool")
+        divide_entry = runtime._entry("divide_tool")
+        old_prefix = runtime._version.importer.prefix
+
+        assert not runtime.reload(result)
+        assert runtime.reload(_allow_zero_division(result))
+        assert not runtime.reload(_allow_zero_division(result))
+
+        await runtime.guard_toolcall("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b": 1}, NoApiInvoker()
+            )
+        assert runtime._entry("add_tool") is add_entry
+        assert runtime._entry("divide_tool") is not divide_entry
+        assert _loaded(old_prefix) == []
+
+
+@pytest.mark.asyncio
+async def test_in_flight_calls_finish_on_old_version():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    changed = result.model_copy(deep=True)
+    guard_file = changed.tools["add_user"].guard_file
+    guard_file.content += "\n# regenerated\n"
+
+    with load_toolguards_from_memory(result) as runtime:
+        invoker = FakeAppointmentsInvoker(latency=0.05)
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), invoker)
+        schedule_entry = runtime._entry("schedule_appointment")
+        old_prefix = runtime._version.importer.prefix
+
+        in_flight = asyncio.ensure_future(
+            runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(pay_id=20), invoker
+            )
+        )
+        await asyncio.sleep(0.01)
+        assert runtime.reload(changed)
+        # the old version stays loaded until its in-flight call is done
+        assert _loaded(old_prefix)
+        await runtime.guard_toolcall("add_user", add_user_args(), NoApiInvoker())
+        with pytest.raises(PolicyViolationException):
+            await in_flight
+        assert _loaded(old_prefix) == []
+
+        # unchanged tool guard and domain modules are reused
+        assert runtime._entry("schedule_appointment") is schedule_entry
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), invoker)
+
+
+@pytest.mark.asyncio
+async def test_reload_keeps_the_version_of_a_starting_call():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    with load_toolguards_from_memory(result, default_timeout=5) as runtime:
+        old_prefix = runtime._version.importer.prefix
+        starting = asyncio.ensure_future(
+            runtime.guard_toolcall("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
+        )
+        # the call took its version, and waits for its evaluation to start
+        await asyncio.sleep(0)
+        assert runtime.reload(_allow_zero_division(result))
+        with pytest.raises(PolicyViolationException):
+            await starting
+        assert _loaded(old_prefix) == []
+
+
+@pytest.mark.asyncio
+async def test_watch_directory(tmp_path):
+    app_dir = tmp_path / "calculator"
+    shutil.copytree(CALCULATOR_DIR, app_dir)
+    with load_toolguards(app_dir) as runtime:
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b": 0}, NoApiInvoker()
+            )
+        assert not runtime.reload()
+
+        watcher = asyncio.ensure_future(runtime.watch(interval=0.01))
+        try:
+            await asyncio.sleep(0.02)
+            changed = _allow_zero_division(ToolGuardsCodeGenerationResult.load(app_dir))
+            (app_dir / "result.json").write_text(changed.model_dump_json())
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if runtime._version.importer is not None:
+                    break
+        finally:
+            watcher.cancel()
+
+        await runtime.guard_toolcall("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
+
+
+def test_reload_needs_a_source():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    with load_toolguards_from_memory(result) as runtime:
+        with pytest.raises(ValueError):
+            runtime.reload()
@@ -1,5 +1,7 @@
 """Unit tests for ToolguardRuntime with in-memory FileTwin objects."""
 
+import sys
+
 import pytest
 from pathlib import Path
 from typing import Any, Dict, Type
@@ -346,6 +348,49 @@ async def test_guard_toolcall_no_guard(
         await runtime.guard_toolcall("nonexistent_tool", {"a": 5, "b": 3}, mock_invoker)
 
 
+@pytest.mark.asyncio
+async def test_guards_resolved_once_on_first_call(sample_result):
+    """Test that guards are resolved once, when their tool is first guarded."""
+    runtime = load_toolguards_from_memory(sample_result)
+    with pytest.raises(RuntimeError):
+        await runtime.guard_toolcall("add_tool", {"a": 5, "b": 3}, MockToolInvoker())
+
+    with runtime:
+        assert runtime._version.entries == {}
+        await runtime.guard_toolcall("add_tool", {"a": 5, "b": 3}, MockToolInvoker())
+        assert set(runtime._version.entries) == {"add_tool"}
+        entry = runtime._version.entries["add_tool"]
+        assert entry.guard_fn.__name__ == "guard_add_tool"
+        assert [p.name for p in entry.plan.params] == ["args"]
+        assert entry.api_impl_class is None
+        await runtime.guard_toolcall("add_tool", {"a": 1, "b": 3}, MockToolInvoker())
+        assert runtime._version.entries["add_tool"] is entry
+        assert runtime._version.importer.loaded_modules() == [
+            "test_api_types",
+            "guard_add",
+        ]
+
+    with load_toolguards_from_memory(sample_result, preload=True) as runtime:
+        assert set(runtime._version.entries) == {"add_tool", "divide_tool"}
+
+
+@pytest.mark.asyncio
+async def test_modules_are_isolated_and_unloaded(sample_result):
+    """Test that in-memory modules live in a private namespace, until unloaded."""
+    runtime = load_toolguards_from_memory(sample_result)
+    other = load_toolguards_from_memory(sample_result)
+    with runtime, other:
+        await runtime.guard_toolcall("add_tool", {"a": 5, "b": 3}, MockToolInvoker())
+        await other.guard_toolcall("add_tool", {"a": 5, "b": 3}, MockToolInvoker())
+        fn = runtime._version.entries["add_tool"].guard_fn
+        assert fn is not other._version.entries["add_tool"].guard_fn
+        assert fn.__module__ == f"{runtime._version.importer.prefix}.guard_add"
+        assert fn.__module__ in sys.modules
+    assert fn.__module__ not in sys.modules
+    with pytest.raises(RuntimeError):
+        await runtime.guard_toolcall("add_tool", {"a": 5, "b": 3}, MockToolInvoker())
+
+
 def test_runtime_init_validation():
     """Test that runtime initialization validates arguments."""
     from toolguard.runtime.runtime import ToolguardRuntime
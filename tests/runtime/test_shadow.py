@@ -0,0 +1,159 @@
+"""Unit tests for evaluating guards in the background (shadow mode)."""
+
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+from toolguard.runtime import (
+    GuardTimeoutException,
+    GuardVerdict,
+    ShadowStats,
+    load_toolguards,
+)
+from toolguard.runtime.shadow import ShadowEvaluator
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import NoApiInvoker
+
+
+@pytest.mark.asyncio
+async def test_shadow_guard_reports_violations_without_raising():
+    verdicts: List[GuardVerdict] = []
+    backend = FakeAppointmentsInvoker(latency=0.05)
+    with load_toolguards(
+        APPOINTMENTS_DIR,
+        shadow_tools=["schedule_appointment"],
+        on_shadow_violation=verdicts.append,
+    ) as runtime:
+        start = time.perf_counter()
+        await runtime.guard_toolcall(
+            "schedule_appointment", schedule_args(pay_id=20), backend
+        )
+        await runtime.guard_toolcall("schedule_appointment", schedule_args(), backend)
+        assert time.perf_counter() - start < 0.05
+        assert verdicts == []
+        await runtime.drain_shadow()
+        assert runtime.shadow_stats == ShadowStats(
+            scheduled=2, evaluated=2, violations=1
+        )
+    assert [(v.index, v.args["pay_id"]) for v in verdicts] == [(0, 20)]
+
+
+@pytest.mark.asyncio
+async def test_batch_and_stream_allow_shadow_tools_right_away():
+    verdicts: List[GuardVerdict] = []
+    with load_toolguards(
+        APPOINTMENTS_DIR,
+        shadow_tools=["schedule_appointment"],
+        on_shadow_violation=verdicts.append,
+    ) as runtime:
+        calls = [
+            ("schedule_appointment", schedule_args(pay_id=20)),
+            ("add_user", add_user_args(membership_type="platinum")),
+        ]
+        backend = FakeAppointmentsInvoker()
+        batch = await runtime.guard_toolcalls(calls, backend)
+        stream = [v async for v in runtime.iter_guard_toolcalls(calls, backend)]
+        for results in (batch, sorted(stream, key=lambda v: v.index)):
+            assert [v.ok for v in results] == [True, False]
+        await runtime.drain_shadow()
+        assert runtime.shadow_stats == ShadowStats(
+            scheduled=2, evaluated=2, violations=2
+        )
+    assert [v.args["pay_id"] for v in verdicts] == [20, 20]
+
+
+@pytest.mark.asyncio
+async def test_shadow_guard_does_not_inherit_the_caller_deadline():
+    verdicts: List[GuardVerdict] = []
+    with load_toolguards(
+        APPOINTMENTS_DIR,
+        shadow_tools=["schedule_appointment"],
+        on_shadow_violation=verdicts.append,
+    ) as runtime:
+        await runtime.guard_toolcall(
+            "schedule_appointment",
+            schedule_args(pay_id=20),
+            FakeAppointmentsInvoker(latency=0.02),
+            deadline=time.monotonic() + 0.001,
+        )
+        await runtime.drain_shadow()
+    assert len(verdicts) == 1
+    assert not isinstance(verdicts[0].violation, GuardTimeoutException)
+
+
+def test_sync_shadow_guard_runs_in_a_background_loop():
+    verdicts: List[GuardVerdict] = []
+    with load_toolguards(
+        APPOINTMENTS_DIR, shadow_tools=["add_user"], on_shadow_violation=verdicts.append
+    ) as runtime:
+        runtime.guard_toolcall_sync(
+            "add_user", add_user_args(membership_type="platinum"), None
+        )
+        deadline = time.monotonic() + 5
+        while runtime.shadow_stats.evaluated < 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    assert [v.violation.rule for v in verdicts] == [
+        ("add_user", "valid_membership_type")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sampling_and_backpressure():
+    ran: List[str] = []
+    release = asyncio.Event()
+
+    async def evaluate(index, tool_name, args, delegate):
+        ran.append(tool_name)
+        await release.wait()
+        return GuardVerdict(index, tool_name, args)
+
+    draws = iter([0.1, 0.9])
+    shadow = ShadowEvaluator(
+        evaluate,
+        max_pending=2,
+        concurrency=1,
+        sample_rates={"sampled": 0.5},
+        random=lambda: next(draws),
+    )
+    assert shadow.submit("sampled", {}, None)
+    assert not shadow.submit("sampled", {}, None)
+    assert shadow.submit("other", {}, None)
+    assert not shadow.submit("other", {}, None)
+    await asyncio.sleep(0.01)
+    assert ran == ["sampled"]  # one at a time
+    release.set()
+    await shadow.drain()
+    assert ran == ["sampled", "other"]
+    assert shadow.stats == ShadowStats(
+        scheduled=2, sampled_out=1, dropped=1, evaluated=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_evaluations_are_counted():
+    async def evaluate(index, tool_name, args, delegate):
+        raise ConnectionError("backend down")
+
+    shadow = ShadowEvaluator(evaluate)
+    shadow.submit("get_user", {}, None)
+    await shadow.drain()
+    assert shadow.stats == ShadowStats(scheduled=1, errors=1)
+
+
+def test_exiting_the_runtime_stops_the_shadow_evaluations():
+    with load_toolguards(APPOINTMENTS_DIR, shadow_tools=["add_user"]) as runtime:
+        runtime.guard_toolcall_sync("add_user", add_user_args(), NoApiInvoker())
+        shadow = runtime._shadow
+        assert shadow is not None and shadow._thread is not None
+        thread = shadow._thread
+    assert not thread.is_alive()
+    with pytest.raises(RuntimeError):
+        runtime.guard_toolcall_sync("add_user", add_user_args(), NoApiInvoker())
@@ -0,0 +1,324 @@
+"""Unit tests for single-flight coalescing of delegate invocations."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Type
+
+import pytest
+
+from toolguard.runtime import (
+    IToolInvoker,
+    ToolguardRegistry,
+    load_toolguards,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import (
+    FileTwin,
+    RuntimeDomain,
+    ToolGuardCodeResult,
+    ToolGuardsCodeGenerationResult,
+    ToolGuardSpec,
+)
+from toolguard.runtime.tool_invokers import SharedFlightInvoker, SingleFlightInvoker
+from toolguard.runtime.tool_invokers.single_flight import SingleFlight
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    schedule_args,
+)
+
+
+class CountingInvoker(IToolInvoker):
+    """Invoker that counts calls and answers after a short delay."""
+
+    def __init__(self, delay: float = 0.01):
+        self.calls: list = []
+        self.delay = delay
+
+    async def invoke(
+        self, toolname: str, arguments: Dict[str, Any], return_type: Type
+    ) -> Any:
+        self.calls.append((toolname, arguments))
+        await asyncio.sleep(self.delay)
+        return sum(arguments.values())
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = 0
+
+    async def work():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*[flight.do("k", work) for _ in range(5)])
+    assert results == [42] * 5
+    assert started == 1
+    assert len(flight) == 0  # nothing kept after completion
+
+    await flight.do("k", work)
+    assert started == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_keep_results():
+    flight = SingleFlight(keep_results=True)
+    started = 0
+
+    async def work():
+        nonlocal started
+        started += 1
+        return started
+
+    assert await flight.do("k", work) == 1
+    assert await flight.do("k", work) == 1
+    assert started == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_failures_are_not_kept():
+    flight = SingleFlight(keep_results=True)
+    attempts = 0
+
+    async def work():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0)
+        if attempts == 1:
+            raise ValueError("boom")
+        return "ok"
+
+    results = await asyncio.gather(
+        flight.do("k", work), flight.do("k", work), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert await flight.do("k", work) == "ok"
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_waiter_keeps_shared_task():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+    started = 0
+
+    async def work():
+        nonlocal started
+        started += 1
+        await gate.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+    assert await second == "done"
+    assert first.cancelled()
+    assert started == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_last_waiter_cancels_shared_task():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_new_caller_does_not_join_a_cancelled_task():
+    flight = SingleFlight()
+
+    async def slow_to_cancel():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.01)  # cleanup
+            raise
+
+    waiter = asyncio.ensure_future(flight.do("k", slow_to_cancel))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    # the cancelled task is still cleaning up
+    async def fresh():
+        return 42
+
+    assert await flight.do("k", fresh) == 42
+
+
+@pytest.mark.asyncio
+async def test_single_flight_invoker_canonicalizes_arguments():
+    delegate = CountingInvoker()
+    invoker = SingleFlightInvoker(delegate)
+    results = await asyncio.gather(
+        invoker.invoke("add", {"a": 1, "b": 2}, int),
+        invoker.invoke("add", {"b": 2, "a": 1}, int),
+        invoker.invoke("add", {"a": 2, "b": 2}, int),
+        invoker.invoke("mul", {"a": 1, "b": 2}, int),
+    )
+    assert results == [3, 3, 4, 3]
+    assert len(delegate.calls) == 3
+
+
+GUARD = """
+import asyncio
+from test_sf_api_impl import ISfApi
+
+async def item_a(api, a: int, b: int):
+    await api.lookup(a)
+
+async def item_b(api, a: int, b: int):
+    await api.lookup(a)
+
+async def guard_lookup_tool(api: ISfApi, a: int, b: int):
+    await asyncio.gather(item_a(api, a, b), item_b(api, a, b), item_a(api, a, b))
+"""
+
+
+@pytest.fixture
+def lookup_result():
+    return ToolGuardsCodeGenerationResult(
+        out_dir=Path("/tmp/test"),
+        domain=RuntimeDomain(
+            app_name="sf",
+            app_types=FileTwin(file_name=Path("test_sf_types.py"), content=""),
+            app_api_class_name="ISfApi",
+            app_api=FileTwin(file_name=Path("test_sf_api.py"), content=""),
+            app_api_size=1,
+            app_api_impl_class_name="SfApiImpl",
+            app_api_impl=FileTwin(
+                file_name=Path("test_sf_api_impl.py"),
+                content="""
+class ISfApi:
+    pass
+
+class SfApiImpl(ISfApi):
+    def __init__(self, delegate):
+        self._delegate = delegate
+
+    async def lookup(self, a: int) -> int:
+        return await self._delegate.invoke("lookup", {"a": a}, int)
+""",
+            ),
+        ),
+        tools={
+            "lookup_tool": ToolGuardCodeResult(
+                tool=ToolGuardSpec(tool_name="lookup_tool", policy_items=[]),
+                guard_fn_name="guard_lookup_tool",
+                guard_file=FileTwin(file_name=Path("test_sf_guard.py"), content=GUARD),
+                item_guard_files=[],
+                test_files=[],
+            )
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_runtime_memoizes_api_calls_per_evaluation(lookup_result):
+    delegate = CountingInvoker()
+    with load_toolguards_from_memory(lookup_result) as runtime:
+        await runtime.guard_toolcall("lookup_tool", {"a": 1, "b": 2}, delegate)
+        assert len(delegate.calls) == 1
+
+        # not shared across evaluations
+        await runtime.guard_toolcall("lookup_tool", {"a": 1, "b": 2}, delegate)
+        assert len(delegate.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_runtime_memoization_can_be_disabled(lookup_result):
+    delegate = CountingInvoker()
+    with load_toolguards_from_memory(lookup_result, memoize_api_calls=False) as runtime:
+        await runtime.guard_toolcall("lookup_tool", {"a": 1, "b": 2}, delegate)
+        assert len(delegate.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_shared_flight_coalesces_across_invokers():
+    backends = [CountingInvoker() for _ in range(3)]
+    invokers = [SharedFlightInvoker(b, tools=["lookup"]) for b in backends]
+    results = await asyncio.gather(
+        *[i.invoke("lookup", {"a": 1, "b": 2}, int) for i in invokers],
+        *[i.invoke("other", {"a": 1, "b": 2}, int) for i in invokers],
+    )
+    assert results == [3] * 6
+    lookups = [c for b in backends for c in b.calls if c[0] == "lookup"]
+    assert len(lookups) == 1
+    assert sum(len(b.calls) for b in backends) == 4
+
+    # nothing is kept after completion
+    await invokers[0].invoke("lookup", {"a": 1, "b": 2}, int)
+    assert len(backends[0].calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_shared_flight_scopes_are_separate():
+    first, second = CountingInvoker(), CountingInvoker()
+    await asyncio.gather(
+        SharedFlightInvoker(first, ["lookup"], scope="acme").invoke(
+            "lookup", {"a": 1}, int
+        ),
+        SharedFlightInvoker(second, ["lookup"], scope="globex").invoke(
+            "lookup", {"a": 1}, int
+        ),
+    )
+    assert len(first.calls) == len(second.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_flight_cancelled_guard_call_keeps_the_others():
+    backends = [FakeAppointmentsInvoker(latency=0.05) for _ in range(4)]
+    with load_toolguards(APPOINTMENTS_DIR, coalesce_tools=["get_user"]) as runtime:
+        calls = [
+            asyncio.ensure_future(
+                runtime.guard_toolcall("schedule_appointment", schedule_args(), b)
+            )
+            for b in backends
+        ]
+        await asyncio.sleep(0.01)
+        calls[0].cancel()
+        await asyncio.gather(*calls[1:])
+    user_calls = [c for b in backends for c in b.calls if c[0] == "get_user"]
+    assert len(user_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_registry_coalesces_within_each_tenant():
+    backends = [FakeAppointmentsInvoker(latency=0.02) for _ in range(4)]
+    with ToolguardRegistry(coalesce_tools=["get_user"]) as registry:
+        registry.register("acme", ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR))
+        registry.register(
+            "globex", ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+        )
+        await asyncio.gather(
+            *[
+                registry.guard_toolcall(
+                    tenant, "schedule_appointment", schedule_args(), backend
+                )
+                for tenant, backend in zip(
+                    ["acme", "acme", "globex", "globex"], backends
+                )
+            ]
+        )
+    user_calls = [c for b in backends for c in b.calls if c[0] == "get_user"]
+    assert len(user_calls) == 2
@@ -0,0 +1,123 @@
+"""Unit tests for guarding tool calls synchronously."""
+
+import asyncio
+import re
+
+import pytest
+
+from toolguard.runtime import (
+    GuardObserver,
+    PolicyViolationException,
+    load_toolguards,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.manifest import RuntimeManifest
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+
+@pytest.fixture
+def no_event_loop(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("an event loop was started")
+
+    monkeypatch.setattr(asyncio, "run", fail)
+
+
+def test_api_free_guard_runs_without_event_loop(no_event_loop):
+    backend = FakeAppointmentsInvoker()
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        runtime.guard_toolcall_sync("add_user", add_user_args(), backend)
+        with pytest.raises(PolicyViolationException) as exc_info:
+            runtime.guard_toolcall_sync(
+                "add_user", add_user_args(membership_type="platinum"), backend
+            )
+        runtime.guard_toolcall_sync("unguarded_tool", {}, backend)
+    assert exc_info.value.rule == ("add_user", "valid_membership_type")
+    assert backend.calls == []
+
+
+def test_api_dependent_guard_falls_back_to_event_loop():
+    backend = FakeAppointmentsInvoker()
+    with load_toolguards(APPOINTMENTS_DIR) as runtime:
+        runtime.guard_toolcall_sync("schedule_appointment", schedule_args(), backend)
+        with pytest.raises(PolicyViolationException):
+            runtime.guard_toolcall_sync(
+                "schedule_appointment", schedule_args(pay_id=20), backend
+            )
+    assert backend.calls
+
+
+def test_gathering_tool_guard_falls_back_to_event_loop():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    guard_file = result.tools["add_user"].guard_file
+    # as in tool guards generated before run_item_guards
+    gathering = "import asyncio\n" + re.sub(
+        r"await run_item_guards\(\s*\[(.*?)\],.*?\n    \)",
+        r"await asyncio.gather(*[item(api, args) for item in [\1]])",
+        guard_file.content,
+        flags=re.DOTALL,
+    )
+    assert "run_item_guards(" not in gathering
+    result.tools["add_user"].guard_file = guard_file.model_copy(
+        update={"content": gathering}
+    )
+    assert not RuntimeManifest.from_result(result).tools["add_user"].loop_free
+
+    with load_toolguards_from_memory(result) as runtime:
+        runtime.guard_toolcall_sync("add_user", add_user_args(), None)
+        with pytest.raises(PolicyViolationException) as exc_info:
+            runtime.guard_toolcall_sync(
+                "add_user", add_user_args(membership_type="platinum"), None
+            )
+    assert exc_info.value.rule == ("add_user", "valid_membership_type")
+
+
+def test_failing_loop_free_guard_runs_once():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    item_files = result.tools["add_user"].item_guard_files
+    index = next(
+        i
+        for i, f in enumerate(item_files)
+        if f and "guard_valid_membership_type" in f.content
+    )
+    failing = item_files[index].content.replace(
+        "    if args.membership_type not in",
+        '    raise RuntimeError("broken guard")\n    if args.membership_type not in',
+    )
+    item_files[index] = item_files[index].model_copy(update={"content": failing})
+
+    class RuleCounter(GuardObserver):
+        def __init__(self):
+            self.started = []
+
+        def rule_started(self, rule, start):
+            self.started.append(rule)
+
+    counter = RuleCounter()
+    with load_toolguards_from_memory(result, observers=[counter]) as runtime:
+        with pytest.raises(RuntimeError, match="broken guard"):
+            runtime.guard_toolcall_sync("add_user", add_user_args(), None)
+    assert counter.started.count(("add_user", "valid_membership_type")) == 1
+
+
+def test_guard_traits():
+    result = ToolGuardsCodeGenerationResult.load(APPOINTMENTS_DIR)
+    assert not result.tools["add_user"].guard_traits  # generated without traits
+
+    manifest = RuntimeManifest.from_result(result)
+    assert manifest.tools["add_user"].api_free
+    assert manifest.tools["add_user"].loop_free
+    assert not manifest.tools["schedule_appointment"].api_free
+
+    no_traits = manifest.tools["add_user"].model_copy(update={"guard_traits": {}})
+    assert not no_traits.api_free
+
+    restored = RuntimeManifest.model_validate_json(manifest.model_dump_json())
+    assert restored == manifest
@@ -0,0 +1,113 @@
+"""Unit tests for the traces of guard evaluations."""
+
+import asyncio
+
+import pytest
+
+from toolguard.runtime import GuardTracer, PolicyViolationException, load_toolguards
+from toolguard.runtime.tracing import API, RULE
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+
+ITEM_GUARDS = {
+    "non_negative_payment",
+    "gold_member_discount",
+    "own_payment_method",
+    "no_overlapping_appointments",
+}
+
+
+@pytest.fixture
+async def tracer():
+    tracer = GuardTracer()
+    backend = FakeAppointmentsInvoker(latency=0.005)
+    with load_toolguards(APPOINTMENTS_DIR, observers=[tracer]) as runtime:
+        await asyncio.gather(
+            runtime.guard_toolcall("schedule_appointment", schedule_args(), backend),
+            runtime.guard_toolcall(
+                "schedule_appointment",
+                schedule_args(user_id=2, pay_id=20, payment_amount=100.0),
+                backend,
+            ),
+        )
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(pay_id=20), backend
+            )
+        runtime.guard_toolcall_sync("add_user", add_user_args(), backend)
+    return tracer
+
+
+@pytest.mark.asyncio
+async def test_each_evaluation_is_a_tree_of_rules(tracer):
+    traces = tracer.traces
+    assert [t.name for t in traces].count("schedule_appointment") == 3
+    assert traces[-1].name == "add_user"
+    for root in traces:
+        assert root.kind == RULE and root.parent_id is None
+        assert {s.trace_id for s in root.walk()} == {root.trace_id}
+    # concurrent evaluations of a tool have separate trees
+    for root in traces[:3]:
+        rules = [c for c in root.children if c.kind == RULE]
+        assert {c.name for c in rules} == ITEM_GUARDS
+        assert all(c.rule == (root.name, c.name) for c in rules)
+        assert all(root.start <= c.start for c in rules)
+        if root.outcome == "pass":
+            # after a violation, the other parallel item guards may still run
+            assert all(c.end <= root.end for c in rules)
+    assert [t.outcome for t in traces[:3]].count("violation") == 1
+
+
+@pytest.mark.asyncio
+async def test_api_calls_are_attached_to_their_rule(tracer):
+    root = tracer.traces[0]
+    (own_payment,) = [c for c in root.children if c.name == "own_payment_method"]
+    (call,) = own_payment.children
+    assert call.kind == API
+    assert call.name == "api.get_user_payment_methods"
+    assert call.parent_id == own_payment.span_id
+    assert own_payment.start <= call.start < call.end <= own_payment.end
+    (non_negative,) = [c for c in root.children if c.name == "non_negative_payment"]
+    assert non_negative.children == []
+
+
+@pytest.mark.asyncio
+async def test_chrome_trace_export(tracer):
+    events = tracer.to_chrome_trace()["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert len(complete) == sum(len(list(t.walk())) for t in tracer.traces)
+    call = next(e for e in complete if e["name"] == "api.get_user_payment_methods")
+    assert call["cat"] == "api"
+    assert call["args"]["rule"] == "schedule_appointment/own_payment_method"
+    assert call["dur"] > 0
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert "add_user #4" in names
+
+
+@pytest.mark.asyncio
+async def test_otel_export(tracer):
+    spans = tracer.to_otel_spans()
+    by_id = {s["spanId"]: s for s in spans}
+    roots = [s for s in spans if "parentSpanId" not in s]
+    assert len(roots) == 4
+    for span in spans:
+        assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+        assert int(span["startTimeUnixNano"]) <= int(span["endTimeUnixNano"])
+        parent = by_id.get(span.get("parentSpanId"))
+        if parent is not None:
+            assert parent["traceId"] == span["traceId"]
+    call = next(s for s in spans if s["name"] == "api.get_user_payment_methods")
+    assert call["kind"] == 3
+    assert by_id[call["parentSpanId"]]["name"] == "own_payment_method"
+    violated = next(
+        s
+        for s in spans
+        if {"key": "toolguard.outcome", "value": {"stringValue": "violation"}}
+        in s["attributes"]
+    )
+    assert violated["status"] == {"code": 1}
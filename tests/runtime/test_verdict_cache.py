@@ -0,0 +1,120 @@
+"""Unit tests for the verdict cache of pure tool guards."""
+
+import pytest
+
+from toolguard.runtime import (
+    PolicyViolationException,
+    load_toolguards,
+    load_toolguards_from_memory,
+)
+from toolguard.runtime.data_types import ToolGuardsCodeGenerationResult
+from toolguard.runtime.verdict_cache import VerdictCache
+
+from tests.runtime.fake_appointments import (
+    APPOINTMENTS_DIR,
+    FakeAppointmentsInvoker,
+    add_user_args,
+    schedule_args,
+)
+from tests.runtime.fixtures import CALCULATOR_DIR, NoApiInvoker
+
+
+@pytest.mark.asyncio
+async def test_cached_violation_keeps_message_and_rule():
+    with load_toolguards(APPOINTMENTS_DIR, verdict_cache_size=16) as runtime:
+        violations = []
+        for _ in range(3):
+            with pytest.raises(PolicyViolationException) as exc_info:
+                await runtime.guard_toolcall(
+                    "add_user",
+                    add_user_args(membership_type="platinum"),
+                    NoApiInvoker(),
+                )
+            violations.append(exc_info.value)
+        assert len({str(v) for v in violations}) == 1
+        assert {v.rule for v in violations} == {("add_user", "valid_membership_type")}
+        assert violations[1] is not violations[0]
+
+        stats = runtime.verdict_cache.stats
+        assert (stats.hits, stats.misses) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_key_uses_only_the_arguments_read():
+    with load_toolguards(APPOINTMENTS_DIR, verdict_cache_size=16) as runtime:
+        await runtime.guard_toolcall("add_user", add_user_args(), NoApiInvoker())
+        other_user = {**add_user_args(), "first_name": "Noa", "card_id": "card-y"}
+        await runtime.guard_toolcall("add_user", other_user, NoApiInvoker())
+        runtime.guard_toolcall_sync("add_user", add_user_args(), NoApiInvoker())
+        assert runtime.verdict_cache.stats.hits == 2
+
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "add_user", add_user_args(amount=1.0), NoApiInvoker()
+            )
+        assert len(runtime.verdict_cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_impure_guards_are_not_cached():
+    backend = FakeAppointmentsInvoker()
+    with load_toolguards(APPOINTMENTS_DIR, verdict_cache_size=16) as runtime:
+        for _ in range(2):
+            await runtime.guard_toolcall(
+                "schedule_appointment", schedule_args(), backend
+            )
+        assert len(runtime.verdict_cache) == 0
+        assert runtime.verdict_cache.stats.bypassed == 2
+
+
+@pytest.mark.asyncio
+async def test_reload_empties_the_cache():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    with load_toolguards_from_memory(result, verdict_cache_size=16) as runtime:
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b": 0}, NoApiInvoker()
+            )
+
+        changed = result.model_copy(deep=True)
+        guard_file = changed.tools["divide_tool"].guard_file
+        guard_file.content = guard_file.content.replace("args.b == 0", "args.b == 1")
+        assert runtime.reload(changed)
+        await runtime.guard_toolcall("divide_tool", {"a": 1, "b": 0}, NoApiInvoker())
+
+
+@pytest.mark.asyncio
+async def test_key_uses_the_aliases_of_the_arguments():
+    result = ToolGuardsCodeGenerationResult.load(CALCULATOR_DIR)
+    app_types = result.domain.app_types
+    app_types.content = app_types.content.replace(
+        "from pydantic import BaseModel", "from pydantic import BaseModel, Field"
+    ).replace("b: int", 'b: int = Field(alias="b-value")')
+    with load_toolguards_from_memory(result, verdict_cache_size=16) as runtime:
+        await runtime.guard_toolcall(
+            "divide_tool", {"a": 1, "b-value": 2}, NoApiInvoker()
+        )
+        with pytest.raises(PolicyViolationException):
+            await runtime.guard_toolcall(
+                "divide_tool", {"a": 1, "b-value": 0}, NoApiInvoker()
+            )
+        with pytest.raises(PolicyViolationException):
+            runtime.guard_toolcall_sync(
+                "divide_tool", {"a": 2, "b-value": 0}, NoApiInvoker()
+            )
+        assert runtime.verdict_cache.stats.hits == 1
+
+
+def test_disabled_by_default():
+    with load_toolguards(CALCULATOR_DIR) as runtime:
+        assert runtime.verdict_cache is None
+
+
+def test_lru_eviction():
+    cache = VerdictCache(max_entries=2)
+    for key in ["a", "b", "a", "c"]:
+        if not cache.replay(key):
+            cache.put(key, None)
+    assert cache.replay("a")
+    assert not cache.replay("b")
+    assert cache.stats.evictions == 1